@@ -0,0 +1,73 @@
+"""
+Import-time benchmark for CLI startup.
+
+Imports each target in a fresh interpreter under `python -X importtime` and reports
+the best cumulative import time over several runs. Exits with status 1 if a target
+exceeds its budget, or if importing the `sb_cli` package alone (what `sb-cli --help`
+pays) loads modules that only individual commands need.
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --budget-scale 2  # on slow machines
+"""
+import argparse
+import subprocess
+import sys
+
+# Target module -> budget in milliseconds, just above the current cost. Before commands
+# were loaded lazily, `import sb_cli` imported every command and took about 200 ms.
+BUDGETS = {
+    "sb_cli": 55,
+    "sb_cli.list_runs": 175,
+    "sb_cli.verify_api_key": 165,
+    "sb_cli.submit": 240,
+}
+# Modules `sb_cli` itself must not import; commands load them on demand
+DEFERRED_MODULES = ["requests", "rich.progress", "rich.table", "concurrent.futures", "sb_cli.submit"]
+
+
+def import_time_ms(module: str) -> float:
+    """Cumulative import time of `module` in a fresh interpreter, in milliseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000
+    raise RuntimeError(f"No import time reported for {module}")
+
+
+def loaded_modules(module: str, candidates: list[str]) -> list[str]:
+    """Which of `candidates` end up in sys.modules after importing `module`."""
+    code = f"import sys, {module}; print('\\n'.join(m for m in {candidates!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="Multiply every budget by this factor")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<24} {'best ms':>9} {'budget ms':>10}")
+    for module, budget in BUDGETS.items():
+        best = min(import_time_ms(module) for _ in range(args.repeat))
+        budget *= args.budget_scale
+        over = best > budget
+        failed |= over
+        print(f"{module:<24} {best:>9.1f} {budget:>10.0f}{'  OVER BUDGET' if over else ''}")
+
+    eager = loaded_modules("sb_cli", DEFERRED_MODULES)
+    if eager:
+        failed = True
+        print(f"sb_cli eagerly imports: {', '.join(eager)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
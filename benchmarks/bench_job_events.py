@@ -0,0 +1,85 @@
+"""
+Completion notification latency: /job-events streaming vs /poll-jobs polling.
+
+For each mode an in-process mock API is started (with and without the job-events
+feature), predictions are scheduled on it directly, and SWEBenchClient.wait follows
+the run until every instance is evaluated. Reported per mode: how long after the mock
+completed an instance the client saw it (p50/p99/max), the status requests made and
+the wall time.
+
+    python benchmarks/bench_job_events.py
+    python benchmarks/bench_job_events.py --count 500 --completion-delay 30 --event-max-duration 5
+"""
+import argparse
+import time
+
+from mock_server import DEFAULT_FEATURES, add_config_arguments, config_from_args, start_server
+from sb_cli.client import SWEBenchClient
+from sb_cli.run_state import COMPLETED
+
+RUN_KEY = ("swe-bench_lite", "dev", "bench-events")
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def run_mode(features: str, args: argparse.Namespace) -> dict:
+    args.features = features
+    server, state = start_server(config_from_args(args))
+    try:
+        instance_ids = [f"bench__repo-{i}" for i in range(args.count)]
+        for instance_id in instance_ids:
+            state.submit(RUN_KEY, {"instance_id": instance_id, "model_patch": instance_id})
+        with state.lock:
+            completed_at = {instance_id: times[1] for instance_id, times in state.runs[RUN_KEY].items()}
+        client = SWEBenchClient(
+            api_key="bench",
+            base_url=f"http://127.0.0.1:{server.server_port}",
+            report_cache=False,
+            use_daemon=False,
+        )
+        seen, delays = set(), []
+
+        def on_update(run_state):
+            now = time.time()
+            for instance_id in run_state.ids_with_state(COMPLETED):
+                if instance_id not in seen:
+                    seen.add(instance_id)
+                    delays.append(max(0.0, now - completed_at[instance_id]))
+
+        start = time.perf_counter()
+        client.wait(*RUN_KEY, instance_ids, on_update=on_update)
+        wall = time.perf_counter() - start
+        requests = sum(1 for endpoint, _, _ in state.stats()["timings"] if endpoint in ("poll-jobs", "job-events"))
+    finally:
+        server.shutdown()
+    return {
+        "p50": percentile(delays, 0.5),
+        "p99": percentile(delays, 0.99),
+        "max": max(delays, default=0.0),
+        "requests": requests,
+        "wall": wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=200, help="Instances in the run")
+    add_config_arguments(parser)
+    parser.set_defaults(running_delay=2.0, completion_delay=20.0, latency=0.02)
+    args = parser.parse_args()
+
+    polling_features = ",".join(f for f in DEFAULT_FEATURES.split(",") if f != "job-events")
+    print(f"{'mode':>8} {'p50 (s)':>8} {'p99 (s)':>8} {'max (s)':>8} {'requests':>9} {'wall (s)':>9}")
+    for mode, features in (("stream", DEFAULT_FEATURES), ("poll", polling_features)):
+        result = run_mode(features, args)
+        print(
+            f"{mode:>8} {result['p50']:>8.2f} {result['p99']:>8.2f} {result['max']:>8.2f} "
+            f"{result['requests']:>9} {result['wall']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Micro-benchmark for /poll-jobs reconciliation and --instance_ids filtering.
+
+Compares the previous set-rebuilding reconciliation with the incremental RunProgress
+for full-snapshot polls and for delta polls (a fixed number of newly completed IDs),
+and list vs frozenset membership for instance ID filtering.
+
+    python benchmarks/bench_poll_reconcile.py
+"""
+import argparse
+import timeit
+
+from sb_cli.run_state import InstanceIndex, RunProgress
+
+
+def legacy_process_poll_response(results: dict, all_ids: list[str]):
+    running_ids = set(results['running']) & set(all_ids)
+    completed_ids = set(results['completed']) & set(all_ids)
+    pending_ids = set(all_ids) - running_ids - completed_ids
+    return {
+        'running': list(running_ids),
+        'completed': list(completed_ids),
+        'pending': list(pending_ids)
+    }
+
+
+def bench(func, repeat: int) -> float:
+    """Best per-call time in milliseconds."""
+    return min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='10000,30000,100000')
+    parser.add_argument('--delta', type=int, default=100, help="IDs changed per delta poll")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'instances':>10} {'legacy full':>12} {'incr. full':>12} {'legacy delta':>13} {'incr. delta':>12} {'list filter':>12} {'set filter':>11}")
+    for size in map(int, args.sizes.split(',')):
+        all_ids = [f"repo__instance-{i}" for i in range(size)]
+        half = size // 2
+        snapshot = {'running': all_ids[half:], 'completed': all_ids[:half]}
+        delta = {'running': [], 'completed': all_ids[half:half + args.delta]}
+
+        run_state = RunProgress(InstanceIndex(all_ids))
+        run_state.update(snapshot)
+        legacy_full = bench(lambda: legacy_process_poll_response(snapshot, all_ids), args.repeat)
+        incremental_full = bench(lambda: run_state.update(snapshot), args.repeat)
+
+        # Legacy code has to reconcile the full state even when only a few IDs changed
+        delta_snapshot = {'running': all_ids[half + args.delta:], 'completed': all_ids[:half + args.delta]}
+        legacy_delta = bench(lambda: legacy_process_poll_response(delta_snapshot, all_ids), args.repeat)
+        incremental_delta = bench(lambda: run_state.update(delta), args.repeat)
+
+        # Filtering --instance_ids: 1,000 wanted IDs checked against every prediction
+        wanted_list = all_ids[::max(1, size // 1000)]
+        wanted_set = frozenset(wanted_list)
+        sample = all_ids[:2000]
+        list_filter = bench(lambda: [i for i in sample if i in wanted_list], args.repeat)
+        set_filter = bench(lambda: [i for i in sample if i in wanted_set], args.repeat)
+
+        print(
+            f"{size:>10} {legacy_full:>10.2f}ms {incremental_full:>10.2f}ms {legacy_delta:>11.2f}ms "
+            f"{incremental_delta:>10.3f}ms {list_filter:>10.2f}ms {set_filter:>9.3f}ms"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Reading a small subset of a large predictions file with and without a sidecar index.
+
+Generates a JSONL predictions file of about --size-mb megabytes, then times what a
+subset resubmit reads before uploading: scan_predictions (patch hashes), validation
+and iter_predictions for --subset instances. Each is run without an index, then the
+index is built (timed once) and the same steps run again.
+
+    python benchmarks/bench_prediction_index.py
+    python benchmarks/bench_prediction_index.py --size-mb 2048 --subset 10
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from sb_cli.prediction_index import build_index, index_path
+from sb_cli.predictions import iter_predictions, scan_predictions
+from sb_cli.validate import validate_predictions
+
+
+def write_predictions(path: Path, size_bytes: int, patch_bytes: int) -> list[str]:
+    instance_ids = []
+    lines = "".join(f"+{os.urandom(39).hex()}\n" for _ in range(max(1, patch_bytes // 80)))
+    with open(path, "w") as f:
+        while f.tell() < size_bytes:
+            instance_id = f"bench__repo-{len(instance_ids)}"
+            instance_ids.append(instance_id)
+            patch = f"--- a/{instance_id}.py\n+++ b/{instance_id}.py\n@@ -0,0 +1,{lines.count(chr(10))} @@\n{lines}"
+            f.write(json.dumps({
+                "instance_id": instance_id,
+                "model_patch": patch,
+                "model_name_or_path": "bench-model",
+            }) + "\n")
+    return instance_ids
+
+
+def timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(path: Path, subset: list[str]) -> dict:
+    return {
+        "scan": timed(lambda: scan_predictions(str(path), subset)),
+        "validate": timed(lambda: validate_predictions(str(path), subset, workers=1)),
+        "read": timed(lambda: list(iter_predictions(str(path), subset))),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=int, default=512, help="Approximate size of the predictions file")
+    parser.add_argument("--patch-bytes", type=int, default=64 * 1024, help="Approximate size of each patch")
+    parser.add_argument("--subset", type=int, default=10, help="Instances to read")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "preds.jsonl"
+        instance_ids = write_predictions(path, args.size_mb * 1024 * 1024, args.patch_bytes)
+        subset = random.sample(instance_ids, min(args.subset, len(instance_ids)))
+        print(f"{len(instance_ids)} predictions, {path.stat().st_size / 1024 / 1024:.0f} MB, subset of {len(subset)}")
+        before = measure(path, subset)
+        build_ms = timed(lambda: build_index(str(path)))
+        after = measure(path, subset)
+        print(f"index built in {build_ms:.0f} ms ({index_path(str(path)).stat().st_size / 1024:.0f} KB)")
+        print(f"{'step':>10} {'no index (ms)':>14} {'index (ms)':>11}")
+        for step in before:
+            print(f"{step:>10} {before[step]:>14.1f} {after[step]:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
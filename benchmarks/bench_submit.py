@@ -0,0 +1,134 @@
+"""
+End-to-end benchmark of `sb-cli submit` against the local mock API server.
+
+For each scenario (number of predictions) a predictions file is generated, the mock
+server is reset, and `sb-cli submit` runs in a subprocess through upload, polling and
+report generation. Reported per scenario: wall time, requests/sec, p50/p99 server
+handling time, 5xx responses and peak RSS of the CLI process.
+
+    python benchmarks/bench_submit.py
+    python benchmarks/bench_submit.py --scenarios 1000 --engine asyncio --error-rate 0.02
+    python benchmarks/bench_submit.py --features "" -- --batch 0  # old API, extra CLI args after --
+    python benchmarks/bench_submit.py --scenarios 50 --patch-bytes 4000000 --index -- --max_patch_bytes 8000000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+from mock_server import add_config_arguments, config_from_args, start_server
+from sb_cli.prediction_index import build_index
+
+
+def write_predictions(path: Path, count: int, patch_bytes: int):
+    # Hex lines compress about as well as real patches, unlike repeated text
+    with open(path, "w") as f:
+        for i in range(count):
+            lines = max(1, patch_bytes // 80)
+            body = "".join(f"+{os.urandom(39).hex()}\n" for _ in range(lines))
+            f.write(json.dumps({
+                "instance_id": f"bench__repo-{i}",
+                "model_patch": f"--- a/f{i}.py\n+++ b/f{i}.py\n@@ -0,0 +1,{lines} @@\n{body}",
+                "model_name_or_path": "bench-model",
+            }) + "\n")
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def fetch_stats(base_url: str) -> dict:
+    with urllib.request.urlopen(f"{base_url}/_stats") as response:
+        return json.load(response)
+
+
+def run_scenario(base_url: str, workdir: Path, count: int, args: argparse.Namespace) -> dict:
+    predictions_path = workdir / f"preds_{count}.jsonl"
+    if not predictions_path.exists():
+        write_predictions(predictions_path, count, args.patch_bytes)
+        if args.index:
+            build_index(str(predictions_path))
+    urllib.request.urlopen(urllib.request.Request(f"{base_url}/_reset", method="POST")).close()
+    command = [
+        sys.executable, "-c", "from sb_cli import main; main()",
+        "submit", "swe-bench_lite", "dev",
+        "--predictions_path", str(predictions_path),
+        "--run_id", f"bench-{count}",
+        "--output_dir", str(workdir / "reports"),
+        "--overwrite", "1",
+        "--journal", "0",
+        "--engine", args.engine,
+        *args.cli_args,
+    ]
+    env = {
+        **os.environ,
+        "SWEBENCH_API_URL": base_url,
+        "SWEBENCH_API_KEY": "bench",
+        "SWEBENCH_REPORT_CACHE_DIR": str(workdir / "cache"),
+    }
+    start = time.perf_counter()
+    with open(workdir / "stderr.log", "w+") as stderr:
+        process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=stderr)
+        # wait4 reports the resource usage of this child alone
+        _, status, usage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - start
+        if os.waitstatus_to_exitcode(status) != 0:
+            stderr.seek(0)
+            raise RuntimeError(f"sb-cli submit failed for {count} predictions:\n{stderr.read()}")
+
+    stats = fetch_stats(base_url)
+    latencies = [seconds * 1000 for _, seconds, _ in stats["timings"]]
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return {
+        "predictions": count,
+        "wall_s": wall,
+        "requests": stats["requests"],
+        "rps": stats["requests"] / wall,
+        "p50_ms": percentile(latencies, 0.50),
+        "p99_ms": percentile(latencies, 0.99),
+        "errors": stats["errors"],
+        "uploaded_mb": stats["bytes_received"] / 1e6,
+        "peak_rss_mb": peak_rss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default="100,1000,10000", help="Comma-separated prediction counts")
+    parser.add_argument("--patch-bytes", type=int, default=4000, help="Approximate size of each model_patch")
+    parser.add_argument("--engine", default="threads", choices=["threads", "asyncio"])
+    parser.add_argument("--index", action="store_true", help="Index the predictions files so large patches stream from disk")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    parser.add_argument("cli_args", nargs="*", help="Extra arguments for sb-cli submit (after --)")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server, _ = start_server(config_from_args(args))
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    columns = ["predictions", "wall_s", "requests", "rps", "p50_ms", "p99_ms", "errors", "uploaded_mb", "peak_rss_mb"]
+    if not args.json:
+        print(" ".join(f"{column:>12}" for column in columns))
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in (int(value) for value in args.scenarios.split(",")):
+            result = run_scenario(base_url, Path(tmp), count, args)
+            if args.json:
+                print(json.dumps(result))
+            else:
+                print(" ".join(
+                    f"{result[column]:>12.1f}" if isinstance(result[column], float) else f"{result[column]:>12}"
+                    for column in columns
+                ))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
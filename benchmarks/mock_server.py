@@ -0,0 +1,396 @@
+"""
+Local stand-in for the SWE-bench API, for benchmarking the CLI without the real service.
+
+Implements /submit, /submit-batch, /submit-context, /check-hashes, /poll-jobs,
+/job-events, /get-report, /get-results, /list-runs, /delete-run, /get-quotas and /capabilities, with
+configurable response latency, error rate and job-completion dynamics. Each submitted
+instance starts running after about `--running-delay` seconds and completes after about
+`--completion-delay` seconds (both jittered by +/-50%). /job-events pushes those changes
+as Server-Sent Events, closing the stream after `--event-max-duration` seconds if set so
+clients have to resume it. Handling times per request are recorded and served from /_stats.
+
+    python benchmarks/mock_server.py --port 8000 --latency 0.05 --error-rate 0.01
+    SWEBENCH_API_URL=http://127.0.0.1:8000 sb-cli submit swe-bench_lite dev ...
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_FEATURES = "batch-submit,submit-context,gzip-requests,zstd-requests,patch-hashes,job-events,chunked-requests,instance-results"
+# How often an open /job-events stream checks for state changes
+EVENT_CHECK_INTERVAL = 0.05
+
+
+class MockConfig:
+    def __init__(
+        self,
+        latency: float = 0.02,
+        jitter: float = 0.5,
+        error_rate: float = 0.0,
+        running_delay: float = 1.0,
+        completion_delay: float = 3.0,
+        features: str = DEFAULT_FEATURES,
+        quota: int = 1000,
+        event_heartbeat: float = 15.0,
+        event_max_duration: float = 0.0,
+        fail_endpoints: dict = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.running_delay = running_delay
+        self.completion_delay = completion_delay
+        self.features = [feature for feature in features.split(",") if feature]
+        self.quota = quota
+        self.event_heartbeat = event_heartbeat
+        self.event_max_duration = event_max_duration
+        # endpoint -> status code every request to it fails with
+        self.fail_endpoints = fail_endpoints or {}
+
+
+class MockState:
+    """Runs, submit contexts and per-request timings, shared by all handler threads."""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.lock = threading.Lock()
+        self.runs = {}  # (subset, split, run_id) -> {instance_id: (running_at, completed_at)}
+        self.run_hashes = {}  # (subset, split, run_id) -> {instance_id: patch hash}
+        self.patches = set()  # hashes of every patch received
+        self.contexts = {}
+        self.timings = []  # (endpoint, seconds, status)
+        self.bytes_received = 0
+
+    def submit(self, run_key: tuple, prediction: dict) -> bool:
+        """Schedule an instance; returns whether it was newly launched."""
+        instance_id = prediction["instance_id"]
+        if "model_patch" in prediction:
+            digest = hashlib.sha256(prediction["model_patch"].encode()).hexdigest()
+        elif prediction.get("patch_sha256") in self.patches:
+            digest = prediction["patch_sha256"]
+        else:
+            raise KeyError(f"Unknown patch hash for {instance_id}")
+        now = time.time()
+        with self.lock:
+            self.patches.add(digest)
+            self.run_hashes.setdefault(run_key, {})[instance_id] = digest
+            run = self.runs.setdefault(run_key, {})
+            if instance_id in run:
+                return False
+            running_at = now + self.config.running_delay * random.uniform(0.5, 1.5)
+            completed_at = max(running_at, now + self.config.completion_delay * random.uniform(0.5, 1.5))
+            run[instance_id] = (running_at, completed_at)
+            return True
+
+    @staticmethod
+    def outcome(instance_id: str) -> str:
+        """A fixed evaluation outcome per instance: about half resolved and 5% errors."""
+        bucket = int(hashlib.sha256(instance_id.encode()).hexdigest()[:8], 16) % 100
+        return "error" if bucket < 5 else "resolved" if bucket % 2 else "unresolved"
+
+    def job_states(self, run_key: tuple, since: float = None) -> tuple[list, list]:
+        """Running and completed IDs, limited to those that changed after `since`."""
+        now = time.time()
+        running, completed = [], []
+        with self.lock:
+            jobs = list(self.runs.get(run_key, {}).items())
+        for instance_id, (running_at, completed_at) in jobs:
+            if since is not None and not (since < running_at <= now or since < completed_at <= now):
+                continue
+            if completed_at <= now:
+                completed.append(instance_id)
+            elif running_at <= now:
+                running.append(instance_id)
+        return running, completed
+
+    def record(self, endpoint: str, seconds: float, status: int, num_bytes: int):
+        with self.lock:
+            self.timings.append((endpoint, seconds, status))
+            self.bytes_received += num_bytes
+
+    def stats(self) -> dict:
+        with self.lock:
+            timings = list(self.timings)
+            bytes_received = self.bytes_received
+        return {
+            "requests": len(timings),
+            "errors": sum(1 for _, _, status in timings if status >= 500),
+            "bytes_received": bytes_received,
+            "timings": timings,
+        }
+
+    def reset(self):
+        with self.lock:
+            self.runs.clear()
+            self.run_hashes.clear()
+            self.patches.clear()
+            self.contexts.clear()
+            self.timings.clear()
+            self.bytes_received = 0
+
+
+def run_key(payload: dict) -> tuple:
+    return (payload.get("subset"), payload.get("split"), payload.get("run_id"))
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY delayed ACKs add ~40 ms
+    disable_nagle_algorithm = True
+    state: MockState = None
+
+    def log_message(self, *args):
+        pass
+
+    def read_chunked(self) -> bytes:
+        chunks = []
+        while True:
+            size = int(self.rfile.readline().split(b";")[0], 16)
+            if not size:
+                # Skip any trailers up to the blank line that ends the body
+                while self.rfile.readline().strip():
+                    pass
+                return b"".join(chunks)
+            chunks.append(self.rfile.read(size))
+            self.rfile.readline()
+
+    def read_body(self) -> tuple[dict, int]:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            raw = self.read_chunked()
+        else:
+            raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        num_bytes = len(raw)
+        encoding = self.headers.get("Content-Encoding")
+        if encoding == "gzip":
+            raw = gzip.decompress(raw)
+        elif encoding == "zstd":
+            import zstandard
+            # Streamed frames do not record their content size, so decompress incrementally
+            raw = zstandard.ZstdDecompressor().decompressobj().decompress(raw)
+        payload = json.loads(raw) if raw else {}
+        if "context_id" in payload:
+            payload = {**self.state.contexts[payload.pop("context_id")], **payload}
+        return payload, num_bytes
+
+    def send_json(self, status: int, body: dict, headers: dict = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        return status
+
+    def send_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def stream_job_events(self, payload: dict) -> int:
+        """Push job state changes as Server-Sent Events until the client disconnects."""
+        config = self.state.config
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        # Event IDs are the poll cursors, so a resumed stream starts after the last one seen
+        last_event_id = self.headers.get("Last-Event-ID")
+        since = float(last_event_id) if last_event_id else None
+        started = last_sent = time.time()
+        first = True
+        self.close_connection = True
+        try:
+            while not (config.event_max_duration and time.time() - started > config.event_max_duration):
+                now = time.time()
+                running, completed = self.state.job_states(run_key(payload), since)
+                if first or running or completed:
+                    data = json.dumps({"running": running, "completed": completed})
+                    self.send_chunk(f"id: {now}\nevent: jobs\ndata: {data}\n\n".encode())
+                    since, last_sent, first = now, now, False
+                elif now - last_sent >= config.event_heartbeat:
+                    self.send_chunk(b": keepalive\n\n")
+                    last_sent = now
+                time.sleep(EVENT_CHECK_INTERVAL)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        return 200
+
+    def send_not_modified(self, etag: str):
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        return 304
+
+    def handle_request(self):
+        start = time.perf_counter()
+        endpoint = self.path.split("?")[0].strip("/")
+        payload, num_bytes = self.read_body()
+        config = self.state.config
+        if endpoint == "_stats":
+            self.send_json(200, self.state.stats())
+            return
+        if endpoint == "_reset":
+            self.state.reset()
+            self.send_json(200, {})
+            return
+        time.sleep(max(0.0, config.latency * random.uniform(1 - config.jitter, 1 + config.jitter)))
+        if endpoint in config.fail_endpoints:
+            status = self.send_json(config.fail_endpoints[endpoint], {"message": f"{endpoint} is failing"})
+        elif endpoint != "capabilities" and random.random() < config.error_rate:
+            status = self.send_json(503, {"message": "Service temporarily unavailable"})
+        else:
+            status = self.route(endpoint, payload)
+        self.state.record(endpoint, time.perf_counter() - start, status, num_bytes)
+
+    def route(self, endpoint: str, payload: dict) -> int:
+        state = self.state
+        if endpoint == "capabilities":
+            return self.send_json(200, {"features": state.config.features})
+        if endpoint == "submit-context" and "submit-context" in state.config.features:
+            context_id = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+            state.contexts[context_id] = payload
+            return self.send_json(200, {"context_id": context_id})
+        try:
+            if endpoint == "submit":
+                instance_id = payload["prediction"]["instance_id"]
+                launched = state.submit(run_key(payload), payload["prediction"])
+                return self.send_json(200, {"instance_id": instance_id, "launched": launched})
+            if endpoint == "submit-batch" and "batch-submit" in state.config.features:
+                results = [
+                    {"instance_id": pred["instance_id"], "launched": state.submit(run_key(payload), pred)}
+                    for pred in payload["predictions"]
+                ]
+                return self.send_json(200, {"results": results})
+        except KeyError as e:
+            return self.send_json(400, {"message": str(e)})
+        if endpoint == "check-hashes" and "patch-hashes" in state.config.features:
+            with state.lock:
+                run_hashes = dict(state.run_hashes.get(run_key(payload), {}))
+                submitted = [i for i, digest in payload["hashes"].items() if run_hashes.get(i) == digest]
+                known = [i for i, digest in payload["hashes"].items() if digest in state.patches]
+            return self.send_json(200, {"submitted": submitted, "known": known})
+        if endpoint == "poll-jobs":
+            now = time.time()
+            running, completed = state.job_states(run_key(payload), payload.get("since"))
+            total_running, total_completed = (
+                (len(running), len(completed)) if payload.get("since") is None
+                else tuple(map(len, state.job_states(run_key(payload))))
+            )
+            etag = f'"{total_running + total_completed}-{total_completed}"'
+            if self.headers.get("If-None-Match") == etag:
+                return self.send_not_modified(etag)
+            return self.send_json(
+                200, {"running": running, "completed": completed, "cursor": now}, {"ETag": etag}
+            )
+        if endpoint == "job-events" and "job-events" in state.config.features:
+            return self.stream_job_events(payload)
+        if endpoint == "get-report":
+            running, completed = state.job_states(run_key(payload))
+            with state.lock:
+                submitted = list(state.runs.get(run_key(payload), {}))
+            outcomes = {"resolved": [], "unresolved": [], "error": []}
+            for instance_id in completed:
+                outcomes[state.outcome(instance_id)].append(instance_id)
+            report = {
+                "total_instances": len(submitted),
+                "submitted_instances": len(submitted),
+                "completed_instances": len(completed) - len(outcomes["error"]),
+                "resolved_instances": len(outcomes["resolved"]),
+                "unresolved_instances": len(outcomes["unresolved"]),
+                "error_instances": len(outcomes["error"]),
+                "pending_instances": len(submitted) - len(completed),
+                "failed_instances": 0,
+                "resolved_ids": outcomes["resolved"],
+                "unresolved_ids": outcomes["unresolved"],
+                "error_ids": outcomes["error"],
+            }
+            etag = '"' + hashlib.sha256(json.dumps(report).encode()).hexdigest()[:16] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                return self.send_not_modified(etag)
+            return self.send_json(200, {"report": report}, {"ETag": etag})
+        if endpoint == "get-results" and "instance-results" in state.config.features:
+            _, completed = state.job_states(run_key(payload))
+            completed = set(completed)
+            results = {i: state.outcome(i) for i in payload.get("instance_ids", []) if i in completed}
+            return self.send_json(200, {"results": results})
+        if endpoint == "list-runs":
+            with state.lock:
+                run_ids = [key[2] for key in state.runs if key[:2] == (payload.get("subset"), payload.get("split"))]
+            return self.send_json(200, {"run_ids": run_ids})
+        if endpoint == "delete-run":
+            with state.lock:
+                deleted = state.runs.pop(run_key(payload), None) is not None
+                state.run_hashes.pop(run_key(payload), None)
+            if not deleted:
+                return self.send_json(404, {"message": f"Run {payload.get('run_id')} not found"})
+            return self.send_json(200, {"message": f"Run {payload.get('run_id')} deleted"})
+        if endpoint == "get-quotas":
+            quotas = {subset: {"dev": state.config.quota, "test": state.config.quota}
+                      for subset in ("swe-bench-m", "swe-bench_lite", "swe-bench_verified")}
+            return self.send_json(200, {"remaining_quotas": quotas})
+        return self.send_json(404, {"message": f"Unknown endpoint: {endpoint}"})
+
+    do_GET = handle_request
+    do_POST = handle_request
+    do_DELETE = handle_request
+
+
+def start_server(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> tuple[ThreadingHTTPServer, MockState]:
+    """Serve the mock API from a background thread; port 0 picks a free port."""
+    state = MockState(config)
+    handler = type("BoundMockHandler", (MockHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency", type=float, default=0.02, help="Mean response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Relative latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--running-delay", type=float, default=1.0, help="Seconds until a job starts running")
+    parser.add_argument("--completion-delay", type=float, default=3.0, help="Seconds until a job completes")
+    parser.add_argument("--features", default=DEFAULT_FEATURES, help="Comma-separated /capabilities features")
+    parser.add_argument("--event-heartbeat", type=float, default=15.0, help="Seconds between heartbeats on idle /job-events streams")
+    parser.add_argument("--event-max-duration", type=float, default=0.0, help="Close /job-events streams after this many seconds - 0 to keep them open")
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        running_delay=args.running_delay,
+        completion_delay=args.completion_delay,
+        features=args.features,
+        event_heartbeat=args.event_heartbeat,
+        event_max_duration=args.event_max_duration,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    server, _ = start_server(config_from_args(args), args.host, args.port)
+    print(f"Mock SWE-bench API listening on http://{args.host}:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,79 @@
+import ast
+import importlib
+from pathlib import Path
 import typer
+from typer.core import TyperCommand, TyperGroup
+
+# Command name -> (module, function). Modules are imported only when their command
+# runs, so `--help` and light commands skip the heavy dependencies.
+COMMANDS = {
+    "get-report": ("get_report", "get_report"),
+    "list-runs": ("list_runs", "list_runs"),
+    "compare-runs": ("compare_runs", "compare_runs"),
+    "submit": ("submit", "submit"),
+    "submit-many": ("submit_many", "submit_many"),
+    "build-index": ("build_index", "build_index"),
+    "verify-api-key": ("verify_api_key", "verify"),
+    "gen-api-key": ("gen_api_key", "gen_api_key"),
+    "delete-run": ("delete_run", "delete_run"),
+    "get-quotas": ("get_quotas", "get_quotas"),
+    "daemon": ("daemon", "daemon"),
+}
+
+
+def command_help(name: str) -> str:
+    """First paragraph of a command's docstring, read from its source without importing the module."""
+    module_name, function_name = COMMANDS[name]
+    tree = ast.parse((Path(__file__).parent / f"{module_name}.py").read_text())
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == function_name:
+            return (ast.get_docstring(node) or "").split("\n\n")[0]
+    return ""
+
+
+def load_command(name: str) -> TyperCommand:
+    """Import a command's module and build its real click command."""
+    module_name, function_name = COMMANDS[name]
+    module = importlib.import_module(f"{__name__}.{module_name}")
+    command_app = typer.Typer()
+    command_app.command(name=name)(getattr(module, function_name))
+    return typer.main.get_command(command_app)
+
+
+class LazyGroup(TyperGroup):
+    """Lists commands from COMMANDS and imports a command's module only when it is invoked."""
+
+    def list_commands(self, ctx) -> list[str]:
+        return list(COMMANDS)
+
+    def get_command(self, ctx, cmd_name: str):
+        # Help listings only need the name and short help, so don't import anything here
+        if cmd_name not in COMMANDS:
+            return None
+        return TyperCommand(name=cmd_name, help=command_help(cmd_name))
+
+    def resolve_command(self, ctx, args):
+        if args and args[0] in COMMANDS:
+            return args[0], load_command(args[0]), args[1:]
+        return super().resolve_command(ctx, args)  # reports the unknown command
+
+
+def __getattr__(name: str):
+    # `from sb_cli import SWEBenchClient` for library use, without importing it on CLI startup
+    if name == "SWEBenchClient":
+        from sb_cli.client import SWEBenchClient
+        return SWEBenchClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+app = typer.Typer(cls=LazyGroup, help="CLI tool for interacting with the SWE-bench M API")
+
+
+@app.callback()
+def callback():
+    pass
+
 
-app = typer.Typer(help="CLI tool for interacting with the SWE-bench M API")
-
-from . import (
-    gen_api_key,
-    get_report,
-    list_runs,
-    submit,
-    verify_api_key,
-    delete_run,
-    get_quotas
-)
-
-app.command(name="get-report")(get_report.get_report)
-app.command(name="list-runs")(list_runs.list_runs)
-app.command(name="submit")(submit.submit)
-app.command(name="verify-api-key")(verify_api_key.verify)
-app.command(name="gen-api-key")(gen_api_key.gen_api_key)
-app.command(name="delete-run")(delete_run.delete_run)
-app.command(name="get-quotas")(get_quotas.get_quotas)
 def main():
     """Run the SWE-bench CLI application"""
     import sys
@@ -0,0 +1,328 @@
+import asyncio
+import sys
+import threading
+import time
+from typing import Iterable, Optional
+from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn, TimeElapsedColumn
+from sb_cli.client import SWEBenchClient
+from sb_cli.config import MAX_RETRIES, SUBMIT_WORKERS
+from sb_cli.failures import UploadFailures
+from sb_cli.journal import SubmissionJournal
+from sb_cli.output import EventProgress, emit, is_ndjson, make_console
+from sb_cli.polling import PollScheduler
+from sb_cli.profiling import RequestTrace, profiler
+from sb_cli.run_state import RunProgress
+from sb_cli.submit import UploadTracker, chunk_predictions, print_submission_summary
+from sb_cli.throttle import get_rate_controller
+from sb_cli.utils import (
+    CONNECT_TIMEOUT,
+    RETRY_STATUS_CODES,
+    StreamedJSONBody,
+    get_retry_after,
+    get_retry_delay,
+    is_retriable,
+    json_request_body,
+    verify_response,
+)
+
+POLL_INTERVAL = 8
+
+
+def import_httpx():
+    try:
+        import httpx
+    except ImportError:
+        raise ImportError(
+            "The asyncio engine requires httpx - install it with `pip install 'sb-cli[async]'`"
+        )
+    return httpx
+
+
+def request_body_bytes(request) -> int:
+    try:
+        return len(request.content)
+    except import_httpx().RequestNotRead:
+        # A streamed body is counted in `upload_stats` instead
+        return 0
+
+
+def record_async_request(method: str, endpoint: str, response, attempt: int, start_time: float, trace: RequestTrace):
+    duration = time.monotonic() - start_time
+    profiler.record_request(
+        method,
+        endpoint,
+        response.status_code if response is not None else None,
+        attempt,
+        start=time.perf_counter() - duration,
+        duration=duration,
+        sent_bytes=request_body_bytes(response.request) if response is not None else 0,
+        received_bytes=len(response.content) if response is not None else 0,
+        # Concurrent requests share the event loop thread, so lay them out per task
+        track=id(asyncio.current_task()),
+        **trace.timings(),
+    )
+
+
+async def to_daemon_thread(func, *args):
+    """
+    Like `asyncio.to_thread`, but in a daemon thread that neither the event loop nor
+    interpreter exit waits for, for calls that can block for a long time.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(set_outcome, value):
+        if not future.done():
+            set_outcome(value)
+
+    def run():
+        try:
+            result = func(*args)
+        except BaseException as e:
+            outcome = (future.set_exception, e)
+        else:
+            outcome = (future.set_result, result)
+        try:
+            loop.call_soon_threadsafe(resolve, *outcome)
+        except RuntimeError:
+            pass  # the loop is already closed, so nothing is waiting for this
+
+    threading.Thread(target=run, daemon=True).start()
+    return await future
+
+
+async def async_api_request(client, method: str, endpoint: str, max_retries: int = MAX_RETRIES, **kwargs):
+    """Async counterpart of `api_request` with the same retry and backoff policy."""
+    httpx = import_httpx()
+    controller = get_rate_controller()
+    body = kwargs.get("content")
+    for attempt in range(max_retries + 1):
+        if isinstance(body, StreamedJSONBody):
+            # Each attempt streams the body again from the start
+            kwargs["content"] = body.aiter()
+        await controller.acquire_async()
+        trace = RequestTrace() if profiler.enabled else None
+        if trace:
+            kwargs["extensions"] = {"trace": trace}
+        start_time = time.monotonic()
+        response = None
+        try:
+            response = await client.request(method, endpoint, **kwargs)
+        except httpx.TransportError:
+            if trace:
+                record_async_request(method, endpoint, None, attempt, start_time, trace)
+            if attempt == max_retries:
+                raise
+        finally:
+            # Cancelled workers and unexpected errors must give the slot back too
+            status_code = response.status_code if response is not None else None
+            controller.release(status_code, time.monotonic() - start_time, endpoint)
+        if response is not None:
+            if trace:
+                record_async_request(method, endpoint, response, attempt, start_time, trace)
+            if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries:
+                return response
+        await asyncio.sleep(get_retry_delay(response, attempt))
+
+
+async def submit_and_verify(
+    predictions: Iterable[dict],
+    api: SWEBenchClient,
+    payload_base: dict,
+    run_state: RunProgress,
+    job_poller,
+    progress: Progress,
+    *,
+    batch: bool = False,
+    verify: bool = True,
+    concurrency: int = SUBMIT_WORKERS,
+    timeout: int = 60 * 5,
+    already_submitted: int = 0,
+    journal: Optional[SubmissionJournal] = None,
+    fail_fast: bool = True,
+    failures: Optional[UploadFailures] = None,
+):
+    """
+    Upload predictions with bounded concurrency while polling for the ones that already landed.
+
+    Failures are handled as in the threads engine: either the first one aborts the
+    uploads, or all are collected in `failures` and retriable ones are retried.
+    Reading predictions, encoding and compressing bodies, and `job_poller`'s polls
+    (which block on a job event stream) run in threads so they don't hold up the
+    event loop.
+    """
+    httpx = import_httpx()
+    total = run_state.total - already_submitted
+    encoding = api.request_encoding
+    chunked = "chunked-requests" in api.capabilities
+    upload_task = progress.add_task("Submitting predictions", total=total, event="submitted")
+    verify_task = progress.add_task("Processing submission", total=run_state.total, event="running") if verify else None
+    tracker = UploadTracker(
+        journal=journal,
+        fail_fast=fail_fast,
+        failures=failures,
+        on_advance=lambda count: progress.update(upload_task, advance=count),
+    )
+    first_landed = asyncio.Event()
+    if already_submitted:
+        first_landed.set()
+    uploads_done = asyncio.Event()
+    chunks = iter(chunk_predictions(predictions) if batch else ([pred] for pred in predictions))
+    # Workers share one iterator, and a generator can only be advanced by one thread at a time
+    chunks_lock = asyncio.Lock()
+
+    async def next_chunk():
+        async with chunks_lock:
+            return await asyncio.to_thread(next, chunks, None)
+
+    async with httpx.AsyncClient(
+        base_url=api.base_url,
+        headers=api.headers,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        timeout=httpx.Timeout(None, connect=CONNECT_TIMEOUT),
+    ) as client:
+        async def upload_worker():
+            # At most `concurrency` workers, so at most that many requests are in flight
+            while (chunk := await next_chunk()) is not None:
+                if batch:
+                    endpoint, payload = "submit-batch", {**payload_base, "predictions": chunk}
+                else:
+                    endpoint, payload = "submit", {**payload_base, "prediction": chunk[0]}
+                try:
+                    body, body_headers = await asyncio.to_thread(json_request_body, payload, encoding, chunked)
+                    response = await async_api_request(client, "POST", endpoint, content=body, headers=body_headers)
+                    verify_response(response)
+                except Exception as e:
+                    tracker.failed(chunk, e, retriable=is_retriable(e) or isinstance(e, httpx.TransportError))
+                    tracker.check()
+                    continue
+                results = response.json()["results"] if batch else [response.json()]
+                await asyncio.to_thread(tracker.succeeded, chunk, results)
+                first_landed.set()
+
+        async def upload_all():
+            workers = [asyncio.ensure_future(upload_worker()) for _ in range(max(1, min(concurrency, total)))]
+            try:
+                await asyncio.gather(*workers)
+            except BaseException:
+                for worker in workers:
+                    worker.cancel()
+                raise
+
+        async def uploader():
+            nonlocal chunks
+            try:
+                await upload_all()
+                for delay, retries in tracker.retry_rounds():
+                    await asyncio.sleep(delay)
+                    chunks = iter(retries)
+                    await upload_all()
+            finally:
+                uploads_done.set()
+                first_landed.set()
+
+        async def poller():
+            scheduler = PollScheduler(initial_interval=POLL_INTERVAL)
+            deadline = None
+            await first_landed.wait()
+            while True:
+                # Read before counting, so uploads that land during a long poll aren't taken as verified
+                uploaded = uploads_done.is_set()
+                landed = already_submitted + len(tracker.new_ids) + len(tracker.completed_ids)
+                if not landed:
+                    return False
+                if uploaded and run_state.running + run_state.completed >= landed:
+                    return False  # verified by the last poll, before the uploads finished
+                # A streaming poller blocks until the server pushes a change or a heartbeat
+                changes, response = await to_daemon_thread(job_poller.poll, run_state)
+                verified = run_state.running + run_state.completed
+                progress.update(verify_task, completed=verified)
+                if uploaded:
+                    # Only uploaded predictions can be running, so verification is done once all have landed
+                    if verified >= landed:
+                        return False
+                    deadline = deadline or time.monotonic() + timeout
+                    if time.monotonic() > deadline:
+                        return True
+                if getattr(job_poller, 'streaming', False):
+                    continue
+                if uploaded:
+                    changed = len(changes['running']) + len(changes['completed'])
+                    await asyncio.sleep(scheduler.next_interval(changed, landed - verified, response))
+                else:
+                    # Polls made while uploads still land say nothing about the completion rate,
+                    # so they don't back the scheduler off; re-poll as soon as the last upload lands
+                    try:
+                        await asyncio.wait_for(uploads_done.wait(), get_retry_after(response) or scheduler.interval)
+                    except asyncio.TimeoutError:
+                        pass
+
+        upload = asyncio.ensure_future(uploader())
+        poll = asyncio.ensure_future(poller()) if verify else None
+        try:
+            await upload
+            timed_out = await poll if poll else False
+        finally:
+            if poll and not poll.done():
+                poll.cancel()
+                # A poll still waiting on the stream then ends at the next heartbeat
+                if hasattr(job_poller, 'close'):
+                    job_poller.close()
+    return tracker.new_ids, tracker.completed_ids, timed_out
+
+
+def submit_predictions_async(
+    predictions: Iterable[dict],
+    api: SWEBenchClient,
+    payload_base: dict,
+    run_state: RunProgress,
+    job_poller,
+    *,
+    batch: bool = False,
+    verify: bool = True,
+    timeout: int = 60 * 5,
+    already_submitted: int = 0,
+    journal: Optional[SubmissionJournal] = None,
+    fail_fast: bool = True,
+    failures: Optional[UploadFailures] = None,
+) -> tuple[list[str], list[str]]:
+    """Run the asyncio engine with progress bars and return new and completed IDs."""
+    console = make_console()
+    progress = EventProgress() if is_ndjson() else Progress(
+        SpinnerColumn(),
+        TextColumn("[blue]{task.description}..."),
+        BarColumn(),
+        TaskProgressColumn(text_format="[progress.percentage]{task.percentage:>3.1f}%"),
+        TimeElapsedColumn(),
+        console=console,
+    )
+    try:
+        with progress:
+            new_ids, all_completed_ids, timed_out = asyncio.run(submit_and_verify(
+                predictions,
+                api,
+                payload_base,
+                run_state,
+                job_poller,
+                progress,
+                batch=batch,
+                verify=verify,
+                timeout=timeout,
+                already_submitted=already_submitted,
+                journal=journal,
+                fail_fast=fail_fast,
+                failures=failures,
+            ))
+    except Exception as e:
+        console.print(f"[red]Error during task: {str(e)}[/]")
+        emit("error", task="submitted", message=str(e))
+        raise
+    console.print("[green]✓ Submitting predictions complete![/]")
+    print_submission_summary(console, new_ids, all_completed_ids, failures.failed_ids if failures else [])
+    if timed_out:
+        console.print(f"[red]✗ Processing submission timed out after {timeout} seconds. Try re-running submit to continue.[/]")
+        emit("timeout", task="running", done=run_state.running + run_state.completed, total=run_state.total, timeout=timeout)
+        sys.exit(1)
+    if verify:
+        console.print("[green]✓ Processing submission complete![/]")
+    return new_ids, all_completed_ids
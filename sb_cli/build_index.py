@@ -0,0 +1,29 @@
+import time
+import typer
+from rich.console import Console
+from sb_cli.prediction_index import build_index as write_index, index_path
+
+app = typer.Typer(help="Index prediction files for fast subset submits")
+
+
+def build_index(
+    predictions_paths: list[str] = typer.Argument(..., help="JSONL prediction files to index"),
+):
+    """Write a sidecar index so subsets of large prediction files are read without parsing the whole file."""
+    console = Console()
+    failed = False
+    for predictions_path in predictions_paths:
+        start = time.monotonic()
+        try:
+            with console.status(f"[blue]Indexing {predictions_path}..."):
+                index = write_index(predictions_path)
+        except (OSError, ValueError) as e:
+            console.print(f"[red]✗ Could not index {predictions_path}: {str(e)}[/]")
+            failed = True
+            continue
+        console.print(
+            f"[green]✓ Indexed {len(index['entries'])} predictions from {predictions_path} "
+            f"in {time.monotonic() - start:.1f}s - saved to {index_path(predictions_path)}[/]"
+        )
+    if failed:
+        raise typer.Exit(1)
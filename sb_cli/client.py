@@ -0,0 +1,389 @@
+import os
+from pathlib import Path
+from typing import Callable, Optional, Union
+import requests
+from sb_cli.config import API_BASE_URL, MAX_PATCH_BYTES, SUBMIT_WORKERS, USE_DAEMON, Subset
+from sb_cli.failures import UploadFailures
+from sb_cli.journal import SubmissionJournal
+from sb_cli.report_cache import ReportCache, report_key
+from sb_cli.run_state import InstanceIndex, RunProgress
+from sb_cli.utils import api_request, get_capabilities, get_request_encoding, get_session, verify_response
+
+
+def subset_value(subset: Union[Subset, str]) -> str:
+    return subset.value if isinstance(subset, Subset) else subset
+
+
+class SWEBenchClient:
+    """
+    Client for the SWE-bench API that keeps its state across operations.
+
+    The API key, base URL, pooled connections, negotiated capabilities and the
+    report cache are set up once, so a long-lived process can run thousands of
+    operations without re-creating any of them. All methods are thread-safe, and
+    each has an `_async` variant that runs it in a worker thread. When the local
+    daemon (`sb-cli daemon start`) is running, polls, run lists and reports go
+    through it so concurrent processes share them.
+
+        client = SWEBenchClient(api_key="...")
+        result = client.submit("swe-bench_lite", "dev", "preds.jsonl", run_id="my-run")
+        client.wait("swe-bench_lite", "dev", "my-run", result["instance_ids"])
+        report, _ = client.get_report("swe-bench_lite", "dev", "my-run")
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = API_BASE_URL,
+        session: Optional[requests.Session] = None,
+        report_cache: Union[ReportCache, bool] = True,
+        use_daemon: bool = USE_DAEMON,
+    ):
+        self.api_key = api_key if api_key is not None else os.getenv("SWEBENCH_API_KEY")
+        self.base_url = base_url.rstrip("/")
+        # Clients share the process-wide connection pool unless given their own session
+        self.session = session or get_session()
+        if report_cache is True:
+            report_cache = ReportCache()
+        self.report_cache = report_cache or None
+        self.use_daemon = use_daemon
+
+    @property
+    def headers(self) -> dict:
+        return {"x-api-key": self.api_key} if self.api_key else {}
+
+    def request(self, method: str, endpoint: str, *, headers: Optional[dict] = None, **kwargs) -> requests.Response:
+        """`api_request` against this client's API with its key and connection pool."""
+        return api_request(
+            method,
+            endpoint,
+            session=self.session,
+            base_url=self.base_url,
+            headers={**self.headers, **(headers or {})},
+            **kwargs,
+        )
+
+    def daemon_call(self, op: str, **fields) -> Optional[dict]:
+        """Send a request to the local daemon; returns None if it isn't running."""
+        if not self.use_daemon:
+            return None
+        from sb_cli.daemon import daemon_call
+        return daemon_call(op, api_key=self.api_key, base_url=self.base_url, **fields)
+
+    @property
+    def capabilities(self) -> frozenset:
+        return get_capabilities(self.base_url, self.session)
+
+    @property
+    def request_encoding(self) -> Optional[str]:
+        return get_request_encoding(self.base_url, self.session)
+
+    def list_runs(self, subset: Union[Subset, str], split: str) -> list[str]:
+        """Return the IDs of all runs for a subset and split."""
+        reply = self.daemon_call("list_runs", subset=subset_value(subset), split=split)
+        if reply is not None:
+            return reply['run_ids']
+        response = self.request("post", "list-runs", json={"split": split, "subset": subset_value(subset)})
+        verify_response(response)
+        return response.json()['run_ids']
+
+    def get_quotas(self) -> dict:
+        """Return remaining runs as {subset: {split: count}}."""
+        response = self.request("get", "get-quotas")
+        verify_response(response)
+        return response.json()["remaining_quotas"]
+
+    def delete_run(self, subset: Union[Subset, str], split: str, run_id: str) -> dict:
+        """Delete a run and return the API's response."""
+        payload = {"run_id": run_id, "split": split, "subset": subset_value(subset)}
+        response = self.request("delete", "delete-run", json=payload)
+        verify_response(response)
+        return response.json()
+
+    def get_report(
+        self,
+        subset: Union[Subset, str],
+        split: str,
+        run_id: str,
+        extra: Optional[dict] = None,
+        use_cache: bool = True,
+    ) -> tuple[dict, bool]:
+        """
+        Fetch the /get-report response for a run, revalidating the report cache.
+
+        Returns the response and whether it was unchanged since it was cached (a 304).
+        """
+        subset = subset_value(subset)
+        reply = self.daemon_call(
+            "get_report", subset=subset, split=split, run_id=run_id, extra=extra, use_cache=use_cache
+        )
+        if reply is not None:
+            return reply['response'], reply['unchanged']
+        payload = {'run_id': run_id, 'subset': subset, 'split': split, **(extra or {})}
+        cache = self.report_cache if use_cache else None
+        key = report_key(subset, split, run_id, extra)
+        entry = cache.lookup(key) if cache else None
+        response = self.request(
+            "post", "get-report", json=payload, headers=cache.conditional_headers(entry) if entry else None
+        )
+        if response.status_code == 304 and entry:
+            cache.touch(key)
+            return cache.load(entry), True
+        verify_response(response)
+        if cache:
+            cache.store(
+                key,
+                response.content,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified'),
+            )
+        return response.json(), False
+
+    def get_results(
+        self,
+        subset: Union[Subset, str],
+        split: str,
+        run_id: str,
+        instance_ids: list[str],
+    ) -> dict[str, str]:
+        """
+        Return the evaluation outcome ('resolved', 'unresolved' or 'error') of each of
+        `instance_ids` that has finished, from /get-results.
+
+        Only available when the API advertises the "instance-results" capability.
+        """
+        payload = {"run_id": run_id, "split": split, "subset": subset_value(subset), "instance_ids": instance_ids}
+        response = self.request("post", "get-results", json=payload, compress=True)
+        verify_response(response)
+        return response.json()["results"]
+
+    def get_reports(
+        self,
+        subset: Union[Subset, str],
+        split: str,
+        run_ids: list[str],
+        *,
+        max_workers: int = SUBMIT_WORKERS,
+        use_cache: bool = True,
+        on_fetched: Optional[Callable[[str], None]] = None,
+    ) -> tuple[dict, dict]:
+        """
+        Fetch the reports of many runs concurrently through the report cache.
+
+        Returns {run_id: report} for the runs that could be fetched and {run_id: error}
+        for the rest; `on_fetched` is called with each run ID as it finishes.
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        reports, errors = {}, {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(run_ids)))) as executor:
+            futures = {
+                executor.submit(self.get_report, subset, split, run_id, use_cache=use_cache): run_id
+                for run_id in run_ids
+            }
+            for future in as_completed(futures):
+                run_id = futures[future]
+                try:
+                    reports[run_id] = future.result()[0]['report']
+                except Exception as e:
+                    errors[run_id] = e
+                if on_fetched:
+                    on_fetched(run_id)
+        return reports, errors
+
+    def poller(self, subset: Union[Subset, str], split: str, run_id: str, shared: bool = True, stream: bool = False):
+        """
+        A poller for a run, for polling it repeatedly with conditional requests.
+
+        With `shared` and the daemon running, the poller reads the run's state from the
+        daemon's poll schedule instead, falling back to the API if the daemon stops.
+        Otherwise, with `stream` and an API that pushes job events, each poll waits for
+        the next change pushed over /job-events, falling back to polling if the stream fails.
+        """
+        subset = subset_value(subset)
+        if shared and self.use_daemon:
+            from sb_cli.daemon import DaemonPoller, connect_daemon
+            connection = connect_daemon()
+            if connection:
+                return DaemonPoller(connection, self, subset=subset, split=split, run_id=run_id)
+        if stream and "job-events" in self.capabilities:
+            from sb_cli.job_stream import JobEventStream
+            return JobEventStream(self, subset=subset, split=split, run_id=run_id)
+        from sb_cli.polling import JobPoller
+        return JobPoller(self, subset=subset, split=split, run_id=run_id)
+
+    def poll(self, subset: Union[Subset, str], split: str, run_id: str) -> dict:
+        """Return the running and completed instance IDs of a run."""
+        payload = {'run_id': run_id, 'subset': subset_value(subset), 'split': split}
+        response = self.request("get", "poll-jobs", json=payload)
+        verify_response(response)
+        results = response.json()
+        return {'running': results.get('running', []), 'completed': results.get('completed', [])}
+
+    def wait(
+        self,
+        subset: Union[Subset, str],
+        split: str,
+        run_id: str,
+        instance_ids: list[str],
+        *,
+        until_evaluated: bool = True,
+        timeout: Optional[float] = None,
+        on_update: Optional[Callable[[RunProgress], None]] = None,
+    ) -> RunProgress:
+        """
+        Poll until every instance is evaluated (or, without `until_evaluated`, running).
+
+        Job events pushed by the API are used instead of polling when it offers them.
+        Returns the final RunProgress; check its counts to see whether it finished
+        before the timeout, which defaults to the CLI's evaluation timeout.
+        """
+        from sb_cli.polling import PollScheduler, default_timeout, poll_until
+
+        run_state = RunProgress(InstanceIndex(instance_ids))
+        if until_evaluated:
+            is_done = lambda: run_state.completed == run_state.total
+            remaining = lambda: run_state.total - run_state.completed
+            timeout = timeout or default_timeout(60 * 10, run_state.total, 0.5)
+        else:
+            is_done = lambda: run_state.pending == 0
+            remaining = lambda: run_state.pending
+            timeout = timeout or default_timeout(60 * 5, run_state.total, 0.1)
+        poller = self.poller(subset, split, run_id, stream=True)
+        try:
+            poll_until(
+                poller,
+                run_state,
+                PollScheduler(initial_interval=15 if until_evaluated else 8),
+                is_done=is_done,
+                remaining=remaining,
+                timeout=timeout,
+                on_update=(lambda: on_update(run_state)) if on_update else None,
+            )
+        finally:
+            if hasattr(poller, 'close'):
+                poller.close()
+        return run_state
+
+    def submit(
+        self,
+        subset: Union[Subset, str],
+        split: str,
+        predictions_path: str,
+        run_id: str = "PARENT",
+        *,
+        instance_ids: Optional[list[str]] = None,
+        batch: bool = True,
+        fail_fast: bool = False,
+        journal_dir: Optional[str] = None,
+        validate: bool = True,
+        max_patch_bytes: int = MAX_PATCH_BYTES,
+        skip_invalid: bool = False,
+        strict: bool = False,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> dict:
+        """
+        Upload a predictions file without waiting for evaluation.
+
+        Predictions the journal in `journal_dir` or the API already has are skipped,
+        and uploads that fail are retried and reported under `failures` rather than
+        raised, unless `fail_fast`. Patches are validated locally first: invalid
+        ones are reported under `invalid` (and in a validation report in
+        `journal_dir`) and still uploaded, unless `skip_invalid` leaves them out
+        or `strict` raises a ValueError instead.
+        `on_progress` is called with the number of predictions each finished
+        upload covered.
+        """
+        from sb_cli.submit import (
+            create_submit_context,
+            deduplicate_submission,
+            iter_pending_predictions,
+            patch_region_threshold,
+            prepare_submission,
+            resolve_run_id,
+            upload_predictions,
+            validate_submission,
+        )
+
+        subset = subset_value(subset)
+        run_id = resolve_run_id(Path(predictions_path), run_id)
+        journal = SubmissionJournal.for_run(journal_dir, subset, split, run_id) if journal_dir else None
+        submit_ids, invalid = instance_ids, {}
+        if validate:
+            submit_ids, invalid = validate_submission(
+                predictions_path,
+                instance_ids,
+                max_patch_bytes,
+                skip_invalid,
+                Path(journal_dir) / f"{subset}__{split}__{run_id}.validation.json" if journal_dir else None,
+                strict,
+            )
+        patch_hashes, skipped_ids, _ = prepare_submission(predictions_path, submit_ids, journal)
+        skipped_ids, references = deduplicate_submission(
+            self, subset, split, run_id, patch_hashes, skipped_ids, journal
+        )
+        new_ids, all_completed_ids = [], []
+        failures = UploadFailures()
+        if len(skipped_ids) < len(patch_hashes):
+            payload_base = create_submit_context(
+                self, {"split": split, "subset": subset, "instance_ids": instance_ids, "run_id": run_id}
+            )
+            new_ids, all_completed_ids = upload_predictions(
+                self,
+                iter_pending_predictions(
+                    predictions_path, submit_ids, skipped_ids, references, patch_region_threshold(self)
+                ),
+                payload_base,
+                batch=batch and "batch-submit" in self.capabilities,
+                journal=journal,
+                fail_fast=fail_fast,
+                failures=failures,
+                on_advance=on_progress,
+            )
+        failed = set(failures.failures)
+        return {
+            "run_id": run_id,
+            "instance_ids": [instance_id for instance_id in patch_hashes if instance_id not in failed],
+            "new_ids": new_ids,
+            "already_submitted_ids": all_completed_ids,
+            "skipped_ids": skipped_ids,
+            "referenced_ids": list(references),
+            "failures": failures.failures,
+            "invalid": invalid,
+        }
+
+    async def submit_async(self, *args, **kwargs) -> dict:
+        import asyncio
+        return await asyncio.to_thread(self.submit, *args, **kwargs)
+
+    async def wait_async(self, *args, **kwargs) -> RunProgress:
+        import asyncio
+        return await asyncio.to_thread(self.wait, *args, **kwargs)
+
+    async def poll_async(self, *args, **kwargs) -> dict:
+        import asyncio
+        return await asyncio.to_thread(self.poll, *args, **kwargs)
+
+    async def get_report_async(self, *args, **kwargs) -> tuple[dict, bool]:
+        import asyncio
+        return await asyncio.to_thread(self.get_report, *args, **kwargs)
+
+    async def get_results_async(self, *args, **kwargs) -> dict[str, str]:
+        import asyncio
+        return await asyncio.to_thread(self.get_results, *args, **kwargs)
+
+    async def get_reports_async(self, *args, **kwargs) -> tuple[dict, dict]:
+        import asyncio
+        return await asyncio.to_thread(self.get_reports, *args, **kwargs)
+
+    async def list_runs_async(self, *args, **kwargs) -> list[str]:
+        import asyncio
+        return await asyncio.to_thread(self.list_runs, *args, **kwargs)
+
+    async def delete_run_async(self, *args, **kwargs) -> dict:
+        import asyncio
+        return await asyncio.to_thread(self.delete_run, *args, **kwargs)
+
+    async def get_quotas_async(self, *args, **kwargs) -> dict:
+        import asyncio
+        return await asyncio.to_thread(self.get_quotas, *args, **kwargs)
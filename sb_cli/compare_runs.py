@@ -0,0 +1,179 @@
+import csv
+import typer
+from pathlib import Path
+from typing import Optional
+from rich.console import Console
+from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn, TimeElapsedColumn
+from rich.table import Table
+from sb_cli.client import SWEBenchClient
+from sb_cli.config import SUBMIT_WORKERS, MatrixFormat, Subset
+
+app = typer.Typer(help="Compare evaluation reports across runs")
+
+# Per-instance outcome codes in the comparison matrix; empty means not evaluated in that run
+RESOLVED, UNRESOLVED, ERROR = "R", "U", "E"
+OUTCOME_KEYS = ((RESOLVED, 'resolved_ids'), (UNRESOLVED, 'unresolved_ids'), (ERROR, 'error_ids'))
+
+
+def build_matrix(reports: dict[str, dict]) -> tuple[list[str], dict[str, list[str]]]:
+    """
+    Lay out per-instance outcomes as columns: the sorted instance IDs of all runs, and
+    for each run a column of outcome codes aligned with them.
+    """
+    outcomes = {
+        run_id: {instance_id: code for code, key in OUTCOME_KEYS for instance_id in report.get(key, ())}
+        for run_id, report in reports.items()
+    }
+    instance_ids = sorted({instance_id for run_outcomes in outcomes.values() for instance_id in run_outcomes})
+    columns = {
+        run_id: [run_outcomes.get(instance_id, "") for instance_id in instance_ids]
+        for run_id, run_outcomes in outcomes.items()
+    }
+    return instance_ids, columns
+
+
+def summarize(reports: dict[str, dict]) -> list[dict]:
+    """Per-run counts and resolve rates from the report headers, best run first."""
+    rows = []
+    for run_id, report in reports.items():
+        total = report.get('total_instances') or 0
+        submitted = report.get('submitted_instances') or 0
+        resolved = report.get('resolved_instances') or 0
+        rows.append({
+            'run_id': run_id,
+            'resolved': resolved,
+            'unresolved': report.get('unresolved_instances') or 0,
+            'errors': report.get('error_instances') or 0,
+            'pending': report.get('pending_instances') or 0,
+            'submitted': submitted,
+            'total': total,
+            'resolved_rate': resolved / total if total else 0.0,
+            'resolved_submitted_rate': resolved / submitted if submitted else 0.0,
+        })
+    rows.sort(key=lambda row: (-row['resolved_rate'], row['run_id']))
+    return rows
+
+
+def write_csv_matrix(path: Path, instance_ids: list[str], columns: dict[str, list[str]]):
+    run_ids = list(columns)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['instance_id', *run_ids])
+        writer.writerows(zip(instance_ids, *(columns[run_id] for run_id in run_ids)))
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet output requires pyarrow - install it with `pip install 'sb-cli[parquet]'`")
+    return pyarrow
+
+
+def write_parquet_matrix(path: Path, instance_ids: list[str], columns: dict[str, list[str]]):
+    pa = import_pyarrow()
+    table = pa.table({
+        'instance_id': pa.array(instance_ids),
+        # Each column holds a handful of distinct codes, so dictionary encoding keeps it tiny
+        **{run_id: pa.array(column).dictionary_encode() for run_id, column in columns.items()},
+    })
+    pa.parquet.write_table(table, path)
+
+
+def write_summary(path: Path, rows: list[dict]):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ['run_id'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def compare_runs(
+    subset: Subset = typer.Argument(..., help="Subset of the runs"),
+    split: str = typer.Argument(..., help="Split of the runs"),
+    run_ids: Optional[list[str]] = typer.Argument(None, help="Run IDs to compare - (defaults to all runs)"),
+    output_dir: str = typer.Option('sb-cli-reports', '--output_dir', '-o', help="Directory to save the comparison files"),
+    matrix_format: MatrixFormat = typer.Option(MatrixFormat.csv, '--format', help="Format of the per-instance matrix - parquet requires pyarrow"),
+    workers: int = typer.Option(SUBMIT_WORKERS, '--workers', help="Number of reports to fetch concurrently"),
+    use_cache: int = typer.Option(1, '--cache', help="Revalidate locally cached reports instead of re-downloading unchanged ones"),
+    api_key: Optional[str] = typer.Option(
+        None,
+        '--api_key',
+        help="API key to use - (defaults to SWEBENCH_API_KEY)",
+        envvar="SWEBENCH_API_KEY"
+    ),
+):
+    """Fetch reports for many runs concurrently and compare them per instance."""
+    if matrix_format == MatrixFormat.parquet:
+        import_pyarrow()  # fail before fetching anything
+    console = Console()
+    client = SWEBenchClient(api_key)
+    if not run_ids:
+        with console.status("[blue]Fetching runs..."):
+            run_ids = client.list_runs(subset.value, split)
+    run_ids = list(dict.fromkeys(run_ids))
+    if not run_ids:
+        console.print(f"[yellow]No runs found for subset {subset.value} and split {split}[/]")
+        return
+
+    progress = Progress(
+        SpinnerColumn(),
+        TextColumn("[blue]Fetching reports..."),
+        BarColumn(),
+        TaskProgressColumn(text_format="[progress.percentage]{task.percentage:>3.1f}%"),
+        TimeElapsedColumn(),
+        console=console,
+    )
+    with progress:
+        task = progress.add_task("", total=len(run_ids))
+        reports, errors = client.get_reports(
+            subset.value,
+            split,
+            run_ids,
+            max_workers=workers,
+            use_cache=bool(use_cache),
+            on_fetched=lambda run_id: progress.update(task, advance=1),
+        )
+    for run_id, error in errors.items():
+        console.print(f"[red]✗ Could not fetch the report for {run_id}: {str(error)}[/]")
+    # Keep the requested run order for the matrix columns
+    reports = {run_id: reports[run_id] for run_id in run_ids if run_id in reports}
+    if not reports:
+        raise typer.Exit(1)
+
+    rows = summarize(reports)
+    instance_ids, columns = build_matrix(reports)
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    name = f"{subset.value}__{split}__comparison"
+    summary_path = output_path / f"{name}.summary.csv"
+    write_summary(summary_path, rows)
+    matrix_path = output_path / f"{name}.{matrix_format.value}"
+    if matrix_format == MatrixFormat.parquet:
+        write_parquet_matrix(matrix_path, instance_ids, columns)
+    else:
+        write_csv_matrix(matrix_path, instance_ids, columns)
+
+    table = Table(title=f"Runs ({subset.value} - {split})")
+    table.add_column("Run ID", style="cyan")
+    for column in ["Resolved", "% Total", "% Submitted", "Errors", "Pending", "Submitted"]:
+        table.add_column(column, justify="right")
+    for row in rows:
+        table.add_row(
+            row['run_id'],
+            f"{row['resolved']} / {row['total']}",
+            f"{row['resolved_rate']:.2%}",
+            f"{row['resolved_submitted_rate']:.2%}",
+            str(row['errors']),
+            str(row['pending']),
+            str(row['submitted']),
+        )
+    console.print(table)
+    resolved_by = [sum(column[i] == RESOLVED for column in columns.values()) for i in range(len(instance_ids))]
+    console.print(
+        f"  {sum(1 for count in resolved_by if count)} instances resolved by any run, "
+        f"{sum(1 for count in resolved_by if count == len(columns))} by every run"
+    )
+    console.print(f"[green]  Saved summary to {summary_path} and per-instance outcomes to {matrix_path}[/]")
+    if errors:
+        raise typer.Exit(1)
@@ -3,7 +3,51 @@ from enum import Enum
 
 API_BASE_URL = os.getenv("SWEBENCH_API_URL", "https://api.swebench.com")
 
+# Number of concurrent upload workers; the shared HTTP connection pool is sized to match
+SUBMIT_WORKERS = int(os.getenv("SWEBENCH_SUBMIT_WORKERS", "24"))
+# Retries for transient failures (connection errors, 429 and 5xx responses)
+MAX_RETRIES = int(os.getenv("SWEBENCH_MAX_RETRIES", "5"))
+# Optional cap on requests per second across all API calls
+MAX_REQUESTS_PER_SECOND = float(os.getenv("SWEBENCH_MAX_RPS", "0")) or None
+# Patches larger than this are rejected before anything is uploaded
+MAX_PATCH_BYTES = int(os.getenv("SWEBENCH_MAX_PATCH_BYTES", str(1024 * 1024)))
+# Request bodies at least this large are streamed in chunks when the API accepts chunked uploads
+STREAM_BODY_MIN_BYTES = int(os.getenv("SWEBENCH_STREAM_MIN_BYTES", str(1024 * 1024)))
+
 class Subset(str, Enum):
     swe_bench_m = 'swe-bench-m'
     swe_bench_lite = 'swe-bench_lite'
     swe_bench_verified = 'swe-bench_verified'
+
+class Engine(str, Enum):
+    threads = 'threads'
+    asyncio = 'asyncio'
+
+# Local cache of fetched reports, evicted by total size and age
+REPORT_CACHE_DIR = os.getenv("SWEBENCH_REPORT_CACHE_DIR") or os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "sb-cli", "reports"
+)
+REPORT_CACHE_MAX_BYTES = int(os.getenv("SWEBENCH_REPORT_CACHE_MAX_MB", "256")) * 1024 * 1024
+REPORT_CACHE_MAX_AGE = int(os.getenv("SWEBENCH_REPORT_CACHE_MAX_AGE_DAYS", "30")) * 24 * 60 * 60
+
+# Unix socket of the optional local tracking daemon; commands use it when it is running
+# unless SWEBENCH_DAEMON=0
+DAEMON_SOCKET = os.getenv("SWEBENCH_DAEMON_SOCKET") or os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "sb-cli", "daemon.sock"
+)
+USE_DAEMON = os.getenv("SWEBENCH_DAEMON", "1") != "0"
+# The daemon exits after this many seconds without requests or runs to poll
+DAEMON_IDLE_TIMEOUT = int(os.getenv("SWEBENCH_DAEMON_IDLE_TIMEOUT", "3600"))
+
+class DaemonAction(str, Enum):
+    start = 'start'
+    stop = 'stop'
+    status = 'status'
+
+class OutputFormat(str, Enum):
+    text = 'text'
+    ndjson = 'ndjson'
+
+class MatrixFormat(str, Enum):
+    csv = 'csv'
+    parquet = 'parquet'
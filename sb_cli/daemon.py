@@ -0,0 +1,483 @@
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+import typer
+from rich.console import Console
+from rich.table import Table
+from sb_cli.config import DAEMON_IDLE_TIMEOUT, DAEMON_SOCKET, SUBMIT_WORKERS, USE_DAEMON, DaemonAction
+from sb_cli.polling import JobPoller, PollScheduler
+from sb_cli.run_state import COMPLETED, PENDING, RUNNING
+
+app = typer.Typer(help="Run a local daemon that shares API polling between sb-cli processes")
+
+# A run stops being polled once no command has asked about it for this many seconds
+RUN_IDLE_TIMEOUT = 15 * 60
+# Longest a command waits for the first poll of a run the daemon just started tracking
+FIRST_POLL_TIMEOUT = 30
+# Longest a poll request is held waiting for the run's state to change
+WATCH_TIMEOUT = 30
+# list-runs results and unchanged reports are served from memory for this many seconds
+RESPONSE_TTL = 30
+CONNECT_TIMEOUT = 1
+
+
+class DaemonConnection:
+    """A connection to the daemon; requests and replies are single JSON lines."""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.file = sock.makefile('rwb')
+
+    def call(self, op: str, **fields) -> dict:
+        self.file.write(json.dumps({'op': op, **fields}).encode() + b'\n')
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("The sb-cli daemon closed the connection")
+        reply = json.loads(line)
+        if not reply.get('ok'):
+            raise RuntimeError(f"sb-cli daemon: {reply.get('error')}")
+        return reply
+
+    def close(self):
+        try:
+            self.file.close()
+        except OSError:
+            pass  # the daemon is gone, so the unsent request can't be flushed
+        self.sock.close()
+
+
+def connect_daemon(socket_path: str = DAEMON_SOCKET) -> Optional[DaemonConnection]:
+    """Connect to the daemon, or return None if it isn't running."""
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(socket_path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    # Replies can wait for a run's first poll, which retries with backoff
+    sock.settimeout(None)
+    return DaemonConnection(sock)
+
+
+def daemon_call(op: str, socket_path: str = DAEMON_SOCKET, **fields) -> Optional[dict]:
+    """Send one request to the daemon; returns None if it isn't running or went away."""
+    if not USE_DAEMON:
+        return None
+    connection = connect_daemon(socket_path)
+    if connection is None:
+        return None
+    try:
+        return connection.call(op, **fields)
+    except OSError:
+        return None
+    finally:
+        connection.close()
+
+
+class DaemonPoller:
+    """
+    JobPoller stand-in that reads a run's state from the daemon instead of the API.
+
+    The daemon polls each run once for all the commands watching it; this only asks
+    for the state changes since its last call, and the daemon holds the reply until
+    there are some. If the daemon goes away, polling carries on against the API directly.
+    """
+
+    def __init__(self, connection: DaemonConnection, client, *, subset: str, split: str, run_id: str):
+        self.connection = connection
+        self.client = client
+        self.payload = {'run_id': run_id, 'subset': subset, 'split': split}
+        self.cursor = 0
+        self.fallback = None
+
+    @property
+    def streaming(self) -> bool:
+        """Whether the daemon spaces out the polls, rather than the caller."""
+        return self.fallback is None
+
+    def poll(self, run_state) -> tuple[dict, object]:
+        if self.fallback:
+            return self.fallback.poll(run_state)
+        try:
+            reply = self.connection.call(
+                'poll',
+                api_key=self.client.api_key,
+                base_url=self.client.base_url,
+                total=run_state.total,
+                since=self.cursor,
+                **self.payload,
+            )
+        except OSError:
+            self.connection.close()
+            self.fallback = JobPoller(self.client, **self.payload)
+            return self.fallback.poll(run_state)
+        if reply['poll_error'] and not reply['cursor']:
+            raise RuntimeError(f"Error polling run {self.payload['run_id']}: {reply['poll_error']}")
+        self.cursor = reply['cursor']
+        return run_state.update(reply), None
+
+    def close(self):
+        self.connection.close()
+        if hasattr(self.fallback, 'close'):
+            self.fallback.close()
+
+
+class TrackedRun:
+    """
+    State of one run shared by every command watching it.
+
+    Implements `update` like RunProgress so JobPoller can apply polls to it, but keeps
+    the state changes in order so each watcher can read the ones it hasn't seen.
+    """
+
+    def __init__(self, client, subset: str, split: str, run_id: str):
+        self.name = f"{subset}/{split}/{run_id}"
+        self.poller = JobPoller(client, subset=subset, split=split, run_id=run_id)
+        self.scheduler = PollScheduler(initial_interval=8)
+        self.states = {}
+        self.changes = []  # (instance_id, state) in the order they were seen
+        self.completed = 0
+        self.total = 0  # the largest submission a watcher is waiting for
+        self.polled = threading.Event()
+        self.polls = 0
+        self.polling = False
+        self.error = None
+        self.next_poll = 0.0
+        self.last_access = time.monotonic()
+
+    def update(self, results: dict) -> dict:
+        changed = {'running': [], 'completed': []}
+        for key, state in (('completed', COMPLETED), ('running', RUNNING)):
+            for instance_id in results.get(key, ()):
+                if self.states.get(instance_id, PENDING) >= state:
+                    continue
+                self.states[instance_id] = state
+                self.changes.append((instance_id, state))
+                self.completed += state == COMPLETED
+                changed[key].append(instance_id)
+        return changed
+
+    def changes_since(self, cursor: int) -> dict:
+        changes = self.changes[cursor:]
+        return {
+            'running': [instance_id for instance_id, state in changes if state == RUNNING],
+            'completed': [instance_id for instance_id, state in changes if state == COMPLETED],
+            'cursor': cursor + len(changes),
+        }
+
+    @property
+    def finished(self) -> bool:
+        return bool(self.total) and self.completed >= self.total
+
+    @property
+    def remaining(self) -> int:
+        return max(self.total - self.completed, 1)
+
+
+class Tracker:
+    """
+    Polls every tracked run on one schedule and answers requests from its cache.
+
+    Runs are keyed by API key, base URL, subset, split and run ID, so any number of
+    commands watching a run cost one poll stream. Each run keeps the adaptive
+    PollScheduler interval, and polls of different runs go through a shared pool.
+    """
+
+    def __init__(self, workers: int = SUBMIT_WORKERS):
+        from sb_cli.client import SWEBenchClient
+
+        self.client_class = SWEBenchClient
+        self.clients = {}
+        self.runs = {}
+        self.responses = {}
+        self.condition = threading.Condition()
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.started = time.time()
+        self.last_request = time.monotonic()
+        self.stopped = threading.Event()
+
+    def client(self, request: dict):
+        key = (request.get('api_key'), request.get('base_url'))
+        with self.condition:
+            if key not in self.clients:
+                # The daemon's own clients must talk to the API, not back to the daemon
+                self.clients[key] = self.client_class(key[0], **({'base_url': key[1]} if key[1] else {}), use_daemon=False)
+            return self.clients[key]
+
+    def handle(self, request: dict) -> dict:
+        self.last_request = time.monotonic()
+        op = request.get('op')
+        if op == 'ping':
+            return {'pid': os.getpid()}
+        if op == 'status':
+            return self.status()
+        if op == 'stop':
+            self.stopped.set()
+            with self.condition:
+                self.condition.notify_all()
+            return {}
+        if op == 'poll':
+            return self.poll(request)
+        if op == 'list_runs':
+            run_ids, _ = self.cached(
+                request, ('subset', 'split'), lambda client: client.list_runs(request['subset'], request['split'])
+            )
+            return {'run_ids': run_ids}
+        if op == 'get_report':
+            return self.get_report(request)
+        raise ValueError(f"Unknown request: {op}")
+
+    def poll(self, request: dict) -> dict:
+        key = tuple(request.get(field) for field in ('api_key', 'base_url', 'subset', 'split', 'run_id'))
+        with self.condition:
+            run = self.runs.get(key)
+            if run is None:
+                run = self.runs[key] = TrackedRun(
+                    self.client(request), request['subset'], request['split'], request['run_id']
+                )
+            if request.get('total', 0) > run.total:
+                if run.finished:
+                    run.next_poll = 0.0  # a watcher expects more than the run had, so look again
+                run.total = request['total']
+            run.last_access = time.monotonic()
+            polls = run.polls
+            self.condition.notify_all()
+        run.polled.wait(FIRST_POLL_TIMEOUT)
+        since = request.get('since', 0)
+        with self.condition:
+            # Hold the reply until a poll of the run brings news, so watchers don't space out their own calls
+            self.condition.wait_for(
+                lambda: len(run.changes) > since or run.finished or self.stopped.is_set()
+                or (run.error and run.polls > polls),
+                WATCH_TIMEOUT,
+            )
+        return {**run.changes_since(since), 'poll_error': run.error}
+
+    def cached(self, request: dict, fields: tuple, fetch, version=None) -> tuple[object, bool]:
+        """
+        A result fetched at most once per RESPONSE_TTL while `version` is unchanged.
+
+        Returns the result and whether it came from memory.
+        """
+        key = (request.get('op'), request.get('api_key'), request.get('base_url'),
+               *(json.dumps(request.get(field), sort_keys=True) for field in fields))
+        with self.condition:
+            entry = self.responses.get(key)
+        if entry and entry[1] == version and time.monotonic() - entry[0] < RESPONSE_TTL:
+            return entry[2], True
+        result = fetch(self.client(request))
+        with self.condition:
+            self.responses[key] = (time.monotonic(), version, result)
+        return result, False
+
+    def get_report(self, request: dict) -> dict:
+        run_key = tuple(request.get(field) for field in ('api_key', 'base_url', 'subset', 'split', 'run_id'))
+        with self.condition:
+            run = self.runs.get(run_key)
+            # A report only changes as instances complete, so a tracked run's cursor versions it
+            version = len(run.changes) if run else None
+
+        def fetch(client):
+            return client.get_report(
+                request['subset'], request['split'], request['run_id'], request.get('extra'), request.get('use_cache', True)
+            )
+
+        if version is None:
+            # Nothing tells when an untracked run's report changes, so always revalidate it
+            response, unchanged = fetch(self.client(request))
+        else:
+            (response, unchanged), _ = self.cached(
+                request, ('subset', 'split', 'run_id', 'extra', 'use_cache'), fetch, version
+            )
+        return {'response': response, 'unchanged': unchanged}
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        with self.condition:
+            runs = [
+                {
+                    'run': run.name,
+                    'running': len(run.states) - run.completed,
+                    'completed': run.completed,
+                    'total': run.total,
+                    'next_poll': None if run.finished else round(max(run.next_poll - now, 0), 1),
+                    'error': run.error,
+                }
+                for run in self.runs.values()
+            ]
+        return {'pid': os.getpid(), 'uptime': round(time.time() - self.started), 'runs': runs}
+
+    def poll_run(self, run: TrackedRun):
+        try:
+            changes, response = run.poller.poll(run)
+            run.error = None
+        except Exception as e:
+            changes, response = {'running': [], 'completed': []}, None
+            run.error = str(e)
+        run.polled.set()
+        changed = len(changes['running']) + len(changes['completed'])
+        delay = run.scheduler.next_interval(changed, run.remaining, response)
+        with self.condition:
+            run.polls += 1
+            run.polling = False
+            run.next_poll = time.monotonic() + delay
+            self.condition.notify_all()
+
+    def run(self, idle_timeout: int = DAEMON_IDLE_TIMEOUT):
+        """Poll due runs until stopped, or until idle for `idle_timeout` seconds."""
+        with self.condition:
+            while not self.stopped.is_set():
+                now = time.monotonic()
+                for key, run in list(self.runs.items()):
+                    if now - run.last_access > RUN_IDLE_TIMEOUT and not run.polling:
+                        del self.runs[key]
+                active = [run for run in self.runs.values() if not run.finished]
+                if idle_timeout and not active and now - self.last_request > idle_timeout:
+                    break
+                for run in active:
+                    if not run.polling and run.next_poll <= now:
+                        run.polling = True
+                        self.executor.submit(self.poll_run, run)
+                waiting = [run.next_poll - now for run in active if not run.polling]
+                if idle_timeout:
+                    waiting.append(self.last_request + idle_timeout - now)
+                self.condition.wait(max(min(waiting, default=60), 0.05))
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        # A connection can carry many requests, e.g. every poll of one waiting command
+        for line in self.rfile:
+            try:
+                reply = {'ok': True, **self.server.tracker.handle(json.loads(line))}
+            except Exception as e:
+                reply = {'ok': False, 'error': str(e)}
+            self.wfile.write(json.dumps(reply).encode() + b'\n')
+            self.wfile.flush()
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(socket_path: str = DAEMON_SOCKET, idle_timeout: int = DAEMON_IDLE_TIMEOUT):
+    """Run the daemon in this process until it is stopped or idle."""
+    path = Path(socket_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        if daemon_call('ping', str(path)):
+            raise RuntimeError(f"An sb-cli daemon is already running on {path}")
+        path.unlink()  # left over from a daemon that didn't shut down cleanly
+    # Only this user may connect, since requests carry API keys
+    old_umask = os.umask(0o077)
+    try:
+        server = DaemonServer(str(path), DaemonHandler)
+    finally:
+        os.umask(old_umask)
+    server.tracker = Tracker()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"sb-cli daemon {os.getpid()} listening on {path}", flush=True)
+    try:
+        server.tracker.run(idle_timeout)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        path.unlink(missing_ok=True)
+    print(f"sb-cli daemon {os.getpid()} stopped", flush=True)
+
+
+def start_daemon(socket_path: str, idle_timeout: int) -> int:
+    """Start the daemon in the background and return its PID once it accepts connections."""
+    log_path = Path(socket_path).with_suffix('.log')
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, 'a') as log:
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'sb_cli.daemon', '--socket', socket_path, '--idle_timeout', str(idle_timeout)],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        reply = daemon_call('ping', socket_path)
+        if reply:
+            return reply['pid']
+        if process.poll() is not None:
+            break
+        time.sleep(0.1)
+    raise RuntimeError(f"The sb-cli daemon did not start - see {log_path}")
+
+
+def daemon(
+    action: DaemonAction = typer.Argument(..., help="start, stop or status"),
+    foreground: int = typer.Option(0, '--foreground', help="Run the daemon in this process instead of in the background"),
+    idle_timeout: int = typer.Option(DAEMON_IDLE_TIMEOUT, '--idle_timeout', help="Exit after this many seconds without requests or runs to poll - 0 to never exit"),
+    socket_path: str = typer.Option(DAEMON_SOCKET, '--socket', help="Unix socket the daemon listens on", envvar="SWEBENCH_DAEMON_SOCKET"),
+):
+    """Run a local daemon that shares API polling between sb-cli processes."""
+    console = Console()
+    if not hasattr(socket, 'AF_UNIX'):
+        raise RuntimeError("The sb-cli daemon requires Unix domain sockets, which this platform doesn't support")
+    if action == DaemonAction.start:
+        if foreground:
+            serve(socket_path, idle_timeout)
+            return
+        reply = daemon_call('ping', socket_path)
+        if reply:
+            console.print(f"[yellow]  The sb-cli daemon is already running (pid {reply['pid']})[/]")
+            return
+        pid = start_daemon(socket_path, idle_timeout)
+        console.print(f"[green]✓ Started the sb-cli daemon (pid {pid}) on {socket_path}[/]")
+    elif action == DaemonAction.stop:
+        if daemon_call('stop', socket_path) is None:
+            console.print("[yellow]  The sb-cli daemon is not running[/]")
+            return
+        console.print("[green]✓ Stopped the sb-cli daemon[/]")
+    else:
+        reply = daemon_call('status', socket_path)
+        if reply is None:
+            console.print("[yellow]  The sb-cli daemon is not running[/]")
+            raise typer.Exit(1)
+        console.print(f"[green]  sb-cli daemon (pid {reply['pid']}) up for {reply['uptime']}s on {socket_path}[/]")
+        if reply['runs']:
+            table = Table(title="Tracked runs")
+            table.add_column("Run", style="cyan")
+            for column in ["Running", "Completed", "Total", "Next poll"]:
+                table.add_column(column, justify="right")
+            table.add_column("Error", style="red")
+            for run in reply['runs']:
+                table.add_row(
+                    run['run'],
+                    str(run['running']),
+                    str(run['completed']),
+                    str(run['total']),
+                    "done" if run['next_poll'] is None else f"{run['next_poll']}s",
+                    run['error'] or "",
+                )
+            console.print(table)
+
+
+if __name__ == "__main__":
+    def run_daemon(
+        socket_path: str = typer.Option(DAEMON_SOCKET, '--socket'),
+        idle_timeout: int = typer.Option(DAEMON_IDLE_TIMEOUT, '--idle_timeout'),
+    ):
+        serve(socket_path, idle_timeout)
+
+    typer.run(run_daemon)
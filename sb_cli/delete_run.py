@@ -1,9 +1,8 @@
 import typer
-import requests
 from typing import Optional
 from rich.console import Console
-from sb_cli.config import API_BASE_URL, Subset
-from sb_cli.utils import verify_response
+from sb_cli.client import SWEBenchClient
+from sb_cli.config import Subset
 
 app = typer.Typer(help="Delete a specific run by its ID")
 
@@ -15,28 +14,9 @@ def delete_run(
 ):
     """Delete a specific run by its ID"""
     console = Console()
-    headers = {
-        "x-api-key": api_key
-    }
-    payload = {
-        "run_id": run_id,
-        "split": split,
-        "subset": subset.value
-    }
-    
     with console.status(f"[blue]Deleting run {run_id}..."):
-        response = requests.delete(
-            f"{API_BASE_URL}/delete-run",
-            headers=headers,
-            json=payload
-        )
-        verify_response(response)
-        result = response.json()
-    
-    if response.status_code == 200:
-        typer.echo(f"Run {run_id} successfully deleted for subset {subset.value} and split {split}")
-    else:
-        typer.echo(f"Failed to delete run {run_id}: {result.get('message', 'Unknown error')}")
+        SWEBenchClient(api_key).delete_run(subset, split, run_id)
+    typer.echo(f"Run {run_id} successfully deleted for subset {subset.value} and split {split}")
 
 if __name__ == "__main__":
     app()
@@ -0,0 +1,77 @@
+import json
+from pathlib import Path
+from typing import Optional
+from sb_cli.utils import is_retriable
+
+# Predictions that failed with retriable errors are held for another pass, up to this many
+MAX_RETRY_QUEUE = 1000
+# Extra passes over the retry queue after the main upload pass
+RETRY_ROUNDS = 2
+
+
+class UploadFailures:
+    """
+    Every prediction that failed to upload, with its reason.
+
+    Chunks that failed with retriable errors (connection errors, 429 and 5xx after the
+    per-request retries ran out) are also queued for another pass, up to a bounded
+    number of predictions so a mostly failing run doesn't pile up in memory.
+    """
+
+    def __init__(self, max_queued: int = MAX_RETRY_QUEUE):
+        self.failures = {}
+        self.retry_queue = []
+        self.max_queued = max_queued
+        self._queued = 0
+
+    def add(self, chunk: list[dict], error: Exception, retriable: Optional[bool] = None) -> bool:
+        """Record a failed chunk and return whether it was queued for a retry."""
+        retriable = is_retriable(error) if retriable is None else retriable
+        queued = retriable and self._queued + len(chunk) <= self.max_queued
+        if queued:
+            self.retry_queue.append(chunk)
+            self._queued += len(chunk)
+        response = getattr(error, 'response', None)
+        for pred in chunk:
+            self.failures[pred['instance_id']] = {
+                'reason': str(error),
+                'status_code': getattr(response, 'status_code', None),
+                'retriable': retriable,
+            }
+        return queued
+
+    def succeeded(self, chunk: list[dict]):
+        for pred in chunk:
+            self.failures.pop(pred['instance_id'], None)
+
+    def take_retries(self) -> list[list[dict]]:
+        chunks, self.retry_queue, self._queued = self.retry_queue, [], 0
+        return chunks
+
+    @property
+    def failed_ids(self) -> list[str]:
+        return list(self.failures)
+
+    def write_manifest(self, path: Path) -> Path:
+        """
+        Write the failures as JSON; `instance_ids` is a comma-separated string, so the
+        file can be passed back as `--instance_ids @<path>`.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'instance_ids': ','.join(self.failures), 'failures': self.failures}, f, indent=4)
+        return path
+
+
+def parse_instance_ids(value: Optional[str]) -> Optional[list[str]]:
+    """Split a comma-separated --instance_ids value; `@path` reads it from a file or failure manifest."""
+    if not value:
+        return None
+    if value.startswith('@'):
+        with open(value[1:], 'r') as f:
+            content = f.read().strip()
+        if content.startswith('{'):
+            content = json.loads(content)['instance_ids']
+        value = content.replace('\n', ',')
+    return [instance_id.strip() for instance_id in value.split(',') if instance_id.strip()]
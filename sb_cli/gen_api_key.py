@@ -1,7 +1,5 @@
-import requests
 import typer
-from sb_cli.config import API_BASE_URL
-from sb_cli.utils import verify_response
+from sb_cli.utils import api_request, verify_response
 
 app = typer.Typer(help="Get an API key for accessing the SWE-bench M API")
 
@@ -21,7 +19,7 @@ def gen_api_key(
     payload = {
         'email': email,
     }
-    response = requests.post(f'{API_BASE_URL}/gen-api-key', json=payload)
+    response = api_request('post', 'gen-api-key', json=payload)
     verify_response(response)
     result = response.json()
     message = result['message']
@@ -1,13 +1,31 @@
-import requests
 import typer
 from typing import Optional
 from rich.console import Console
 from rich.table import Table
-from sb_cli.config import API_BASE_URL
-from sb_cli.utils import verify_response
+from sb_cli.client import SWEBenchClient
+from sb_cli.config import OutputFormat
+from sb_cli.output import emit, is_ndjson, set_output_format, status
 
 app = typer.Typer(help="Get remaining quota counts for your API key")
 
+def check_quota(client: SWEBenchClient, subset: str, split: str, run_ids: list[str]):
+    """
+    Fail fast if creating these runs would exceed the remaining quota.
+
+    Runs that already exist do not use up quota, so the run list is only fetched
+    when there are fewer remaining runs than requested.
+    """
+    remaining = client.get_quotas().get(subset, {}).get(split)
+    if remaining is None or remaining >= len(run_ids):
+        return
+    existing = set(client.list_runs(subset, split))
+    new_run_ids = [run_id for run_id in run_ids if run_id not in existing]
+    if len(new_run_ids) > remaining:
+        raise ValueError(
+            f"Submitting {len(new_run_ids)} new run(s) for {subset} {split} would exceed your "
+            f"remaining quota of {remaining} run(s): {', '.join(new_run_ids)}"
+        )
+
 def get_quotas(
     api_key: Optional[str] = typer.Option(
         None, 
@@ -15,15 +33,17 @@ def get_quotas(
         help="API key to use", 
         envvar="SWEBENCH_API_KEY"
     ),
+    output: OutputFormat = typer.Option(OutputFormat.text, '--output', help="Output format - ndjson prints the quotas as a single JSON event"),
 ):
     """Get remaining quota counts for all authorized subsets and splits."""
+    set_output_format(output)
     console = Console()
-    headers = {"x-api-key": api_key}
 
-    with console.status("[blue]Fetching quota information..."):
-        response = requests.get(f"{API_BASE_URL}/get-quotas", headers=headers)
-        verify_response(response)
-        result = response.json()
+    with status(console, "[blue]Fetching quota information..."):
+        quotas = SWEBenchClient(api_key).get_quotas()
+    if is_ndjson():
+        emit("quotas", quotas=quotas)
+        return
 
     # Create a rich table to display the quotas
     table = Table(title="Remaining Submission Quotas")
@@ -31,7 +51,6 @@ def get_quotas(
     table.add_column("Split", style="magenta")
     table.add_column("Remaining Runs", style="green", justify="right")
 
-    quotas = result["remaining_quotas"]
     if not quotas:
         console.print("[yellow]No remaining quotas found for any subset/split combination[/]")
         return
@@ -1,25 +1,28 @@
 import json
-import os
-import requests
 import typer
 from pathlib import Path
 from typing import Optional
-from rich.console import Console
-from sb_cli.config import API_BASE_URL, Subset
-from sb_cli.utils import verify_response
+from sb_cli.client import SWEBenchClient
+from sb_cli.config import OutputFormat, Subset
+from sb_cli.output import emit, is_ndjson, make_console, set_output_format, status
 
 app = typer.Typer(help="Get the evaluation report for a specific run")
 
 def safe_save_json(data: dict, file_path: Path, overwrite: bool = False):
-    if file_path.exists() and not overwrite:
-        ext = 1
-        base_stem = file_path.stem
-        while (file_path.parent / f"{base_stem}-{ext}.json").exists():
-            ext += 1
-        file_path = file_path.parent / f"{base_stem}-{ext}.json"
-    with open(file_path, 'w') as f:
-        json.dump(data, f, indent=4)
-    return file_path
+    """Save `data` as JSON, adding a -N suffix unless `overwrite`; identical existing files are not rewritten."""
+    content = json.dumps(data, indent=4)
+    base_stem = file_path.stem
+    candidate, ext = file_path, 0
+    while candidate.exists():
+        if candidate.read_text() == content:
+            return candidate
+        if overwrite:
+            break
+        ext += 1
+        candidate = file_path.parent / f"{base_stem}-{ext}.json"
+    with open(candidate, 'w') as f:
+        f.write(content)
+    return candidate
 
 
 def get_str_report(report: dict) -> dict:
@@ -37,6 +40,114 @@ def get_str_report(report: dict) -> dict:
     )
 
 
+def follow_evaluation(
+    client: SWEBenchClient,
+    subset: str,
+    split: str,
+    run_id: str,
+    snapshot_path: Optional[Path],
+    timeout: Optional[int],
+):
+    """
+    Wait for a run's evaluation to finish, showing a live tally of its results.
+
+    Returns straight away if the tally can't be started, leaving the caller to fetch
+    the report as it stands.
+    """
+    from sb_cli.live_report import RunWatch, start_live_report
+    from sb_cli.polling import default_timeout
+    from sb_cli.submit import wait_for_evaluation
+    live_report = start_live_report(client, subset, split, run_id, snapshot_path)
+    if not live_report or not live_report.pending:
+        return
+    run_state = RunWatch(live_report.base['submitted_instances'])
+    live_report.track(run_state)
+    poller = client.poller(subset, split, run_id, stream=True)
+    try:
+        wait_for_evaluation(
+            all_ids=[],
+            client=client,
+            subset=subset,
+            split=split,
+            run_id=run_id,
+            timeout=timeout or default_timeout(60 * 10, run_state.total, 0.5),
+            run_state=run_state,
+            poller=poller,
+            live_report=live_report,
+        )
+    finally:
+        if hasattr(poller, 'close'):
+            poller.close()
+
+
+def save_report(
+    client: SWEBenchClient,
+    subset: str,
+    split: str,
+    run_id: str,
+    output_dir: Optional[str] = 'sb-cli-reports',
+    overwrite: bool = False,
+    use_cache: bool = True,
+    extra: Optional[dict] = None,
+    live: bool = False,
+    snapshots: bool = False,
+    eval_timeout: Optional[int] = None,
+    fetched: Optional[tuple[dict, bool]] = None,
+):
+    """
+    Fetch a run's report, print its summary and save it (and the rest of the response) to `output_dir`.
+
+    With `live`, first waits for the evaluation to finish while showing a running tally,
+    also written to a .partial.json snapshot with `snapshots`. `fetched` is a
+    (response, unchanged) pair from `client.get_report` to save instead of fetching it here.
+    """
+    console = make_console()
+    report_name = f"{subset}__{split}__{run_id}"
+    snapshot_path = Path(output_dir or '.') / f"{report_name}.partial.json" if live and snapshots else None
+    if live:
+        follow_evaluation(client, subset, split, run_id, snapshot_path, eval_timeout)
+    if fetched is None:
+        with status(console, f"[blue]Creating report for run {run_id}...", spinner="dots"):
+            fetched = client.get_report(subset, split, run_id, extra or {}, use_cache)
+    response, unchanged = fetched
+    report = response.pop('report')
+    if not is_ndjson():
+        typer.echo(get_str_report(report))
+
+    if output_dir:
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        report_path = output_path / f"{report_name}.json"
+        response_path = output_path / f"{report_name}.response.json"
+    else:
+        report_path = Path(f"{report_name}.json")
+        response_path = Path(f"{report_name}.response.json")
+        
+    report_path = safe_save_json(report, report_path, overwrite)
+    if response:
+        response_path = safe_save_json(response, response_path, False)
+    if snapshot_path:
+        snapshot_path.unlink(missing_ok=True)  # superseded by the full report
+    if is_ndjson():
+        emit(
+            "report",
+            run_id=run_id,
+            subset=subset,
+            split=split,
+            unchanged=unchanged,
+            report_path=str(report_path),
+            response_path=str(response_path) if response else None,
+            report=report,
+        )
+        return
+    if unchanged:
+        typer.echo(f"Report unchanged since the last fetch: {report_path}")
+    else:
+        typer.echo(f"Saved full report to {report_path}!")
+    if response:
+        typer.echo(f"Saved response to {response_path}")
+
+
 def get_report(
     subset: Subset = typer.Argument(
         help="Subset to evaluate",
@@ -60,46 +171,33 @@ def get_report(
         '-o',
         help="Directory to save report files"
     ),
+    use_cache: int = typer.Option(1, '--cache', help="Revalidate a locally cached copy instead of re-downloading unchanged reports"),
     extra_args: Optional[str] = typer.Option(
         '',
         '--extra_arg',
         '-e',
         help="Additional argument in the format KEY=VALUE",
-    )
+    ),
+    output: OutputFormat = typer.Option(OutputFormat.text, '--output', help="Output format - ndjson prints the report as a single JSON event"),
+    live: int = typer.Option(0, '--live', help="Wait for evaluation to finish, showing a running tally of results, before saving the report"),
+    snapshots: int = typer.Option(0, '--snapshots', help="With --live, also write the tally to a .partial.json report in the output directory as it changes"),
+    eval_timeout: Optional[int] = typer.Option(None, '--eval_timeout', help="With --live, seconds to wait for evaluation - (defaults to 10 minutes plus 0.5s per instance)"),
 ):
     """Get report for a run from the run ID"""
     kwargs = {}
-    if extra_args and isinstance(extra_args, str):
+    if extra_args:
         kwargs = {arg.split('=')[0]: arg.split('=')[1] for arg in extra_args.split(',')}
-    elif extra_args and not isinstance(extra_args, typer.models.OptionInfo):
-        raise ValueError(f"Invalid extra arguments: has type {type(extra_args)}")
-    payload = {
-        'run_id': run_id,
-        'subset': subset,
-        'split': split,
-        **kwargs
-    }
-    headers = {'x-api-key': api_key} if api_key else {}
-    console = Console()
-    with console.status(f"[blue]Creating report for run {run_id}...", spinner="dots"):
-        response = requests.post(f"{API_BASE_URL}/get-report", json=payload, headers=headers)
-        verify_response(response)
-        response = response.json()
-    report = response.pop('report')
-    typer.echo(get_str_report(report))
-    report_name = f"{subset}__{split}__{run_id}"
-    
-    if output_dir:
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
-        report_path = output_path / f"{report_name}.json"
-        response_path = output_path / f"{report_name}.response.json"
-    else:
-        report_path = Path(f"{report_name}.json")
-        response_path = Path(f"{report_name}.response.json")
-        
-    report_path = safe_save_json(report, report_path, overwrite)
-    typer.echo(f"Saved full report to {report_path}!")
-    if response:
-        response_path = safe_save_json(response, response_path, False)
-        typer.echo(f"Saved response to {response_path}")
\ No newline at end of file
+    set_output_format(output)
+    save_report(
+        SWEBenchClient(api_key),
+        subset,
+        split,
+        run_id,
+        output_dir=output_dir,
+        overwrite=bool(overwrite),
+        use_cache=bool(use_cache),
+        extra=kwargs,
+        live=bool(live),
+        snapshots=bool(snapshots),
+        eval_timeout=eval_timeout,
+    )
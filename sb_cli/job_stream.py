@@ -0,0 +1,130 @@
+import json
+import time
+from typing import Iterator, Optional
+import requests
+from sb_cli.config import MAX_RETRIES
+from sb_cli.polling import JobPoller
+from sb_cli.utils import CONNECT_TIMEOUT, get_retry_delay, verify_response
+
+# The server sends a heartbeat at least this often; longer silence means the connection is dead
+HEARTBEAT_TIMEOUT = 45
+NO_CHANGES = {'running': [], 'completed': []}
+
+
+def iter_sse(lines: Iterator[str]) -> Iterator[tuple[str, str, Optional[str]]]:
+    """
+    Parse a Server-Sent Events stream into (event, data, id) tuples.
+
+    Comment lines, which servers send as heartbeats, are yielded as ('', '', None) so
+    readers get control back while the stream is idle.
+    """
+    event, data, event_id = 'message', [], None
+    for line in lines:
+        if not line:
+            if data:
+                yield event, '\n'.join(data), event_id
+            event, data, event_id = 'message', [], None
+        elif line.startswith(':'):
+            yield '', '', None
+        else:
+            field, _, value = line.partition(':')
+            value = value[1:] if value.startswith(' ') else value
+            if field == 'event':
+                event = value
+            elif field == 'data':
+                data.append(value)
+            elif field == 'id':
+                event_id = value
+
+
+class JobEventStream:
+    """
+    Receives a run's job state changes pushed over Server-Sent Events from /job-events.
+
+    Used in place of a JobPoller: each poll blocks until the server pushes a change or
+    a heartbeat, so progress moves the moment instances start or finish, and only the
+    changes are sent. Dropped connections are resumed from the last event ID with
+    backoff. If the stream keeps failing or the server rejects it, polling /poll-jobs
+    takes over.
+    """
+
+    def __init__(self, client, *, subset: str, split: str, run_id: str):
+        self.client = client
+        self.payload = {'run_id': run_id, 'subset': subset, 'split': split}
+        self.last_event_id = None
+        self.response = None
+        self.events = None
+        self.received = False
+        self.failures = 0
+        self.fallback = None
+
+    @property
+    def streaming(self) -> bool:
+        """Whether polls block on the stream, rather than needing to be spaced out."""
+        return self.fallback is None
+
+    def connect(self):
+        headers = {'Accept': 'text/event-stream'}
+        if self.last_event_id is not None:
+            headers['Last-Event-ID'] = self.last_event_id
+        response = self.client.request(
+            'get',
+            'job-events',
+            json=self.payload,
+            headers=headers,
+            stream=True,
+            timeout=(CONNECT_TIMEOUT, HEARTBEAT_TIMEOUT),
+            max_retries=0,  # reconnects are retried, with backoff, by poll
+        )
+        try:
+            verify_response(response)
+        except requests.HTTPError:
+            response.close()
+            raise
+        response.encoding = 'utf-8'
+        self.response = response
+        # chunk_size=None hands over each chunk as it arrives instead of waiting for a full buffer
+        self.events = iter_sse(response.iter_lines(chunk_size=None, decode_unicode=True))
+        self.received = False
+
+    def close(self):
+        if self.response is not None:
+            self.response.close()
+        self.response = self.events = None
+
+    def fall_back(self, run_state) -> tuple[dict, object]:
+        self.close()
+        self.fallback = JobPoller(self.client, **self.payload)
+        return self.fallback.poll(run_state)
+
+    def poll(self, run_state) -> tuple[dict, object]:
+        """Wait for the next pushed change and apply it to `run_state`."""
+        if self.fallback:
+            return self.fallback.poll(run_state)
+        while True:
+            try:
+                if self.events is None:
+                    self.connect()
+                event, data, event_id = next(self.events)
+            except requests.HTTPError as e:
+                if e.response is not None and e.response.status_code < 500:
+                    return self.fall_back(run_state)
+                self.failures += 1
+            except (requests.RequestException, StopIteration):
+                # A stream the server closed after delivering events is resumed right away
+                self.failures = 0 if self.received else self.failures + 1
+            else:
+                if event == 'jobs':
+                    self.received = True
+                    self.failures = 0
+                    if event_id is not None:
+                        self.last_event_id = event_id
+                    return run_state.update(json.loads(data)), None
+                if not event:
+                    return NO_CHANGES, None
+                continue
+            self.close()
+            if self.failures > MAX_RETRIES:
+                return self.fall_back(run_state)
+            if self.failures:
+                time.sleep(get_retry_delay(None, self.failures - 1))
@@ -0,0 +1,77 @@
+import json
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+from sb_cli.run_state import COMPLETED, PENDING, RUNNING
+
+JOURNAL_DIR = '.journal'
+SUBMITTED = 'submitted'
+STATE_NAMES = {PENDING: SUBMITTED, RUNNING: 'running', COMPLETED: 'completed'}
+STATE_ORDER = {name: state for state, name in STATE_NAMES.items()}
+
+
+class SubmissionJournal:
+    """
+    Append-only JSONL record of what happened to each prediction of a run.
+
+    Each line holds an instance ID, its state (submitted, running or completed) and the
+    hash of the patch that was submitted, so a re-run can skip confirmed predictions
+    and resume polling without any network calls.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.entries = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by a crash
+                    self._apply(entry)
+
+    @classmethod
+    def for_run(cls, output_dir: Optional[str], subset: str, split: str, run_id: str) -> 'SubmissionJournal':
+        return cls(Path(output_dir or '.') / JOURNAL_DIR / f"{subset}__{split}__{run_id}.jsonl")
+
+    def _apply(self, entry: dict):
+        current = self.entries.setdefault(entry['instance_id'], {})
+        if 'patch_hash' in entry:
+            current['patch_hash'] = entry['patch_hash']
+        if STATE_ORDER[entry['state']] >= STATE_ORDER.get(current.get('state'), -1):
+            current['state'] = entry['state']
+
+    def record(self, entries: Iterable[dict]):
+        """Append entries with `instance_id`, `state` and optionally `patch_hash`."""
+        entries = list(entries)
+        if not entries:
+            return
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry) + '\n')
+                    self._apply(entry)
+
+    def record_submitted(self, patch_hashes: dict[str, str]):
+        """Record that the server accepted predictions, given an instance_id -> patch hash map."""
+        self.record(
+            {'instance_id': instance_id, 'state': SUBMITTED, 'patch_hash': patch_hash}
+            for instance_id, patch_hash in patch_hashes.items()
+        )
+
+    def record_state(self, instance_ids: list[str], state: int):
+        """Record a RunProgress state change (usable as its `on_advance` callback)."""
+        self.record({'instance_id': instance_id, 'state': STATE_NAMES[state]} for instance_id in instance_ids)
+
+    def is_submitted(self, instance_id: str, patch_hash: str) -> bool:
+        """Whether this exact patch was already accepted by the server for this run."""
+        entry = self.entries.get(instance_id)
+        return entry is not None and entry.get('patch_hash') == patch_hash
+
+    def state_of(self, instance_id: str) -> Optional[int]:
+        """The last recorded RunProgress state of an instance, if any."""
+        entry = self.entries.get(instance_id)
+        return STATE_ORDER[entry['state']] if entry else None
@@ -0,0 +1,234 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+import requests
+from sb_cli.get_report import get_str_report
+from sb_cli.output import emit, make_console
+from sb_cli.run_state import COMPLETED
+
+# /get-results outcomes and the report fields that list their instance IDs
+OUTCOME_FIELDS = {'resolved': 'resolved_ids', 'unresolved': 'unresolved_ids', 'error': 'error_ids'}
+RESULTS_BATCH_SIZE = 500
+# Completions are gathered for at least this long between /get-results requests, since
+# streamed job events can arrive many times a second
+RESULTS_INTERVAL = 2
+# Without /get-results, the full report is re-fetched at most this often
+REPORT_REFRESH_INTERVAL = 60
+# Partial snapshots are rewritten at most this often
+SNAPSHOT_INTERVAL = 10
+
+
+class RunWatch:
+    """
+    Running/completed state of a run whose instance IDs are not known up front.
+
+    Stands in for a RunProgress when following a run from `get-report`: IDs are
+    tracked as polls reveal them, and `total` is the submitted count from the report.
+    """
+
+    def __init__(self, total: int):
+        self.total = total
+        self.running_ids = set()
+        self.completed_ids = set()
+        self.on_advance = None
+
+    def update(self, results: dict) -> dict:
+        """Apply a /poll-jobs response and return the newly running and newly completed IDs."""
+        completed = [i for i in dict.fromkeys(results.get('completed', ())) if i not in self.completed_ids]
+        self.completed_ids.update(completed)
+        self.running_ids.difference_update(completed)
+        running = [
+            i for i in dict.fromkeys(results.get('running', ()))
+            if i not in self.completed_ids and i not in self.running_ids
+        ]
+        self.running_ids.update(running)
+        if completed and self.on_advance:
+            self.on_advance(completed, COMPLETED)
+        return {'running': running, 'completed': completed}
+
+    def ids_with_state(self, state: int) -> list[str]:
+        return list(self.completed_ids if state == COMPLETED else self.running_ids)
+
+    @property
+    def completed(self) -> int:
+        return len(self.completed_ids)
+
+
+class LiveReport:
+    """
+    Running tally of a run's results while its evaluation is still in progress.
+
+    Seeded from one full report, then kept current from the IDs each poll reports as
+    newly completed: only their outcomes are fetched, from /get-results when the API
+    advertises "instance-results". Without it, the full report is re-fetched through
+    the report cache at most every REPORT_REFRESH_INTERVAL seconds. The tally has the
+    shape of a report, so `get_str_report` can summarize it, and can be written to a
+    partial snapshot as it changes.
+    """
+
+    def __init__(self, client, subset: str, split: str, run_id: str, snapshot_path: Optional[Path] = None):
+        self.client = client
+        self.run = {'subset': subset, 'split': split, 'run_id': run_id}
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.use_results = "instance-results" in client.capabilities
+        self.base = {}
+        self.outcomes = {}
+        self.queued = []
+        self.version = 0
+        self.refreshed_at = 0.0
+        self.fetched_at = 0.0
+        self.snapshot_at = 0.0
+        self.snapshot_version = 0
+        self._summary = None
+
+    def track(self, run_state):
+        """Queue the IDs `run_state` sees complete, keeping its existing `on_advance` callback."""
+        previous = run_state.on_advance
+
+        def on_advance(instance_ids: list[str], state: int):
+            if previous:
+                previous(instance_ids, state)
+            if state == COMPLETED:
+                self.queued.extend(instance_ids)
+
+        run_state.on_advance = on_advance
+
+    def seed(self, run_state=None):
+        """Start from the full report, then fetch outcomes of completed IDs it does not cover yet."""
+        self.load_report()
+        self.changed()
+        if run_state is not None:
+            self.queued.extend(run_state.ids_with_state(COMPLETED))
+        self.refresh(force=True)
+
+    def load_report(self):
+        response, _ = self.client.get_report(**self.run)
+        self.base = response['report']
+        self.outcomes = {
+            instance_id: outcome
+            for outcome, field in OUTCOME_FIELDS.items()
+            for instance_id in self.base.get(field, ())
+        }
+        self.refreshed_at = time.monotonic()
+
+    def fetch_results(self, instance_ids: list[str]):
+        for start in range(0, len(instance_ids), RESULTS_BATCH_SIZE):
+            results = self.client.get_results(instance_ids=instance_ids[start:start + RESULTS_BATCH_SIZE], **self.run)
+            self.outcomes.update((i, outcome) for i, outcome in results.items() if outcome in OUTCOME_FIELDS)
+
+    def refresh(self, force: bool = False):
+        """
+        Fetch the outcomes of newly completed IDs, then update the tally and snapshot.
+
+        Unless `force`, IDs are left queued until RESULTS_INTERVAL (or, without
+        /get-results, REPORT_REFRESH_INTERVAL) has passed since the last fetch.
+        """
+        now = time.monotonic()
+        interval, last = (RESULTS_INTERVAL, self.fetched_at) if self.use_results else (REPORT_REFRESH_INTERVAL, self.refreshed_at)
+        if not force and now - last < interval:
+            return
+        queued = [i for i in dict.fromkeys(self.queued) if i not in self.outcomes]
+        self.queued = []
+        if queued:
+            known = len(self.outcomes)
+            try:
+                if self.use_results:
+                    self.fetched_at = now
+                    self.fetch_results(queued)
+                else:
+                    self.load_report()
+            except requests.RequestException:
+                pass  # the live tally is best-effort; these IDs are retried on the next refresh
+            # Outcomes can lag behind job states, so IDs still without one are asked for again
+            self.queued = [i for i in queued if i not in self.outcomes]
+            if len(self.outcomes) != known:
+                self.changed()
+        self.write_snapshot()
+
+    def changed(self):
+        self.version += 1
+        self._summary = None
+        emit("live_report", **self.counts())
+
+    def counts(self) -> dict:
+        outcomes = list(self.outcomes.values())
+        submitted = max(self.base.get('submitted_instances', 0), len(outcomes))
+        return {
+            'resolved': outcomes.count('resolved'),
+            'unresolved': outcomes.count('unresolved'),
+            'error': outcomes.count('error'),
+            'pending': submitted - len(outcomes),
+            'submitted': submitted,
+        }
+
+    @property
+    def pending(self) -> int:
+        return max(self.base.get('submitted_instances', 0) - len(self.outcomes), 0)
+
+    def report(self) -> dict:
+        """The tally in the shape of a /get-report report."""
+        ids = {outcome: [] for outcome in OUTCOME_FIELDS}
+        for instance_id, outcome in self.outcomes.items():
+            ids[outcome].append(instance_id)
+        counts = self.counts()
+        return {
+            **self.base,
+            'total_instances': max(self.base.get('total_instances', 0), counts['submitted']),
+            'submitted_instances': counts['submitted'],
+            'completed_instances': counts['resolved'] + counts['unresolved'],
+            'resolved_instances': counts['resolved'],
+            'unresolved_instances': counts['unresolved'],
+            'error_instances': counts['error'],
+            'pending_instances': counts['pending'],
+            'failed_instances': self.base.get('failed_instances', 0),
+            **{field: ids[outcome] for outcome, field in OUTCOME_FIELDS.items()},
+        }
+
+    def summary(self) -> str:
+        """`get_str_report` of the tally, rebuilt only when it changes."""
+        if self._summary is None:
+            self._summary = get_str_report(self.report()) if self.base else "Waiting for results..."
+        return self._summary
+
+    def write_snapshot(self, force: bool = False):
+        """Write the tally to `snapshot_path` if it changed, at most every SNAPSHOT_INTERVAL seconds unless `force`."""
+        if not self.snapshot_path or self.snapshot_version == self.version:
+            return
+        if not force and time.monotonic() - self.snapshot_at < SNAPSHOT_INTERVAL:
+            return
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        # Replace atomically so readers never see a partial snapshot
+        tmp_path = self.snapshot_path.with_name(f"{self.snapshot_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(self.report(), f, indent=4)
+        os.replace(tmp_path, self.snapshot_path)
+        self.snapshot_at = time.monotonic()
+        self.snapshot_version = self.version
+
+
+def start_live_report(
+    client,
+    subset: str,
+    split: str,
+    run_id: str,
+    snapshot_path: Optional[Path] = None,
+    run_state=None,
+) -> Optional[LiveReport]:
+    """
+    A LiveReport seeded from the run's report, tracking `run_state` if given.
+
+    The tally is optional, so if the report can't be fetched this warns and returns
+    None for the caller to carry on without it.
+    """
+    live_report = LiveReport(client, subset, split, run_id, snapshot_path)
+    try:
+        live_report.seed(run_state)
+    except requests.RequestException as e:
+        make_console().print(f"[yellow]  Could not start the live report: {str(e)}[/]")
+        emit("warning", message=f"Could not start the live report: {str(e)}")
+        return None
+    if run_state is not None:
+        live_report.track(run_state)
+    return live_report
@@ -0,0 +1,118 @@
+import json
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Optional
+from sb_cli.config import OutputFormat
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+# Seconds between progress events for the same task
+PROGRESS_EVENT_INTERVAL = 1.0
+
+_output_format = OutputFormat.text
+_context = {}
+_lock = threading.Lock()
+
+
+def set_output_format(output_format: OutputFormat):
+    global _output_format
+    _output_format = OutputFormat(output_format)
+
+
+def set_event_context(**fields):
+    """Fields (e.g. run_id, subset, split) added to every event emitted from now on."""
+    _context.update(fields)
+
+
+def is_ndjson() -> bool:
+    return _output_format == OutputFormat.ndjson
+
+
+def emit(event: str, **fields):
+    """Write one JSON event line to stdout in ndjson mode; does nothing in text mode."""
+    if not is_ndjson():
+        return
+    line = json.dumps({"event": event, "time": round(time.time(), 3), **_context, **fields}, default=str)
+    with _lock:
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+
+
+def make_console() -> "Console":
+    """A rich console, silenced in ndjson mode so stdout only carries events."""
+    # Imported here so light commands in ndjson mode never load rich
+    from rich.console import Console
+    return Console(quiet=is_ndjson())
+
+
+def status(console: "Console", message: str, **kwargs):
+    """`console.status` spinner in text mode, nothing in ndjson mode."""
+    return nullcontext() if is_ndjson() else console.status(message, **kwargs)
+
+
+class EventProgress:
+    """
+    Stand-in for a rich Progress that emits progress events instead of drawing bars.
+
+    Each task emits its `event` with done/total counts, at most once per
+    PROGRESS_EVENT_INTERVAL seconds plus once when it finishes or stops.
+    """
+
+    def __init__(self, interval: float = PROGRESS_EVENT_INTERVAL):
+        self.interval = interval
+        self.tasks = {}
+        self._last = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def add_task(self, description: str, total: Optional[int] = None, event: str = "progress", **fields) -> int:
+        task_id = len(self._last)
+        self.tasks[task_id] = SimpleNamespace(description=description, total=total, completed=0, event=event)
+        self._last[task_id] = None
+        return task_id
+
+    def update(self, task_id: Optional[int], *, advance: int = 0, completed: Optional[int] = None,
+               total: Optional[int] = None, **fields):
+        if task_id is None or task_id not in self.tasks:
+            return
+        with self._lock:
+            task = self.tasks[task_id]
+            if total is not None:
+                task.total = total
+            task.completed = completed if completed is not None else task.completed + advance
+            now = time.monotonic()
+            last = self._last[task_id]
+            finished = task.total is not None and task.completed >= task.total
+            if last is not None and last[1] == task.completed:
+                return
+            if not finished and last is not None and now - last[0] < self.interval:
+                return
+            self._last[task_id] = (now, task.completed)
+        self._emit(task)
+
+    def _emit(self, task):
+        emit(task.event, done=task.completed, total=task.total)
+
+    def remove_task(self, task_id: int):
+        self.tasks.pop(task_id, None)
+
+    def stop(self):
+        # Flush the final counts of tasks whose last update was throttled
+        with self._lock:
+            pending = [
+                task for task_id, task in self.tasks.items()
+                if self._last[task_id] is None or self._last[task_id][1] != task.completed
+            ]
+            for task_id, task in self.tasks.items():
+                self._last[task_id] = (time.monotonic(), task.completed)
+        for task in pending:
+            self._emit(task)
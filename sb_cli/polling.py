@@ -0,0 +1,123 @@
+import time
+from typing import Callable, Optional
+from sb_cli.run_state import RunProgress
+from sb_cli.utils import RETRY_STATUS_CODES, get_retry_after, verify_response
+
+MIN_POLL_INTERVAL = 2
+MAX_POLL_INTERVAL = 60
+# Aim to see roughly this share of the remaining instances change between polls
+TARGET_PROGRESS_FRACTION = 0.05
+RATE_SMOOTHING = 0.3
+
+
+def default_timeout(base: int, num_instances: int, per_instance: float) -> int:
+    """Timeout that grows with the size of the run."""
+    return int(base + per_instance * num_instances)
+
+
+class PollScheduler:
+    """
+    Picks the delay before the next poll from the observed completion rate.
+
+    While instances change state the interval shrinks towards the time expected for a
+    small share of the remaining instances to change; while nothing changes it backs off
+    exponentially. A Retry-After header from the server always sets a lower bound.
+    """
+
+    def __init__(
+        self,
+        initial_interval: float,
+        min_interval: float = MIN_POLL_INTERVAL,
+        max_interval: float = MAX_POLL_INTERVAL,
+    ):
+        self.interval = initial_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.rate = None  # smoothed state changes per second
+        self._last_poll = None
+
+    def next_interval(self, changed: int, remaining: int, response=None) -> float:
+        """Delay before the next poll, given how many IDs changed state in the last one."""
+        now = time.monotonic()
+        if self._last_poll is not None:
+            # The first poll only establishes a baseline, later ones adapt the interval
+            rate = changed / max(now - self._last_poll, 1e-3)
+            self.rate = rate if self.rate is None else RATE_SMOOTHING * rate + (1 - RATE_SMOOTHING) * self.rate
+            if changed:
+                self.interval = max(1, remaining * TARGET_PROGRESS_FRACTION) / self.rate
+            else:
+                self.interval *= 1.5
+            self.interval = min(max(self.interval, self.min_interval), self.max_interval)
+        self._last_poll = now
+        retry_after = get_retry_after(response)
+        return max(self.interval, retry_after) if retry_after else self.interval
+
+
+class JobPoller:
+    """
+    Issues /poll-jobs requests for a run, using conditional and incremental requests.
+
+    The last ETag is sent as If-None-Match so an unchanged status costs a 304, and if
+    the server returns a `cursor` it is sent back as `since` so later responses only
+    contain instances whose state changed. RunProgress only moves states forward,
+    so full and incremental responses are applied the same way.
+    """
+
+    def __init__(self, client, *, subset: str, split: str, run_id: str):
+        self.client = client
+        self.payload = {'run_id': run_id, 'subset': subset, 'split': split}
+        self.etag = None
+        self.cursor = None
+
+    def request_kwargs(self) -> dict:
+        """Keyword arguments for the next /poll-jobs request."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        payload = dict(self.payload)
+        if self.cursor is not None:
+            payload['since'] = self.cursor
+        return {'json': payload, 'headers': headers}
+
+    def handle(self, response, run_state: RunProgress) -> dict:
+        """Apply a poll response to `run_state` and return the newly running/completed IDs."""
+        # Unchanged, or a transient error that outlasted the retries: the next poll catches up
+        if response.status_code == 304 or response.status_code in RETRY_STATUS_CODES:
+            return {'running': [], 'completed': []}
+        verify_response(response)
+        self.etag = response.headers.get("ETag")
+        results = response.json()
+        self.cursor = results.get('cursor')
+        return run_state.update(results)
+
+    def poll(self, run_state: RunProgress) -> tuple[dict, object]:
+        """Poll once, returning the state changes and the raw response."""
+        response = self.client.request('get', 'poll-jobs', **self.request_kwargs())
+        return self.handle(response, run_state), response
+
+
+def poll_until(
+    poller: JobPoller,
+    run_state: RunProgress,
+    scheduler: PollScheduler,
+    is_done: Callable[[], bool],
+    remaining: Callable[[], int],
+    timeout: float,
+    on_update: Optional[Callable[[], None]] = None,
+) -> bool:
+    """Poll until `is_done()` or the timeout elapses; returns whether it finished in time."""
+    start_time = time.monotonic()
+    while True:
+        changes, response = poller.poll(run_state)
+        if on_update:
+            on_update()
+        if is_done():
+            return True
+        elapsed = time.monotonic() - start_time
+        if elapsed > timeout:
+            return False
+        if getattr(poller, 'streaming', False):
+            continue  # the next poll blocks until the server pushes a change
+        changed = len(changes['running']) + len(changes['completed'])
+        delay = scheduler.next_interval(changed, remaining(), response)
+        time.sleep(min(delay, max(timeout - elapsed, 0) + 1))
@@ -0,0 +1,166 @@
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Iterator, Optional
+from sb_cli.predictions import COMPRESSION_SUFFIXES, PatchRegion, is_json_document, patch_hash
+
+INDEX_SUFFIX = '.sbidx'
+INDEX_VERSION = 2
+
+PATCH_KEY_PATTERN = re.compile(rb'"model_patch"\s*:\s*(?=")')
+JSON_STRING_PATTERN = re.compile(rb'"(?:[^"\\]+|\\.)*"')
+
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+
+def index_path(predictions_path: str) -> Path:
+    """The sidecar index of a predictions file, stored next to it."""
+    return Path(f"{predictions_path}{INDEX_SUFFIX}")
+
+
+def is_indexable(predictions_path: str) -> bool:
+    """Only uncompressed JSONL files can be read at arbitrary offsets."""
+    return not str(predictions_path).endswith(COMPRESSION_SUFFIXES) and not is_json_document(str(predictions_path))
+
+
+def file_signature(predictions_path: str) -> tuple[int, int]:
+    stat = os.stat(predictions_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def find_patch_span(line: bytes, model_patch: str) -> Optional[tuple[int, int]]:
+    """Offset and length of the JSON string token holding `model_patch` in `line`, if it can be found."""
+    for key in PATCH_KEY_PATTERN.finditer(line):
+        token = JSON_STRING_PATTERN.match(line, key.end())
+        if token and json.loads(token.group()) == model_patch:
+            return token.start(), token.end() - token.start()
+    return None
+
+
+def build_index(predictions_path: str) -> dict:
+    """
+    Validate a JSONL predictions file and write its sidecar index.
+
+    The index maps each instance ID to the byte offset and length of its line, its
+    patch hash and the byte range of the patch string within the file (so large
+    patches can be streamed from disk), along with the file's size and mtime so a
+    changed file invalidates it.
+    Raises ValueError for the same problems as `iter_predictions`.
+    """
+    predictions_path = str(predictions_path)
+    if not is_indexable(predictions_path):
+        raise ValueError(f"Only uncompressed JSONL predictions files can be indexed: {predictions_path}")
+    size, mtime_ns = file_signature(predictions_path)
+    entries = {}
+    model_name = None
+    offset = 0
+    with open(predictions_path, 'rb') as f:
+        for line in f:
+            length = len(line)
+            if line.strip():
+                p = json.loads(line)
+                if not isinstance(p, dict):
+                    raise ValueError(f"Each prediction must be a JSON object, got {type(p).__name__}")
+                for key in ('instance_id', 'model_patch', 'model_name_or_path'):
+                    if key not in p:
+                        raise ValueError(f"Prediction at byte {offset} is missing '{key}'")
+                if model_name is None:
+                    model_name = p['model_name_or_path']
+                elif p['model_name_or_path'] != model_name:
+                    raise ValueError("All predictions must be for the same model")
+                if p['instance_id'] in entries:
+                    raise ValueError("Duplicate instance IDs found in predictions - please remove duplicates before submitting")
+                span = find_patch_span(line, p['model_patch'])
+                patch_span = [offset + span[0], span[1]] if span else [None, None]
+                entries[p['instance_id']] = [offset, length, patch_hash(p['model_patch']), *patch_span]
+            offset += length
+    if file_signature(predictions_path) != (size, mtime_ns):
+        raise ValueError(f"{predictions_path} changed while it was being indexed")
+    index = {
+        'version': INDEX_VERSION,
+        'size': size,
+        'mtime_ns': mtime_ns,
+        'model_name_or_path': model_name,
+        'entries': entries,
+    }
+    path = index_path(predictions_path)
+    # Replace atomically so concurrent readers never see a partial index
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    with _loaded_lock:
+        _loaded[predictions_path] = index
+    return index
+
+
+def load_index(predictions_path: str) -> Optional[dict]:
+    """The sidecar index of a predictions file if it exists and matches the file, else None."""
+    predictions_path = str(predictions_path)
+    if not is_indexable(predictions_path):
+        return None
+    try:
+        size, mtime_ns = file_signature(predictions_path)
+    except OSError:
+        return None
+    with _loaded_lock:
+        index = _loaded.get(predictions_path)
+    if index is None:
+        try:
+            with open(index_path(predictions_path), 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+    if index.get('version') != INDEX_VERSION or (index.get('size'), index.get('mtime_ns')) != (size, mtime_ns):
+        return None
+    with _loaded_lock:
+        _loaded[predictions_path] = index
+    return index
+
+
+def select_entries(index: dict, instance_ids: Optional[list[str]]) -> list[tuple[str, list]]:
+    """Index entries for `instance_ids` (or all), in file order."""
+    entries = index['entries']
+    if not instance_ids:
+        return list(entries.items())
+    selected = [(instance_id, entries[instance_id]) for instance_id in set(instance_ids) if instance_id in entries]
+    selected.sort(key=lambda item: item[1][0])
+    return selected
+
+
+def iter_indexed_predictions(
+    predictions_path: str,
+    index: dict,
+    instance_ids: Optional[list[str]],
+    patch_regions_over: Optional[int] = None,
+) -> Iterator[dict]:
+    """
+    Read only the requested predictions by seeking to their lines.
+
+    Patches of at least `patch_regions_over` bytes are not read at all: they are
+    yielded as PatchRegions for the upload to stream straight from the file.
+    """
+    model_name = index['model_name_or_path']
+    with open(predictions_path, 'rb') as f:
+        for instance_id, (offset, length, sha256, patch_offset, patch_length) in select_entries(index, instance_ids):
+            if patch_regions_over and patch_offset is not None and patch_length >= patch_regions_over:
+                yield {
+                    'instance_id': instance_id,
+                    'model_patch': PatchRegion(predictions_path, patch_offset, patch_length, sha256),
+                    'model_name_or_path': model_name,
+                }
+                continue
+            f.seek(offset)
+            p = json.loads(f.read(length))
+            if not isinstance(p, dict) or p.get('instance_id') != instance_id:
+                raise ValueError(
+                    f"The index of {predictions_path} is out of date - rebuild it with `sb-cli build-index`"
+                )
+            yield {
+                'instance_id': instance_id,
+                'model_patch': p['model_patch'],
+                'model_name_or_path': model_name,
+            }
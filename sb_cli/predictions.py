@@ -0,0 +1,241 @@
+import gzip
+import hashlib
+import io
+import json
+from typing import Iterator, Optional
+
+CHUNK_SIZE = 1 << 16
+COMPRESSION_SUFFIXES = ('.gz', '.zst')
+# Sent instead of model_patch when the API already stores an identical patch
+PATCH_REFERENCE_KEY = 'patch_sha256'
+
+
+class PatchRegion:
+    """
+    A patch left in its predictions file, to be streamed into request bodies.
+
+    Holds the byte range of the patch's JSON string token (quotes included) in the
+    file, so uploads can copy it in fixed-size chunks without ever decoding it.
+    """
+
+    __slots__ = ('path', 'offset', 'length', 'sha256')
+
+    def __init__(self, path: str, offset: int, length: int, sha256: str):
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self.sha256 = sha256
+
+    def iter_bytes(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            remaining = self.length
+            while remaining:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    raise ValueError(f"{self.path} is shorter than its index says - rebuild it with `sb-cli build-index`")
+                remaining -= len(chunk)
+                yield chunk
+
+    def read(self) -> str:
+        """The decoded patch, for code paths that need it in memory."""
+        return json.loads(b''.join(self.iter_bytes()))
+
+
+def patch_hash(model_patch: str) -> str:
+    """Content hash identifying a patch across runs and re-submissions."""
+    return hashlib.sha256(model_patch.encode('utf-8')).hexdigest()
+
+
+def prediction_hash(prediction: dict) -> str:
+    """Patch hash of a prediction, whether it carries the patch itself or a reference to it."""
+    if PATCH_REFERENCE_KEY in prediction:
+        return prediction[PATCH_REFERENCE_KEY]
+    model_patch = prediction['model_patch']
+    return model_patch.sha256 if isinstance(model_patch, PatchRegion) else patch_hash(model_patch)
+
+
+def prediction_bytes(prediction: dict) -> int:
+    """Serialized size of a prediction, without reading a patch left in its file."""
+    model_patch = prediction.get('model_patch')
+    if isinstance(model_patch, PatchRegion):
+        rest = {key: value for key, value in prediction.items() if key != 'model_patch'}
+        return len(json.dumps(rest).encode()) + len(', "model_patch": ') + model_patch.length
+    return len(json.dumps(prediction).encode())
+
+
+def as_patch_reference(prediction: dict, digest: str) -> dict:
+    """The prediction with its patch replaced by the hash of a patch the API already stores."""
+    reference = {key: value for key, value in prediction.items() if key != 'model_patch'}
+    reference[PATCH_REFERENCE_KEY] = digest
+    return reference
+
+
+def open_predictions(predictions_path: str):
+    """Open a predictions file as text, transparently decompressing .gz and .zst files."""
+    if predictions_path.endswith('.gz'):
+        return gzip.open(predictions_path, 'rt', encoding='utf-8')
+    if predictions_path.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(
+                "Reading .zst predictions requires zstandard - install it with `pip install 'sb-cli[zstd]'`"
+            )
+        reader = zstandard.ZstdDecompressor().stream_reader(open(predictions_path, 'rb'), closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8')
+    return open(predictions_path, 'r', encoding='utf-8')
+
+
+def is_json_document(predictions_path: str) -> bool:
+    """Whether the file is a single JSON document (.json) rather than JSON lines."""
+    for suffix in COMPRESSION_SUFFIXES:
+        if predictions_path.endswith(suffix):
+            predictions_path = predictions_path[:-len(suffix)]
+    return predictions_path.endswith('.json')
+
+
+def iter_json_items(f, chunk_size: int = CHUNK_SIZE) -> Iterator[tuple[Optional[str], object]]:
+    """
+    Yield the items of a top-level JSON list or object one at a time.
+
+    List items are yielded as (None, value) and object members as (key, value); only
+    the item being decoded is held in memory, not the whole document.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = '', 0, False
+
+    def read_more(grow: bool = False):
+        nonlocal buf, pos, eof
+        # Grow reads with the pending buffer so decoding a huge value is not quadratic
+        chunk = f.read(max(chunk_size, len(buf) - pos) if grow else chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    def peek() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n':
+                pos += 1
+            if pos < len(buf) or eof:
+                return buf[pos:pos + 1]
+            read_more()
+
+    def expect(char: str):
+        nonlocal pos
+        if peek() != char:
+            raise ValueError(f"Malformed predictions file: expected '{char}' at character {pos}")
+        pos += 1
+
+    def decode():
+        nonlocal pos
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                read_more(grow=True)
+                continue
+            if end == len(buf) and not eof:
+                # A scalar at the buffer edge may be truncated - decode again with more data
+                read_more(grow=True)
+                continue
+            pos = end
+            return value
+
+    opening = peek()
+    if opening not in ('[', '{'):
+        raise ValueError("Predictions file must contain a JSON list or object")
+    closing = ']' if opening == '[' else '}'
+    pos += 1
+    first = True
+    while True:
+        if peek() == closing:
+            return
+        if not first:
+            expect(',')
+            peek()
+        first = False
+        key = None
+        if opening == '{':
+            key = decode()
+            expect(':')
+            peek()
+        yield key, decode()
+
+
+def iter_predictions(
+    predictions_path: str,
+    instance_ids: Optional[list[str]] = None,
+    patch_regions_over: Optional[int] = None,
+) -> Iterator[dict]:
+    """
+    Stream validated predictions from a JSON/JSONL file, optionally gzip/zstd compressed.
+
+    Duplicate instance IDs and mixed model names raise ValueError as soon as they are seen.
+    A subset of a file with an up-to-date sidecar index is read by seeking straight to
+    its lines instead. With `patch_regions_over`, patches at least that many bytes long
+    in an indexed file are left on disk as PatchRegions.
+    """
+    if instance_ids or patch_regions_over:
+        from sb_cli.prediction_index import iter_indexed_predictions, load_index
+        index = load_index(predictions_path)
+        if index:
+            yield from iter_indexed_predictions(predictions_path, index, instance_ids, patch_regions_over)
+            return
+    instance_ids = frozenset(instance_ids) if instance_ids else None
+    seen_ids = set()
+    model_name = None
+    with open_predictions(predictions_path) as f:
+        if is_json_document(predictions_path):
+            items = iter_json_items(f)
+        else:
+            items = ((None, json.loads(line)) for line in f if line.strip())
+        for instance_id, p in items:
+            if not isinstance(p, dict):
+                raise ValueError(f"Each prediction must be a JSON object, got {type(p).__name__}")
+            if instance_id is None:
+                if 'instance_id' not in p:
+                    raise ValueError("Prediction is missing 'instance_id'")
+                instance_id = p['instance_id']
+            if instance_ids and instance_id not in instance_ids:
+                continue
+            for key in ('model_patch', 'model_name_or_path'):
+                if key not in p:
+                    raise ValueError(f"Prediction for instance {instance_id} is missing '{key}'")
+            if model_name is None:
+                model_name = p['model_name_or_path']
+            elif p['model_name_or_path'] != model_name:
+                raise ValueError("All predictions must be for the same model")
+            if instance_id in seen_ids:
+                raise ValueError("Duplicate instance IDs found in predictions - please remove duplicates before submitting")
+            seen_ids.add(instance_id)
+            yield {
+                'instance_id': instance_id,
+                'model_patch': p['model_patch'],
+                'model_name_or_path': p['model_name_or_path']
+            }
+
+
+def scan_predictions(predictions_path: str, instance_ids: Optional[list[str]] = None) -> dict[str, str]:
+    """
+    Validate a predictions file without retaining patches and return instance_id -> patch hash.
+
+    Files with an up-to-date sidecar index were validated when it was built, so their
+    hashes come from the index without reading the file.
+    """
+    from sb_cli.prediction_index import load_index, select_entries
+    index = load_index(predictions_path)
+    if index:
+        return {instance_id: entry[2] for instance_id, entry in select_entries(index, instance_ids)}
+    return {
+        pred['instance_id']: patch_hash(pred['model_patch'])
+        for pred in iter_predictions(predictions_path, instance_ids)
+    }
+
+
+def process_predictions(predictions_path: str, instance_ids: Optional[list[str]] = None) -> list[dict]:
+    """Load and validate predictions from file."""
+    return list(iter_predictions(predictions_path, instance_ids))
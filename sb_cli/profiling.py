@@ -0,0 +1,259 @@
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+_local = threading.local()
+
+
+class _TimedConnectionMixin:
+    """Records how long opening a connection took, for the request on the same thread to pick up."""
+
+    def _new_conn(self):
+        # DNS resolution and the TCP handshake happen together in create_connection
+        start = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            _local.tcp = time.perf_counter() - start
+
+    def connect(self):
+        _local.tcp = 0.0
+        start = time.perf_counter()
+        super().connect()
+        total = time.perf_counter() - start
+        _local.setup = (_local.tcp, max(0.0, total - _local.tcp))
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections record connect and TLS handshake times."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+def take_connection_timings() -> tuple[float, float]:
+    """(connect, tls) seconds for a connection opened by this thread's last request, or zeros if it reused one."""
+    setup = getattr(_local, "setup", (0.0, 0.0))
+    _local.setup = (0.0, 0.0)
+    return setup
+
+
+class RequestTrace:
+    """httpx `trace` extension callback that turns connection events into the same timings."""
+
+    def __init__(self):
+        self.events = {}
+
+    async def __call__(self, event_name: str, info: dict):
+        # e.g. "connection.connect_tcp.started" or "http11.receive_response_headers.complete"
+        step, edge = event_name.rsplit(".", 2)[-2:]
+        self.events[(step, edge)] = time.perf_counter()
+
+    def span(self, start_step: str, end_step: Optional[str] = None) -> float:
+        start = self.events.get((start_step, "started"))
+        end = self.events.get((end_step or start_step, "complete"))
+        return end - start if start is not None and end is not None else 0.0
+
+    def timings(self) -> dict:
+        return {
+            "connect": self.span("connect_tcp"),
+            "tls": self.span("start_tls"),
+            "ttfb": self.span("send_request_headers", "receive_response_headers"),
+            "transfer": self.span("receive_response_body"),
+        }
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+class Profiler:
+    """
+    Collects phase spans and per-request timings for `--profile` and `--trace_file`.
+
+    Recording is a no-op until `enable()` is called. Requests keep their attempt
+    number, status, payload sizes and the connect/TLS/time-to-first-byte/transfer
+    split; DNS lookup time is part of connect.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.console = None
+        self.trace_file = None
+        self.origin = time.perf_counter()
+        self.phases = []
+        self.requests = []
+        self._tracks = {}
+        self._lock = threading.Lock()
+
+    def enable(self, console=None, trace_file: Optional[str] = None):
+        """Start recording; at exit print a summary to `console` and/or write a trace file."""
+        if not self.enabled:
+            atexit.register(self.finish)
+        self.enabled = True
+        self.origin = time.perf_counter()
+        self.console = console
+        self.trace_file = trace_file
+
+    def finish(self):
+        """Output what the latest `enable()` asked for; registered to run at exit."""
+        if self.console is not None:
+            self.print_summary(self.console)
+        if self.trace_file:
+            self.write_trace(self.trace_file)
+            if self.console is not None:
+                self.console.print(f"[green]  Saved trace to {self.trace_file}[/]")
+
+    def _track(self, key) -> int:
+        # Small stable IDs read better than thread idents in trace viewers
+        return self._tracks.setdefault(key, len(self._tracks) + 1)
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases.append({"name": name, "start": start, "duration": time.perf_counter() - start})
+
+    def record_request(
+        self,
+        method: str,
+        endpoint: str,
+        status: Optional[int],
+        attempt: int,
+        start: float,
+        duration: float,
+        sent_bytes: int = 0,
+        received_bytes: int = 0,
+        track=None,
+        **timings: float,
+    ):
+        """Record one HTTP attempt; `timings` holds connect, tls, ttfb and transfer seconds."""
+        with self._lock:
+            self.requests.append({
+                "method": method.upper(),
+                "endpoint": endpoint,
+                "status": status,
+                "attempt": attempt,
+                "start": start,
+                "duration": duration,
+                "sent_bytes": sent_bytes,
+                "received_bytes": received_bytes,
+                "track": self._track(track if track is not None else threading.get_ident()),
+                **timings,
+            })
+
+    def print_summary(self, console):
+        from rich import box
+        from rich.table import Table
+        from sb_cli.utils import format_bytes
+
+        total = time.perf_counter() - self.origin
+        phases = Table(title="Phases", box=box.SIMPLE_HEAD)
+        phases.add_column("Phase")
+        phases.add_column("Seconds", justify="right")
+        phases.add_column("Share", justify="right")
+        for phase in self.phases:
+            phases.add_row(phase["name"], f"{phase['duration']:.2f}", f"{phase['duration'] / total:.0%}")
+        phases.add_row("total", f"{total:.2f}", "", style="bold")
+        console.print(phases)
+
+        by_endpoint = {}
+        for request in self.requests:
+            by_endpoint.setdefault(request["endpoint"], []).append(request)
+        requests_table = Table(title="Requests (times in ms)", box=box.SIMPLE_HEAD, collapse_padding=True)
+        requests_table.add_column("Endpoint", no_wrap=True)
+        for column in ["n", "Retry", "Err", "p50", "p99", "Conn", "TLS", "TTFB", "Xfer", "Sent"]:
+            requests_table.add_column(column, justify="right", no_wrap=True)
+        for endpoint, requests in sorted(by_endpoint.items()):
+            durations = [r["duration"] * 1000 for r in requests]
+            requests_table.add_row(
+                endpoint,
+                str(len(requests)),
+                str(sum(1 for r in requests if r["attempt"] > 0)),
+                str(sum(1 for r in requests if r["status"] is None or r["status"] >= 400)),
+                f"{percentile(durations, 0.5):.0f}",
+                f"{percentile(durations, 0.99):.0f}",
+                f"{sum(r.get('connect', 0) for r in requests) * 1000:.0f}",
+                f"{sum(r.get('tls', 0) for r in requests) * 1000:.0f}",
+                f"{percentile([r.get('ttfb', 0) * 1000 for r in requests], 0.5):.0f}",
+                f"{percentile([r.get('transfer', 0) * 1000 for r in requests], 0.5):.0f}",
+                format_bytes(sum(r["sent_bytes"] for r in requests)),
+            )
+        console.print(requests_table)
+        console.print("  Conn (connect incl. DNS) and TLS are totals, TTFB and Xfer (transfer) medians")
+
+    def trace_events(self) -> list[dict]:
+        """Phases and requests as Chrome trace "complete" events (timestamps in microseconds)."""
+        pid = os.getpid()
+
+        def us(seconds: float) -> float:
+            return round(seconds * 1e6, 1)
+
+        events = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "sb-cli"}},
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "phases"}},
+        ]
+        for phase in self.phases:
+            events.append({
+                "name": phase["name"], "cat": "phase", "ph": "X", "pid": pid, "tid": 0,
+                "ts": us(phase["start"] - self.origin), "dur": us(phase["duration"]),
+            })
+        for request in self.requests:
+            start = request["start"] - self.origin
+            events.append({
+                "name": f"{request['method']} /{request['endpoint']}", "cat": "request", "ph": "X",
+                "pid": pid, "tid": request["track"], "ts": us(start), "dur": us(request["duration"]),
+                "args": {key: value for key, value in request.items() if key not in ("start", "track")},
+            })
+            # Lay the connection steps out back to back inside the request span
+            offset = start
+            for step in ("connect", "tls", "ttfb", "transfer"):
+                if request.get(step):
+                    events.append({
+                        "name": step, "cat": "request_step", "ph": "X", "pid": pid, "tid": request["track"],
+                        "ts": us(offset), "dur": us(request[step]),
+                    })
+                    offset += request[step]
+        return events
+
+    def write_trace(self, path: str):
+        """Write a Chrome trace (viewable in chrome://tracing or Perfetto)."""
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f)
+
+
+profiler = Profiler()
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+from sb_cli.config import REPORT_CACHE_DIR, REPORT_CACHE_MAX_AGE, REPORT_CACHE_MAX_BYTES
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are kept from racing
+    fcntl = None
+
+INDEX_FILE = 'index.json'
+LOCK_FILE = 'index.lock'
+BLOB_DIR = 'blobs'
+
+
+def report_key(subset: str, split: str, run_id: str, extra: Optional[dict] = None) -> str:
+    """Cache key for a report; extra request arguments get their own entry."""
+    key = f"{subset}__{split}__{run_id}"
+    if extra:
+        key += "__" + hashlib.sha256(json.dumps(extra, sort_keys=True).encode()).hexdigest()[:12]
+    return key
+
+
+class ReportCache:
+    """
+    Content-addressed cache of /get-report responses.
+
+    Response bodies are stored once under their sha256 in `blobs/`, and `index.json`
+    maps each (subset, split, run_id) key to its blob along with the ETag and
+    Last-Modified validators used for conditional fetches. Entries are evicted
+    oldest-first once they exceed the age limit or the cache exceeds its size limit.
+    The daemon and CLI processes share the cache, so changes to the index are made
+    under a lock on `index.lock`.
+    """
+
+    def __init__(
+        self,
+        path: str = REPORT_CACHE_DIR,
+        max_bytes: int = REPORT_CACHE_MAX_BYTES,
+        max_age: float = REPORT_CACHE_MAX_AGE,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            self.path.mkdir(parents=True, exist_ok=True)
+            with open(self.path / LOCK_FILE, 'a') as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield  # closing the file releases the lock
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.path / BLOB_DIR / f"{digest}.json"
+
+    def _read_index(self) -> dict:
+        try:
+            with open(self.path / INDEX_FILE, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, index: dict):
+        # Replace atomically so concurrent readers never see a partial index
+        tmp_path = self.path / f"{INDEX_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.path / INDEX_FILE)
+
+    def lookup(self, key: str) -> Optional[dict]:
+        """The index entry for `key`, if its blob is still on disk."""
+        entry = self._read_index().get(key)
+        if entry and self._blob_path(entry['digest']).exists():
+            return entry
+        return None
+
+    def conditional_headers(self, entry: Optional[dict]) -> dict:
+        """If-None-Match / If-Modified-Since headers for revalidating a cached entry."""
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def load(self, entry: dict) -> dict:
+        with open(self._blob_path(entry['digest']), 'rb') as f:
+            return json.load(f)
+
+    def touch(self, key: str):
+        """Mark `key` as just revalidated (a 304), so it isn't evicted as expired."""
+        with self._locked():
+            index = self._read_index()
+            if key in index:
+                index[key]['fetched_at'] = time.time()
+                self._write_index(index)
+
+    def store(self, key: str, body: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Store a response body under `key`; identical bodies share one blob."""
+        digest = hashlib.sha256(body).hexdigest()
+        with self._locked():
+            blob_path = self._blob_path(digest)
+            if not blob_path.exists():
+                blob_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = blob_path.with_suffix(f".{os.getpid()}.tmp")
+                with open(tmp_path, 'wb') as f:
+                    f.write(body)
+                os.replace(tmp_path, blob_path)
+            index = self._read_index()
+            replaced = index.get(key)
+            index[key] = {
+                'digest': digest,
+                'size': len(body),
+                'etag': etag,
+                'last_modified': last_modified,
+                'fetched_at': time.time(),
+            }
+            self._evict(index, [replaced['digest']] if replaced else [])
+            self._write_index(index)
+
+    def _evict(self, index: dict, dropped: list[str]):
+        """
+        Drop expired entries, then the oldest ones until the cache fits, and delete the
+        blobs no entry refers to any more, out of those and the `dropped` digests.
+        """
+        now = time.time()
+        for key in [key for key, entry in index.items() if now - entry['fetched_at'] > self.max_age]:
+            dropped.append(index.pop(key)['digest'])
+        oldest_first = sorted(index, key=lambda key: index[key]['fetched_at'])
+        sizes = {entry['digest']: entry['size'] for entry in index.values()}
+        total = sum(sizes.values())
+        for key in oldest_first[:-1]:
+            if total <= self.max_bytes:
+                break
+            digest = index.pop(key)['digest']
+            dropped.append(digest)
+            if all(entry['digest'] != digest for entry in index.values()):
+                total -= sizes[digest]
+        live = {entry['digest'] for entry in index.values()}
+        for digest in set(dropped) - live:
+            self._blob_path(digest).unlink(missing_ok=True)
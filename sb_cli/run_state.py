@@ -0,0 +1,90 @@
+from typing import Callable, Iterable, Optional
+
+PENDING, RUNNING, COMPLETED = 0, 1, 2
+
+
+class InstanceIndex:
+    """The instance IDs of a submission with an id -> position map, built once per run."""
+
+    def __init__(self, instance_ids: Iterable[str]):
+        self.ids = tuple(dict.fromkeys(instance_ids))
+        self.positions = {instance_id: i for i, instance_id in enumerate(self.ids)}
+
+    def __contains__(self, instance_id: str) -> bool:
+        return instance_id in self.positions
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class RunProgress:
+    """
+    Running/completed/pending state of a submission, reconciled incrementally from polls.
+
+    States only move forward (pending -> running -> completed), so each poll only
+    touches the IDs whose state changed and counts are never recomputed from scratch.
+    """
+
+    def __init__(self, index: InstanceIndex, on_advance: Optional[Callable[[list[str], int], None]] = None):
+        self.index = index
+        self.states = bytearray(len(index))
+        self.counts = [len(index), 0, 0]
+        # Called with (changed_ids, state) whenever IDs move to a later state
+        self.on_advance = on_advance
+
+    def advance(self, instance_ids: Iterable[str], state: int) -> list[str]:
+        """Move IDs to `state` and return the ones that changed."""
+        changed = []
+        positions, states, counts = self.index.positions, self.states, self.counts
+        for instance_id in instance_ids:
+            position = positions.get(instance_id)
+            if position is None or states[position] >= state:
+                continue
+            counts[states[position]] -= 1
+            counts[state] += 1
+            states[position] = state
+            changed.append(instance_id)
+        if changed and self.on_advance:
+            self.on_advance(changed, state)
+        return changed
+
+    def update(self, results: dict) -> dict:
+        """Apply a /poll-jobs response and return the newly running and newly completed IDs."""
+        # Apply completions first so an ID reported in both lists ends up completed
+        completed = self.advance(results.get('completed', ()), COMPLETED)
+        running = self.advance(results.get('running', ()), RUNNING)
+        return {'running': running, 'completed': completed}
+
+    def without(self, instance_ids: Iterable[str]) -> 'RunProgress':
+        """A copy that no longer tracks `instance_ids`, e.g. predictions that failed to upload."""
+        dropped = set(instance_ids)
+        progress = RunProgress(InstanceIndex(i for i in self.index if i not in dropped), self.on_advance)
+        for instance_id, position in progress.index.positions.items():
+            state = self.states[self.index.positions[instance_id]]
+            progress.states[position] = state
+            progress.counts[PENDING] -= 1
+            progress.counts[state] += 1
+        return progress
+
+    def ids_with_state(self, state: int) -> list[str]:
+        """Return the IDs currently in `state`, in submission order."""
+        return [self.index.ids[i] for i, s in enumerate(self.states) if s == state]
+
+    @property
+    def pending(self) -> int:
+        return self.counts[PENDING]
+
+    @property
+    def running(self) -> int:
+        return self.counts[RUNNING]
+
+    @property
+    def completed(self) -> int:
+        return self.counts[COMPLETED]
+
+    @property
+    def total(self) -> int:
+        return len(self.index)
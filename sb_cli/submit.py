@@ -1,74 +1,114 @@
-import json
 import time
 import requests
 import typer
 import sys
-from typing import Optional
+from contextlib import nullcontext
+from typing import Callable, Iterable, Iterator, Optional
 from typing_extensions import Annotated
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn, TimeElapsedColumn
 from rich.console import Console
-from sb_cli.config import API_BASE_URL, Subset
-from sb_cli.get_report import get_report
-from sb_cli.utils import verify_response
+from rich.text import Text
+from sb_cli.client import SWEBenchClient
+from sb_cli.config import MAX_PATCH_BYTES, STREAM_BODY_MIN_BYTES, SUBMIT_WORKERS, Engine, OutputFormat, Subset
+from sb_cli.failures import RETRY_ROUNDS, UploadFailures, parse_instance_ids
+from sb_cli.get_quotas import check_quota
+from sb_cli.get_report import save_report
+from sb_cli.journal import SubmissionJournal
+from sb_cli.live_report import LiveReport, start_live_report
+from sb_cli.output import EventProgress, emit, is_ndjson, make_console, set_event_context, set_output_format
+from sb_cli.predictions import (
+    as_patch_reference,
+    iter_predictions,
+    prediction_bytes,
+    prediction_hash,
+    process_predictions,  # noqa: F401 - re-exported, it used to be defined here
+    scan_predictions,
+)
+from sb_cli.polling import JobPoller, PollScheduler, default_timeout, poll_until
+from sb_cli.profiling import profiler
+from sb_cli.run_state import COMPLETED, PENDING, RUNNING, InstanceIndex, RunProgress
+from sb_cli.utils import get_retry_delay, upload_stats, verify_response
+from sb_cli.validate import validate_predictions, write_validation_report
 from pathlib import Path
 
 app = typer.Typer(help="Submit predictions to the SBM API")
 
-def submit_prediction(prediction: dict, headers: dict, payload_base: dict):
+BATCH_MAX_PREDICTIONS = 50
+BATCH_MAX_BYTES = 4 * 1024 * 1024
+HASH_CHECK_MAX_IDS = 5000
+
+def submit_prediction(prediction: dict, client: SWEBenchClient, payload_base: dict):
     """Submit a single prediction."""
     payload = payload_base.copy()
     payload["prediction"] = prediction
-    response = requests.post(f'{API_BASE_URL}/submit', json=payload, headers=headers)
+    response = client.request('post', 'submit', json=payload, compress=True)
     verify_response(response)
     return response.json()
 
-# Prediction Processing
-def process_predictions(predictions_path: str, instance_ids: list[str]):
-    """Load and validate predictions from file."""
-    with open(predictions_path, 'r') as f:
-        if predictions_path.endswith('.json'):
-            predictions = json.load(f)
-        else:
-            predictions = [json.loads(line) for line in f]
-    preds = []
-    if isinstance(predictions, list):
-        for p in predictions:
-            instance_id = p['instance_id']
-            if instance_ids and instance_id not in instance_ids:
-                continue
-            preds.append({
-                'instance_id': instance_id,
-                'model_patch': p['model_patch'],
-                'model_name_or_path': p['model_name_or_path']
-            })
-    else:
-        for instance_id, p in predictions.items():
-            if instance_ids and instance_id not in instance_ids:
-                continue
-            preds.append({
-                'instance_id': instance_id,
-                'model_patch': p['model_patch'],
-                'model_name_or_path': p['model_name_or_path']
-            })
-    if len(set([p['model_name_or_path'] for p in preds])) > 1:
-        raise ValueError("All predictions must be for the same model")
-    if len(set([p['instance_id'] for p in preds])) != len(preds):
-        raise ValueError("Duplicate instance IDs found in predictions - please remove duplicates before submitting")
-    return preds
+def submit_batch(predictions: list[dict], client: SWEBenchClient, payload_base: dict) -> list[dict]:
+    """Submit a chunk of predictions in a single request."""
+    payload = payload_base.copy()
+    payload["predictions"] = predictions
+    response = client.request('post', 'submit-batch', json=payload, compress=True)
+    verify_response(response)
+    return response.json()["results"]
+
+def create_submit_context(client: SWEBenchClient, payload_base: dict) -> dict:
+    """
+    Send the static per-run fields once if the API supports submit contexts.
+
+    Returns the base payload for every upload: a context ID standing in for the run
+    fields, or the run fields themselves when contexts are not supported. Those leave
+    out `instance_ids`, which would grow every upload with the size of the run; the
+    predictions are already filtered to them.
+    """
+    if "submit-context" not in client.capabilities:
+        return {key: value for key, value in payload_base.items() if key != "instance_ids"}
+    response = client.request('post', 'submit-context', json=payload_base)
+    verify_response(response)
+    return {"context_id": response.json()["context_id"]}
+
+def chunk_predictions(
+    predictions: Iterable[dict],
+    max_count: int = BATCH_MAX_PREDICTIONS,
+    max_bytes: int = BATCH_MAX_BYTES,
+):
+    """Yield chunks of predictions capped by count and serialized size."""
+    chunk, chunk_bytes = [], 0
+    for pred in predictions:
+        pred_bytes = prediction_bytes(pred)
+        if chunk and (len(chunk) >= max_count or chunk_bytes + pred_bytes > max_bytes):
+            yield chunk
+            chunk, chunk_bytes = [], 0
+        chunk.append(pred)
+        chunk_bytes += pred_bytes
+    if chunk:
+        yield chunk
 
 def process_poll_response(results: dict, all_ids: list[str]):
     """Process polling response and categorize instance IDs."""
-    running_ids = set(results['running']) & set(all_ids)
-    completed_ids = set(results['completed']) & set(all_ids)
-    pending_ids = set(all_ids) - running_ids - completed_ids
+    run_state = RunProgress(InstanceIndex(all_ids))
+    run_state.update(results)
     return {
-        'running': list(running_ids),
-        'completed': list(completed_ids),
-        'pending': list(pending_ids)
+        'running': run_state.ids_with_state(RUNNING),
+        'completed': run_state.ids_with_state(COMPLETED),
+        'pending': run_state.ids_with_state(PENDING)
     }
 
 # Progress Tracking Functions
+class SummaryProgress(Progress):
+    """A progress bar with a text summary below it, redrawn in place as it changes."""
+
+    def __init__(self, *columns, summary: Callable[[], str], **kwargs):
+        # Set first: the base class may render while it initializes
+        self.summary = summary
+        super().__init__(*columns, **kwargs)
+
+    def get_renderables(self):
+        yield from super().get_renderables()
+        yield Text(self.summary())
+
 def run_progress_task(
     console: Console, 
     task_name: str, 
@@ -76,22 +116,34 @@ def run_progress_task(
     task_func, 
     timeout: Optional[int] = None, 
     *args, 
+    event: str = "progress",
+    summary: Optional[Callable[[], str]] = None,
     **kwargs
 ):
-    """Run a task with a progress bar and a default timeout."""
-    progress = Progress(
+    """
+    Run a task with a progress bar and a default timeout.
+
+    `summary` returns text to show below the bar while it runs. In ndjson output mode
+    the bar is replaced by `event` events with done/total counts.
+    """
+    columns = (
         SpinnerColumn(),
         TextColumn(f"[blue]{task_name}..."),
         BarColumn(),
         TaskProgressColumn(text_format="[progress.percentage]{task.percentage:>3.1f}%"),
         TimeElapsedColumn(),
-        console=console,
     )
+    if is_ndjson():
+        progress = EventProgress()
+    elif summary:
+        progress = SummaryProgress(*columns, summary=summary, console=console)
+    else:
+        progress = Progress(*columns, console=console)
     start_time = time.time()
     completed = 0
     exception = None
     with progress:
-        task = progress.add_task("", total=total)
+        task = progress.add_task("", total=total, event=event)
         try:
             # Run the task function with a timeout
             result = task_func(progress, task, *args, **kwargs)
@@ -102,6 +154,7 @@ def run_progress_task(
             progress.stop()
             if exception:
                 console.print(f"[red]Error during task: {str(exception)}[/]")
+                emit("error", task=event, message=str(exception))
                 raise exception
             final_percentage = progress.tasks[task].completed / progress.tasks[task].total * 100
             completed = progress.tasks[task].completed
@@ -112,6 +165,7 @@ def run_progress_task(
             elif timeout and elapsed_time > timeout:
                 # don't print the timeout message if the task completed
                 console.print(f"[red]✗ {task_name} timed out after {timeout} seconds. Try re-running submit to continue.[/]")
+                emit("timeout", task=event, done=completed, total=total, timeout=timeout)
                 sys.exit(1)
             else:
                 console.print(f"[yellow]✓ {task_name} completed with {completed}/{total} instances[/]")
@@ -124,50 +178,187 @@ def run_progress_task(
         "timeout": timeout and elapsed_time > timeout,
     }
 
+class UploadTracker:
+    """
+    Outcomes of the uploads of one submission, shared by the upload engines.
+
+    Sorts the instance IDs each upload reports into new and already submitted ones,
+    records them in the journal, and collects failures in `failures`: with
+    `fail_fast` the first failure stops the submission, otherwise retriable ones are
+    queued for up to RETRY_ROUNDS more passes. `on_advance` is called with the number
+    of predictions each finished or abandoned upload covered.
+    """
+
+    def __init__(
+        self,
+        *,
+        journal: Optional[SubmissionJournal] = None,
+        fail_fast: bool = True,
+        failures: Optional[UploadFailures] = None,
+        on_advance: Optional[Callable[[int], None]] = None,
+    ):
+        self.journal = journal
+        self.fail_fast = fail_fast
+        self.failures = failures if failures is not None else UploadFailures()
+        self.on_advance = on_advance or (lambda count: None)
+        self.new_ids = []
+        self.completed_ids = []
+        self.errors = []
+
+    @property
+    def stopped(self) -> bool:
+        """Whether a failure under `fail_fast` means no more uploads should start."""
+        return self.fail_fast and bool(self.errors)
+
+    def succeeded(self, chunk: list[dict], results: list[dict]):
+        self.failures.succeeded(chunk)
+        for launch_data in results:
+            if launch_data["launched"]:
+                self.new_ids.append(launch_data['instance_id'])
+            else:
+                self.completed_ids.append(launch_data['instance_id'])
+        if self.journal:
+            self.journal.record_submitted({pred['instance_id']: prediction_hash(pred) for pred in chunk})
+        self.on_advance(len(chunk))
+
+    def failed(self, chunk: list[dict], error: Exception, retriable: Optional[bool] = None):
+        self.errors.append(f"Error submitting prediction for instance {chunk[0]['instance_id']}: {str(error)}")
+        if self.fail_fast:
+            self.failures.add(chunk, error, retriable=False)
+        elif self.failures.add(chunk, error, retriable):
+            return  # counted once its retry finishes
+        self.on_advance(len(chunk))
+
+    def check(self):
+        """Raise the first error if a failure stopped the submission."""
+        if self.stopped:
+            raise RuntimeError(self.errors[0])
+
+    def retry_rounds(self) -> Iterator[tuple[float, list[list[dict]]]]:
+        """Yield the delay before each retry pass and the chunks to upload in it."""
+        for retry_round in range(RETRY_ROUNDS):
+            retries = self.failures.take_retries()
+            if not retries:
+                break
+            yield get_retry_delay(None, retry_round + 2), retries
+        # Whatever is still queued has used up its retries
+        for chunk in self.failures.take_retries():
+            self.on_advance(len(chunk))
+
+
+def upload_predictions(
+    client: SWEBenchClient,
+    predictions: Iterable[dict],
+    payload_base: dict,
+    *,
+    batch: bool = False,
+    journal: Optional[SubmissionJournal] = None,
+    fail_fast: bool = True,
+    failures: Optional[UploadFailures] = None,
+    on_advance: Optional[Callable[[int], None]] = None,
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> tuple[list[str], list[str]]:
+    """
+    Upload predictions through a bounded worker pool and return new and completed IDs.
+
+    With `fail_fast`, the first failure cancels the uploads that haven't started and
+    raises once the in-flight ones finish. Otherwise failures are collected in
+    `failures`, and retriable ones get up to RETRY_ROUNDS more passes. `on_advance`
+    is called with the number of predictions each finished or abandoned upload covered.
+    Uploads run on `executor` when given, so several submissions can share one pool.
+    """
+    tracker = UploadTracker(journal=journal, fail_fast=fail_fast, failures=failures, on_advance=on_advance)
+    if batch:
+        chunks = chunk_predictions(predictions)
+        submit_chunk = submit_batch
+    else:
+        chunks = ([pred] for pred in predictions)
+        submit_chunk = lambda chunk, *args: [submit_prediction(chunk[0], *args)]
+    future_to_chunk = {}
+
+    def collect(future):
+        chunk = future_to_chunk.pop(future)
+        if future.cancelled():
+            return
+        try:
+            results = future.result()
+        except Exception as e:
+            tracker.failed(chunk, e)
+            if tracker.stopped:
+                # Stop queued uploads from starting; the in-flight ones are still collected
+                for pending in future_to_chunk:
+                    pending.cancel()
+            return
+        tracker.succeeded(chunk, results)
+
+    workers = SUBMIT_WORKERS
+
+    def upload(chunks, executor):
+        # Keep a bounded window of uploads in flight so only those predictions are in memory
+        for chunk in chunks:
+            while len(future_to_chunk) >= 2 * workers:
+                done, _ = wait(future_to_chunk, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(future)
+            if tracker.stopped:
+                break
+            future_to_chunk[executor.submit(submit_chunk, chunk, client, payload_base)] = chunk
+        while future_to_chunk:
+            done, _ = wait(future_to_chunk, return_when=FIRST_COMPLETED)
+            for future in done:
+                collect(future)
+
+    with nullcontext(executor) if executor else ThreadPoolExecutor(max_workers=workers) as executor:
+        upload(chunks, executor)
+        tracker.check()
+        for delay, retries in tracker.retry_rounds():
+            time.sleep(delay)
+            upload(retries, executor)
+    return tracker.new_ids, tracker.completed_ids
+
 def submit_predictions_with_progress(
-    predictions: list[dict], 
-    headers: dict, 
+    predictions: Iterable[dict], 
+    client: SWEBenchClient, 
     payload_base: dict, 
+    batch: bool = False,
+    total: Optional[int] = None,
+    journal: Optional[SubmissionJournal] = None,
+    fail_fast: bool = True,
+    failures: Optional[UploadFailures] = None,
 ) -> tuple[list[str], list[str]]:
     """Submit predictions with a progress bar and return new and completed IDs."""
+    total = len(predictions) if total is None else total
+    failures = failures if failures is not None else UploadFailures()
     def task_func(progress, task):
-        all_new_ids = []
-        all_completed_ids = []
-        failed_ids = []
-        with ThreadPoolExecutor(max_workers=min(24, len(predictions))) as executor:
-            future_to_prediction = {
-                executor.submit(submit_prediction, pred, headers, payload_base): pred 
-                for pred in predictions
-            }
-            for future in as_completed(future_to_prediction):
-                try:
-                    launch_data = future.result()
-                    if launch_data["launched"]:
-                        all_new_ids.append(launch_data['instance_id'])
-                    else:
-                        all_completed_ids.append(launch_data['instance_id'])
-                except Exception as e:
-                    # Retrieve the prediction associated with the failed future
-                    pred = future_to_prediction[future]
-                    failed_ids.append(pred['instance_id'])
-                    raise RuntimeError(f"Error submitting prediction for instance {pred['instance_id']}: {str(e)}")
-                finally:
-                    progress.update(task, advance=1)
-        return {
-            "new_ids": all_new_ids,
-            "all_completed_ids": all_completed_ids,
-            "failed_ids": failed_ids
-        }
-    console = Console()
-    result = run_progress_task(
+        return upload_predictions(
+            client,
+            predictions,
+            payload_base,
+            batch=batch,
+            journal=journal,
+            fail_fast=fail_fast,
+            failures=failures,
+            on_advance=lambda count: progress.update(task, advance=count),
+        )
+    console = make_console()
+    new_ids, all_completed_ids = run_progress_task(
         console,
         "Submitting predictions", 
-        len(predictions), 
+        total, 
         task_func,
+        event="submitted",
     )["result"]
-    new_ids = result["new_ids"]
-    all_completed_ids = result["all_completed_ids"]
-    failed_ids = result["failed_ids"]
+    print_submission_summary(console, new_ids, all_completed_ids, failures.failed_ids)
+    return new_ids, all_completed_ids
+
+def print_submission_summary(
+    console: Console,
+    new_ids: list[str],
+    all_completed_ids: list[str],
+    failed_ids: list[str],
+):
+    """Print counts of new, already submitted and failed predictions."""
+    emit("uploaded", new=len(new_ids), already_submitted=len(all_completed_ids), failed=len(failed_ids))
     if len(all_completed_ids) > 0:
         console.print((
             f'[yellow]  Warning: {len(all_completed_ids)} predictions already submitted. '
@@ -181,40 +372,38 @@ def submit_predictions_with_progress(
         console.print(
             f'[red]✗ {len(failed_ids)} predictions failed to submit[/]'
         )
-    return new_ids, all_completed_ids
 
 def wait_for_running(
     *, 
     all_ids: list[str], 
-    api_key: str, 
+    client: SWEBenchClient, 
     subset: str,
     split: str, 
     run_id: str, 
-    timeout: int
+    timeout: int,
+    run_state: Optional[RunProgress] = None,
+    poller: Optional[JobPoller] = None
 ):
     """Spin a progress bar until no predictions are pending."""
+    run_state = run_state or RunProgress(InstanceIndex(all_ids))
+    poller = poller or client.poller(subset, split, run_id)
     def task_func(progress, task):
-        headers = {"x-api-key": api_key}
-        poll_payload = {'run_id': run_id, 'subset': subset, 'split': split}
-        start_time = time.time()
-        while True:
-            poll_response = requests.get(f'{API_BASE_URL}/poll-jobs', json=poll_payload, headers=headers)
-            verify_response(poll_response)
-            poll_results = process_poll_response(poll_response.json(), all_ids)
-            progress.update(task, completed=len(poll_results['running']) + len(poll_results['completed']))
-            if len(poll_results['pending']) == 0:
-                break
-
-            if (time.time() - start_time) > timeout:
-                break
-            else:
-                time.sleep(8)
+        poll_until(
+            poller,
+            run_state,
+            PollScheduler(initial_interval=8),
+            is_done=lambda: run_state.pending == 0,
+            remaining=lambda: run_state.pending,
+            timeout=timeout,
+            on_update=lambda: progress.update(task, completed=run_state.running + run_state.completed),
+        )
     result = run_progress_task(
-        Console(),
+        make_console(),
         "Processing submission", 
-        len(all_ids), 
+        run_state.total, 
         task_func,
         timeout=timeout,
+        event="running",
     )
     if result["timeout"] and result["completed"] == 0:
         raise ValueError((
@@ -225,38 +414,205 @@ def wait_for_running(
 def wait_for_evaluation(
     *,
     all_ids: list[str],
-    api_key: str,
+    client: SWEBenchClient,
     subset: str,
     split: str,
     run_id: str,
-    timeout: int
+    timeout: int,
+    run_state: Optional[RunProgress] = None,
+    poller: Optional[JobPoller] = None,
+    live_report: Optional[LiveReport] = None,
 ):
-    """Spin a progress bar until all predictions are complete."""
-    def task_func(progress, task):
-        headers = {"x-api-key": api_key}
-        poll_payload = {'run_id': run_id, 'subset': subset, 'split': split}
-        start_time = time.time()
-        while True:
-            poll_response = requests.get(f'{API_BASE_URL}/poll-jobs', json=poll_payload, headers=headers)
-            verify_response(poll_response)
-            poll_results = process_poll_response(poll_response.json(), all_ids)
-            progress.update(task, completed=len(poll_results['completed']))
-            if len(poll_results['completed']) == len(all_ids):
-                break
+    """
+    Spin a progress bar until all predictions are complete.
 
-            if (time.time() - start_time) > timeout:
-                break
-            else:
-                time.sleep(15)
+    With `live_report` (tracking `run_state`), its tally is refreshed as polls report
+    completions and shown below the bar, and a last snapshot is written when the wait ends.
+    """
+    run_state = run_state or RunProgress(InstanceIndex(all_ids))
+    poller = poller or client.poller(subset, split, run_id)
+    def on_update(progress, task):
+        if live_report:
+            live_report.refresh()
+        progress.update(task, completed=run_state.completed)
+    def task_func(progress, task):
+        try:
+            poll_until(
+                poller,
+                run_state,
+                PollScheduler(initial_interval=15),
+                is_done=lambda: run_state.completed == run_state.total,
+                remaining=lambda: run_state.total - run_state.completed,
+                timeout=timeout,
+                on_update=lambda: on_update(progress, task),
+            )
+        finally:
+            if live_report:
+                live_report.refresh(force=True)
+                live_report.write_snapshot(force=True)
 
     run_progress_task(
-        Console(),
+        make_console(),
         "Evaluating predictions", 
-        len(all_ids), 
+        run_state.total, 
         task_func,
         timeout=timeout,
+        event="completed",
+        summary=live_report.summary if live_report else None,
     )
 
+def resolve_run_id(predictions_path: Path, run_id: str) -> str:
+    """Resolve the special PARENT/STEM run IDs from the predictions path."""
+    if run_id == "PARENT":
+        return predictions_path.parent.name
+    elif run_id == "STEM":
+        return predictions_path.stem
+    return run_id
+
+def prepare_submission(
+    predictions_path: str,
+    instance_ids: Optional[list[str]],
+    journal: Optional[SubmissionJournal],
+) -> tuple[dict[str, str], list[str], RunProgress]:
+    """
+    Validate a predictions file before anything is uploaded.
+
+    Returns the instance_id -> patch hash map, the IDs the journal shows as already
+    submitted, and a RunProgress seeded with the states recorded by previous runs.
+    """
+    patch_hashes = scan_predictions(str(predictions_path), instance_ids)
+    skipped_ids = [
+        instance_id for instance_id, patch_hash in patch_hashes.items()
+        if journal and journal.is_submitted(instance_id, patch_hash)
+    ]
+    run_state = RunProgress(InstanceIndex(patch_hashes))
+    if journal:
+        for state in (RUNNING, COMPLETED):
+            run_state.advance([i for i in skipped_ids if journal.state_of(i) == state], state)
+        run_state.on_advance = journal.record_state
+    return patch_hashes, skipped_ids, run_state
+
+def check_known_hashes(
+    client: SWEBenchClient,
+    subset: str,
+    split: str,
+    run_id: str,
+    patch_hashes: dict[str, str],
+) -> tuple[list[str], set[str]]:
+    """
+    Ask the API which of these patches it already has, if it supports it.
+
+    Returns the IDs already submitted to this run with the same patch, which need no
+    upload at all, and the IDs whose patch the API stores from another submission,
+    which can be sent as a hash reference instead of the full patch.
+    """
+    if not patch_hashes or "patch-hashes" not in client.capabilities:
+        return [], set()
+    submitted, known = [], set()
+    items = list(patch_hashes.items())
+    for start in range(0, len(items), HASH_CHECK_MAX_IDS):
+        payload = {
+            "subset": subset,
+            "split": split,
+            "run_id": run_id,
+            "hashes": dict(items[start:start + HASH_CHECK_MAX_IDS]),
+        }
+        response = client.request('post', 'check-hashes', json=payload, compress=True)
+        verify_response(response)
+        result = response.json()
+        submitted.extend(result.get("submitted", []))
+        known.update(result.get("known", []))
+    known.difference_update(submitted)
+    return submitted, known
+
+def deduplicate_submission(
+    client: SWEBenchClient,
+    subset: str,
+    split: str,
+    run_id: str,
+    patch_hashes: dict[str, str],
+    skipped_ids: list[str],
+    journal: Optional[SubmissionJournal],
+) -> tuple[list[str], dict[str, str]]:
+    """
+    Drop predictions whose exact patch the API already has before anything is uploaded.
+
+    Returns the updated skipped IDs and an instance_id -> hash map of the predictions
+    to send by reference. The check only saves uploads, so if it fails every pending
+    prediction is uploaded in full.
+    """
+    skipped = set(skipped_ids)
+    pending = {instance_id: digest for instance_id, digest in patch_hashes.items() if instance_id not in skipped}
+    try:
+        submitted, known = check_known_hashes(client, subset, split, run_id, pending)
+    except requests.RequestException as e:
+        make_console().print(f"[yellow]  Could not check for known patches, uploading all of them: {str(e)}[/]")
+        emit("warning", message=f"Could not check for known patches: {str(e)}")
+        return skipped_ids, {}
+    if journal and submitted:
+        journal.record_submitted({instance_id: patch_hashes[instance_id] for instance_id in submitted})
+    return skipped_ids + submitted, {instance_id: patch_hashes[instance_id] for instance_id in known}
+
+def patch_region_threshold(client: SWEBenchClient) -> Optional[int]:
+    """Patches this large are streamed from their file if the API accepts chunked uploads."""
+    return STREAM_BODY_MIN_BYTES if "chunked-requests" in client.capabilities else None
+
+def iter_pending_predictions(
+    predictions_path: str,
+    instance_ids: Optional[list[str]],
+    skipped_ids: list[str],
+    references: Optional[dict[str, str]] = None,
+    patch_regions_over: Optional[int] = None,
+):
+    """
+    Stream the predictions that still need to be uploaded, as hash references where possible.
+
+    With `patch_regions_over`, large patches in indexed files are left on disk for the
+    upload to stream (see `iter_predictions`).
+    """
+    skipped = set(skipped_ids)
+    references = references or {}
+    return (
+        as_patch_reference(pred, references[pred['instance_id']]) if pred['instance_id'] in references else pred
+        for pred in iter_predictions(str(predictions_path), instance_ids, patch_regions_over)
+        if pred['instance_id'] not in skipped
+    )
+
+def validate_submission(
+    predictions_path: str,
+    instance_ids: Optional[list[str]],
+    max_patch_bytes: int,
+    skip_invalid: bool,
+    report_path: Optional[Path],
+    strict: bool = False,
+) -> tuple[Optional[list[str]], dict[str, list[str]]]:
+    """
+    Check every patch locally and write the problems of invalid ones to `report_path`.
+
+    Returns the instance IDs to submit and the invalid predictions. Invalid predictions
+    are submitted anyway unless `skip_invalid`, in which case only the valid ones are
+    returned; with `strict`, they raise a ValueError before anything is uploaded.
+    """
+    checked, invalid = validate_predictions(predictions_path, instance_ids, max_patch_bytes)
+    if not invalid:
+        if report_path:
+            Path(report_path).unlink(missing_ok=True)  # left over from an earlier attempt
+        return instance_ids, invalid
+    first_id = next(iter(invalid))
+    summary = f"{len(invalid)} of {len(checked)} predictions failed validation (e.g. {first_id}: {invalid[first_id][0]})"
+    if report_path:
+        write_validation_report(report_path, checked, invalid, max_patch_bytes)
+        summary += f" - see {report_path}"
+    emit("validation", checked=len(checked), invalid=len(invalid), path=str(report_path) if report_path else None)
+    if strict:
+        raise ValueError(f"{summary}; fix them or pass --skip_invalid 1 to submit the rest")
+    if not skip_invalid:
+        return instance_ids, invalid
+    valid_ids = [instance_id for instance_id in checked if instance_id not in invalid]
+    if not valid_ids:
+        raise ValueError(f"No valid predictions to submit: {summary}")
+    return valid_ids, invalid
+
 # Main Submission Function
 def submit(
     subset: Subset = typer.Argument(..., help="Subset to submit predictions for"),
@@ -266,14 +622,31 @@ def submit(
     instance_ids: Optional[str] = typer.Option(
         None,
         '--instance_ids',
-        help="Instance ID subset to submit predictions - (defaults to all submitted instances)",
-        callback=lambda x: x.split(',') if x else None
+        help="Instance ID subset to submit predictions, comma-separated or @file such as a failure manifest - (defaults to all submitted instances)",
+        callback=parse_instance_ids
     ),
     output_dir: Optional[str] = typer.Option('sb-cli-reports', '--output_dir', '-o', help="Directory to save report files"),
     overwrite: int = typer.Option(0, '--overwrite', help="Overwrite existing report"),
     gen_report: int = typer.Option(1, '--gen_report', help="Generate a report after evaluation is complete"),
     verify_submission: int = typer.Option(1, '--verify_submission', help="Verify submission before waiting for completion"),
     should_wait_for_evaluation: int = typer.Option(1, '--wait_for_evaluation', help="Wait for evaluation to complete before generating a report"),
+    batch: int = typer.Option(1, '--batch', help="Upload predictions in batches when the API supports it"),
+    engine: Engine = typer.Option(Engine.threads, '--engine', help="Upload engine - asyncio overlaps verification with uploads (requires httpx)"),
+    verify_timeout: Optional[int] = typer.Option(None, '--verify_timeout', help="Seconds to wait for the submission to be processed - (defaults to 5 minutes plus 0.1s per instance)"),
+    eval_timeout: Optional[int] = typer.Option(None, '--eval_timeout', help="Seconds to wait for evaluation - (defaults to 10 minutes plus 0.5s per instance)"),
+    use_journal: int = typer.Option(1, '--journal', help="Record submission progress under the output directory so re-runs skip confirmed predictions"),
+    should_check_quota: int = typer.Option(1, '--check_quota', help="Check the remaining run quota before uploading anything"),
+    stream: int = typer.Option(1, '--stream', help="Follow job state changes pushed by the API when it supports it instead of polling"),
+    live: int = typer.Option(0, '--live', help="Show a running tally of resolved, unresolved and errored instances while waiting for evaluation"),
+    snapshots: int = typer.Option(0, '--snapshots', help="With --live, also write the tally to a .partial.json report in the output directory as it changes"),
+    validate: int = typer.Option(1, '--validate', help="Check that every patch is a well-formed diff within the size limit before uploading anything"),
+    max_patch_bytes: int = typer.Option(MAX_PATCH_BYTES, '--max_patch_bytes', help="Largest patch to submit, in bytes - (defaults to SWEBENCH_MAX_PATCH_BYTES or 1 MiB)"),
+    skip_invalid: int = typer.Option(0, '--skip_invalid', help="Submit only the valid predictions instead of all of them when some fail validation"),
+    strict: int = typer.Option(0, '--strict', help="Stop before uploading anything when some predictions fail validation"),
+    fail_fast: int = typer.Option(1, '--fail_fast', help="Stop at the first failed upload; with 0, keep going, retry transient failures and write a failure manifest"),
+    profile: int = typer.Option(0, '--profile', help="Print a summary of phase and per-request timings at the end"),
+    trace_file: Optional[str] = typer.Option(None, '--trace_file', help="Write phase and request timings to a Chrome trace JSON file"),
+    output: OutputFormat = typer.Option(OutputFormat.text, '--output', help="Output format - ndjson prints one JSON event per line instead of progress bars"),
     api_key: Optional[str] = typer.Option(
         None, 
         '--api_key', 
@@ -282,21 +655,37 @@ def submit(
     ),
 ):
     """Submit predictions to the SWE-bench M API."""
-    console = Console()
+    set_output_format(output)
+    console = make_console()
     
-    # Convert predictions_path to a Path object
-    predictions_path = Path(predictions_path)
-    
-    # Determine run_id based on special options
-    if run_id == "PARENT":
-        run_id = predictions_path.parent.name
-    elif run_id == "STEM":
-        run_id = predictions_path.stem
+    if profile or trace_file:
+        profiler.enable(console if profile else None, trace_file)
 
-    predictions = process_predictions(str(predictions_path), instance_ids)
-    headers = {
-        "x-api-key": api_key
-    }
+    client = SWEBenchClient(api_key)
+    run_id = resolve_run_id(Path(predictions_path), run_id)
+    set_event_context(run_id=run_id, subset=subset.value, split=split)
+    submit_ids = instance_ids
+    if validate:
+        validation_path = Path(output_dir or '.') / f"{subset.value}__{split}__{run_id}.validation.json"
+        with profiler.phase("validate predictions"):
+            submit_ids, invalid = validate_submission(
+                predictions_path, instance_ids, max_patch_bytes, bool(skip_invalid), validation_path, bool(strict)
+            )
+        if invalid:
+            action = "Skipping" if skip_invalid else "Submitting anyway"
+            console.print(f"[yellow]  {action} {len(invalid)} predictions that failed validation - see {validation_path}[/]")
+    if should_check_quota:
+        try:
+            with profiler.phase("check quota"):
+                check_quota(client, subset.value, split, [run_id])
+        except requests.RequestException as e:
+            console.print(f"[yellow]  Could not check remaining quota, continuing anyway: {str(e)}[/]")
+            emit("warning", message=f"Could not check remaining quota: {str(e)}")
+    journal = SubmissionJournal.for_run(output_dir, subset.value, split, run_id) if use_journal else None
+    with profiler.phase("read predictions"):
+        patch_hashes, skipped_ids, run_state = prepare_submission(predictions_path, submit_ids, journal)
+    verify_timeout = verify_timeout or default_timeout(60 * 5, len(patch_hashes), 0.1)
+    eval_timeout = eval_timeout or default_timeout(60 * 10, len(patch_hashes), 0.5)
     payload_base = {
         "split": split,
         "subset": subset,
@@ -305,31 +694,114 @@ def submit(
     }
 
     console.print(f"[yellow]  Submitting predictions for {run_id} - ({subset.value} {split})[/]")
-    
-    new_ids, all_completed_ids = submit_predictions_with_progress(predictions, headers, payload_base)
-    all_ids = new_ids + all_completed_ids
+    if skipped_ids:
+        console.print(f"[yellow]  Skipping {len(skipped_ids)} predictions recorded as submitted in {journal.path}[/]")
+    journal_skipped = len(skipped_ids)
+    with profiler.phase("check known patches"):
+        skipped_ids, references = deduplicate_submission(
+            client, subset.value, split, run_id, patch_hashes, skipped_ids, journal
+        )
+    if len(skipped_ids) > journal_skipped:
+        console.print(f"[yellow]  Skipping {len(skipped_ids) - journal_skipped} predictions the API already has for this run[/]")
+    if references:
+        console.print(f"[yellow]  Sending {len(references)} patches the API already stores as hash references[/]")
+    predictions = iter_pending_predictions(
+        predictions_path, submit_ids, skipped_ids, references, patch_region_threshold(client)
+    )
+    emit("started", total=len(patch_hashes), skipped=len(skipped_ids), references=len(references))
 
     run_metadata = {
         'run_id': run_id,
         'subset': subset.value,
         'split': split,
-        'api_key': api_key
     }
-    if verify_submission:
-        wait_for_running(
-            all_ids=all_ids, 
-            timeout=60 * 5,
-            **run_metadata
-        )
-    if should_wait_for_evaluation:
-        wait_for_evaluation(
-            all_ids=all_ids, 
-            timeout=60 * 10,
-            **run_metadata
+    poller = client.poller(**run_metadata, stream=bool(stream))
+    new_ids, all_completed_ids = [], []
+    failures = UploadFailures()
+    if len(skipped_ids) < len(patch_hashes):
+        use_batch = bool(batch) and "batch-submit" in client.capabilities
+        payload_base = create_submit_context(client, payload_base)
+        if engine == Engine.asyncio:
+            from sb_cli.async_submit import submit_predictions_async
+            # The asyncio engine polls on its own while uploading, following job events if it can
+            upload_poller = client.poller(**run_metadata, shared=False, stream=bool(stream))
+            try:
+                with profiler.phase("upload and verify"):
+                    new_ids, all_completed_ids = submit_predictions_async(
+                        predictions,
+                        client,
+                        payload_base,
+                        run_state,
+                        upload_poller,
+                        batch=use_batch,
+                        verify=bool(verify_submission),
+                        timeout=verify_timeout,
+                        already_submitted=len(skipped_ids),
+                        journal=journal,
+                        fail_fast=bool(fail_fast),
+                        failures=failures,
+                    )
+            finally:
+                if hasattr(upload_poller, 'close'):
+                    upload_poller.close()
+        else:
+            with profiler.phase("upload"):
+                new_ids, all_completed_ids = submit_predictions_with_progress(
+                    predictions,
+                    client,
+                    payload_base,
+                    batch=use_batch,
+                    total=len(patch_hashes) - len(skipped_ids),
+                    journal=journal,
+                    fail_fast=bool(fail_fast),
+                    failures=failures,
+                )
+        console.print(f"[green]  {upload_stats.summary()}[/]")
+    failures_path = Path(output_dir or '.') / f"{subset.value}__{split}__{run_id}.failures.json"
+    if not failures.failed_ids:
+        failures_path.unlink(missing_ok=True)  # left over from an earlier attempt
+    else:
+        failures.write_manifest(failures_path)
+        console.print(
+            f"[red]  Wrote {len(failures.failed_ids)} failed predictions to {failures_path} - "
+            f"retry them with --instance_ids @{failures_path}[/]"
         )
+        emit("failures", count=len(failures.failed_ids), path=str(failures_path))
+        # Failed predictions never reach the server, so stop tracking them
+        run_state = run_state.without(failures.failed_ids)
+    all_ids = skipped_ids + new_ids + all_completed_ids
+
+    if verify_submission and run_state.pending > 0:
+        with profiler.phase("wait for running"):
+            wait_for_running(
+                all_ids=all_ids,
+                timeout=verify_timeout,
+                run_state=run_state,
+                poller=poller,
+                client=client,
+                **run_metadata
+            )
+    live_report = None
+    if live and should_wait_for_evaluation and run_state.completed < run_state.total:
+        snapshot_path = Path(output_dir or '.') / f"{subset.value}__{split}__{run_id}.partial.json" if snapshots else None
+        live_report = start_live_report(client, subset.value, split, run_id, snapshot_path, run_state)
+    if should_wait_for_evaluation and run_state.completed < run_state.total:
+        with profiler.phase("wait for evaluation"):
+            wait_for_evaluation(
+                all_ids=all_ids,
+                timeout=eval_timeout,
+                run_state=run_state,
+                poller=poller,
+                client=client,
+                live_report=live_report,
+                **run_metadata
+            )
+    if hasattr(poller, 'close'):
+        poller.close()
     if gen_report:
-        get_report(
-            output_dir=output_dir,
-            overwrite=overwrite,
-            **run_metadata,
-        )
+        with profiler.phase("get report"):
+            save_report(client, **run_metadata, output_dir=output_dir, overwrite=bool(overwrite))
+        if live_report and live_report.snapshot_path:
+            live_report.snapshot_path.unlink(missing_ok=True)  # superseded by the full report
+    if failures.failed_ids:
+        raise typer.Exit(1)
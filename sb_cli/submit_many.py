@@ -0,0 +1,300 @@
+import glob
+import json
+import time
+import requests
+import typer
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+from rich.console import Console
+from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn, TimeElapsedColumn
+from sb_cli.client import SWEBenchClient
+from sb_cli.config import MAX_PATCH_BYTES, SUBMIT_WORKERS, Subset
+from sb_cli.failures import UploadFailures
+from sb_cli.get_quotas import check_quota
+from sb_cli.get_report import save_report
+from sb_cli.journal import SubmissionJournal
+from sb_cli.polling import PollScheduler, default_timeout
+from sb_cli.submit import (
+    create_submit_context,
+    deduplicate_submission,
+    iter_pending_predictions,
+    patch_region_threshold,
+    prepare_submission,
+    resolve_run_id,
+    upload_predictions,
+    validate_submission,
+)
+from sb_cli.utils import upload_stats
+
+app = typer.Typer(help="Submit and track several prediction files at once")
+
+
+class ManagedRun:
+    """A run submitted and tracked by submit-many."""
+
+    def __init__(self, predictions_path: Path, run_id: str, instance_ids: Optional[list[str]], journal):
+        self.predictions_path = predictions_path
+        self.run_id = run_id
+        self.instance_ids = instance_ids
+        self.journal = journal
+        self.patch_hashes, self.skipped_ids, self.run_state = prepare_submission(
+            str(predictions_path), instance_ids, journal
+        )
+        self.references = {}
+        self.new_ids = []
+        self.all_completed_ids = []
+        self.failures = UploadFailures()
+        self.upload_task = None
+        self.track_task = None
+        self.poller = None
+        self.scheduler = None
+        self.next_poll = 0.0
+        self.deadline = None
+
+    @property
+    def pending_uploads(self) -> int:
+        return len(self.patch_hashes) - len(self.skipped_ids)
+
+
+def make_progress(console: Console) -> Progress:
+    return Progress(
+        SpinnerColumn(),
+        TextColumn("[blue]{task.description}"),
+        BarColumn(),
+        TaskProgressColumn(text_format="[progress.percentage]{task.percentage:>3.1f}%"),
+        TimeElapsedColumn(),
+        console=console,
+    )
+
+
+def load_manifest(manifest_path: str) -> list[dict]:
+    """Read run entries from a JSON list or JSONL manifest; relative paths are relative to it."""
+    with open(manifest_path, 'r') as f:
+        if manifest_path.endswith('.json'):
+            entries = json.load(f)
+        else:
+            entries = [json.loads(line) for line in f if line.strip()]
+    base_dir = Path(manifest_path).parent
+    for entry in entries:
+        if 'predictions_path' not in entry:
+            raise ValueError(f"Manifest entry is missing 'predictions_path': {entry}")
+        entry['predictions_path'] = base_dir / entry['predictions_path']
+    return entries
+
+
+def expand_predictions_paths(patterns: list[str]) -> list[Path]:
+    """Expand glob patterns into a sorted, de-duplicated list of files."""
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        for match in matches:
+            path = Path(match)
+            if not path.is_file():
+                raise ValueError(f"Predictions file not found: {match}")
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def upload_runs(
+    runs: list[ManagedRun],
+    client: SWEBenchClient,
+    payload_bases: dict,
+    batch: bool,
+    progress: Progress,
+    fail_fast: bool,
+):
+    """Upload every run's pending predictions, one run after another, through one shared worker pool."""
+    with ThreadPoolExecutor(max_workers=SUBMIT_WORKERS) as executor:
+        for run in runs:
+            if not run.pending_uploads:
+                continue
+            predictions = iter_pending_predictions(
+                str(run.predictions_path), run.instance_ids, run.skipped_ids, run.references,
+                patch_region_threshold(client),
+            )
+            try:
+                run.new_ids, run.all_completed_ids = upload_predictions(
+                    client,
+                    predictions,
+                    payload_bases[run.run_id],
+                    batch=batch,
+                    journal=run.journal,
+                    fail_fast=fail_fast,
+                    failures=run.failures,
+                    on_advance=lambda count, task=run.upload_task: progress.update(task, advance=count),
+                    executor=executor,
+                )
+            except RuntimeError as e:
+                raise RuntimeError(f"{str(e)} (run {run.run_id})") from e
+
+
+def track_runs(runs: list[ManagedRun], progress: Progress, until_evaluated: bool) -> list[ManagedRun]:
+    """Poll all runs from one loop, polling the runs that are due together; returns timed-out runs."""
+    def is_done(run):
+        state = run.run_state
+        return state.completed == state.total if until_evaluated else state.pending == 0
+
+    def tracked(run):
+        state = run.run_state
+        return state.completed if until_evaluated else state.running + state.completed
+
+    active = [run for run in runs if not is_done(run)]
+    timed_out = []
+    for run in runs:
+        progress.update(run.track_task, completed=tracked(run))
+    with ThreadPoolExecutor(max_workers=SUBMIT_WORKERS) as executor:
+        while active:
+            time.sleep(max(0.0, min(run.next_poll for run in active) - time.monotonic()))
+            due = [run for run in active if run.next_poll <= time.monotonic()]
+            polls = executor.map(lambda run: run.poller.poll(run.run_state), due)
+            for run, (changes, response) in zip(due, polls):
+                progress.update(run.track_task, completed=tracked(run))
+                now = time.monotonic()
+                if is_done(run):
+                    active.remove(run)
+                elif now > run.deadline:
+                    active.remove(run)
+                    timed_out.append(run)
+                else:
+                    changed = len(changes['running']) + len(changes['completed'])
+                    remaining = run.run_state.total - tracked(run)
+                    run.next_poll = now + run.scheduler.next_interval(changed, remaining, response)
+    return timed_out
+
+
+def submit_many(
+    subset: Subset = typer.Argument(..., help="Subset to submit predictions for"),
+    split: str = typer.Argument(..., help="Split to submit predictions for"),
+    predictions_paths: Optional[list[str]] = typer.Argument(None, help="Prediction files or glob patterns", show_default=False),
+    manifest: Optional[str] = typer.Option(
+        None,
+        '--manifest',
+        help="JSON/JSONL manifest of runs with predictions_path and optional run_id and instance_ids",
+    ),
+    run_id: str = typer.Option("PARENT", '--run_id', help="How to derive run IDs from file paths - PARENT or STEM"),
+    output_dir: Optional[str] = typer.Option('sb-cli-reports', '--output_dir', '-o', help="Directory to save report files"),
+    overwrite: int = typer.Option(0, '--overwrite', help="Overwrite existing reports"),
+    gen_report: int = typer.Option(1, '--gen_report', help="Generate reports after evaluation is complete"),
+    verify_submission: int = typer.Option(1, '--verify_submission', help="Verify submissions before waiting for completion"),
+    should_wait_for_evaluation: int = typer.Option(1, '--wait_for_evaluation', help="Wait for evaluation to complete before generating reports"),
+    batch: int = typer.Option(1, '--batch', help="Upload predictions in batches when the API supports it"),
+    eval_timeout: Optional[int] = typer.Option(None, '--eval_timeout', help="Seconds to wait for each run - (defaults to 10 minutes plus 0.5s per instance)"),
+    use_journal: int = typer.Option(1, '--journal', help="Record submission progress under the output directory so re-runs skip confirmed predictions"),
+    should_check_quota: int = typer.Option(1, '--check_quota', help="Check the remaining run quota before uploading anything"),
+    validate: int = typer.Option(1, '--validate', help="Check that every patch is a well-formed diff within the size limit before uploading anything"),
+    max_patch_bytes: int = typer.Option(MAX_PATCH_BYTES, '--max_patch_bytes', help="Largest patch to submit, in bytes - (defaults to SWEBENCH_MAX_PATCH_BYTES or 1 MiB)"),
+    skip_invalid: int = typer.Option(0, '--skip_invalid', help="Submit only the valid predictions instead of all of them when some fail validation"),
+    strict: int = typer.Option(0, '--strict', help="Stop before uploading anything when some predictions fail validation"),
+    fail_fast: int = typer.Option(1, '--fail_fast', help="Stop at the first failed upload; with 0, keep going, retry transient failures and write a failure manifest per run"),
+    api_key: Optional[str] = typer.Option(
+        None,
+        '--api_key',
+        help="API key to use - (defaults to SWEBENCH_API_KEY)",
+        envvar="SWEBENCH_API_KEY"
+    ),
+):
+    """Submit several prediction files as separate runs and track them together."""
+    console = Console()
+    client = SWEBenchClient(api_key)
+    entries = load_manifest(manifest) if manifest else []
+    entries += [{'predictions_path': path} for path in expand_predictions_paths(predictions_paths or [])]
+    if not entries:
+        raise typer.BadParameter("Provide prediction files, glob patterns or --manifest")
+
+    runs = []
+    for entry in entries:
+        path = Path(entry['predictions_path'])
+        entry_run_id = resolve_run_id(path, entry.get('run_id', run_id))
+        if any(run.run_id == entry_run_id for run in runs):
+            raise ValueError(f"Run ID {entry_run_id} is used by more than one predictions file")
+        journal = SubmissionJournal.for_run(output_dir, subset.value, split, entry_run_id) if use_journal else None
+        entry_ids = entry.get('instance_ids')
+        if validate:
+            validation_path = Path(output_dir or '.') / f"{subset.value}__{split}__{entry_run_id}.validation.json"
+            entry_ids, invalid = validate_submission(
+                path, entry_ids, max_patch_bytes, bool(skip_invalid), validation_path, bool(strict)
+            )
+            if invalid:
+                action = "skipping" if skip_invalid else "submitting anyway"
+                console.print(f"[yellow]  {entry_run_id}: {action} {len(invalid)} predictions that failed validation - see {validation_path}[/]")
+        runs.append(ManagedRun(path, entry_run_id, entry_ids, journal))
+    if should_check_quota:
+        try:
+            check_quota(client, subset.value, split, [run.run_id for run in runs])
+        except requests.RequestException as e:
+            console.print(f"[yellow]  Could not check remaining quota, continuing anyway: {str(e)}[/]")
+    console.print(f"[yellow]  Submitting {len(runs)} runs - ({subset.value} {split})[/]")
+
+    for run in runs:
+        run.skipped_ids, run.references = deduplicate_submission(
+            client, subset.value, split, run.run_id, run.patch_hashes, run.skipped_ids, run.journal
+        )
+    payload_bases = {
+        run.run_id: create_submit_context(
+            client,
+            {"split": split, "subset": subset, "instance_ids": run.instance_ids, "run_id": run.run_id},
+        )
+        for run in runs if run.pending_uploads
+    }
+    use_batch = bool(batch) and "batch-submit" in client.capabilities
+    with make_progress(console) as progress:
+        for run in runs:
+            run.upload_task = progress.add_task(f"Submitting {run.run_id}", total=run.pending_uploads)
+        upload_runs(runs, client, payload_bases, use_batch, progress, bool(fail_fast))
+    console.print(f"[green]  {upload_stats.summary()}[/]")
+    for run in runs:
+        console.print(
+            f"[green]  {run.run_id}: {len(run.new_ids)} new[/], "
+            f"[yellow]{len(run.all_completed_ids)} already submitted, {len(run.skipped_ids)} skipped, "
+            f"{len(run.references)} sent by hash[/]"
+        )
+        failures_path = Path(output_dir or '.') / f"{subset.value}__{split}__{run.run_id}.failures.json"
+        if not run.failures.failed_ids:
+            failures_path.unlink(missing_ok=True)  # left over from an earlier attempt
+            continue
+        run.failures.write_manifest(failures_path)
+        console.print(
+            f"[red]  {run.run_id}: wrote {len(run.failures.failed_ids)} failed predictions to {failures_path} - "
+            f"re-run submit-many to retry them[/]"
+        )
+        # Failed predictions never reach the server, so stop tracking them
+        run.run_state = run.run_state.without(run.failures.failed_ids)
+
+    timed_out = []
+    if verify_submission or should_wait_for_evaluation:
+        label = "Evaluating" if should_wait_for_evaluation else "Processing"
+        with make_progress(console) as progress:
+            for run in runs:
+                run.track_task = progress.add_task(f"{label} {run.run_id}", total=run.run_state.total)
+                run.poller = client.poller(subset.value, split, run.run_id)
+                run.scheduler = PollScheduler(initial_interval=15 if should_wait_for_evaluation else 8)
+                if should_wait_for_evaluation:
+                    timeout = eval_timeout or default_timeout(60 * 10, run.run_state.total, 0.5)
+                else:
+                    timeout = default_timeout(60 * 5, run.run_state.total, 0.1)
+                run.deadline = time.monotonic() + timeout
+            try:
+                timed_out = track_runs(runs, progress, until_evaluated=bool(should_wait_for_evaluation))
+            finally:
+                for run in runs:
+                    if hasattr(run.poller, 'close'):
+                        run.poller.close()
+        for run in timed_out:
+            console.print(f"[red]✗ {run.run_id} timed out. Try re-running submit-many to continue.[/]")
+        if not timed_out:
+            console.print(f"[green]✓ {label} complete for all runs![/]")
+
+    if gen_report:
+        # Fetch every report concurrently, then print and save them in order
+        with ThreadPoolExecutor(max_workers=SUBMIT_WORKERS) as executor:
+            fetches = [executor.submit(client.get_report, subset.value, split, run.run_id) for run in runs]
+            for run, fetch in zip(runs, fetches):
+                console.print(f"[yellow]  Report for {run.run_id}[/]")
+                save_report(
+                    client, subset.value, split, run.run_id,
+                    output_dir=output_dir, overwrite=bool(overwrite), fetched=fetch.result(),
+                )
+    if timed_out or any(run.failures.failed_ids for run in runs):
+        raise typer.Exit(1)
@@ -0,0 +1,109 @@
+import threading
+import time
+from typing import Optional
+from sb_cli.config import MAX_REQUESTS_PER_SECOND, SUBMIT_WORKERS
+
+LATENCY_SMOOTHING = 0.2
+# A response this many times slower than the smoothed latency counts as congestion
+LATENCY_SPIKE_FACTOR = 3.0
+DECREASE_FACTOR = 0.5
+
+
+class RateController:
+    """
+    Client-side throttle shared by every outgoing API request.
+
+    Concurrency follows AIMD: the limit grows by roughly one request per round trip
+    while responses are healthy and is halved on 429/503 responses, connection errors
+    or latency spikes (at most once per round trip, so one burst of errors counts once).
+    An optional token bucket additionally caps the request rate.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = SUBMIT_WORKERS,
+        min_concurrency: int = 1,
+        requests_per_second: Optional[float] = MAX_REQUESTS_PER_SECOND,
+    ):
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.rate = requests_per_second
+        self.tokens = float(requests_per_second or 0)
+        self.latency = {}  # smoothed latency per endpoint
+        self._last_refill = time.monotonic()
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float):
+        if self.rate:
+            self.tokens = min(self.rate, self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def try_acquire(self) -> float:
+        """Take a request slot if one is free; otherwise return how long to wait before retrying."""
+        with self._cond:
+            if self.in_flight >= max(self.min_concurrency, int(self.limit)):
+                return 0.05
+            if self.rate:
+                self._refill(time.monotonic())
+                if self.tokens < 1:
+                    return (1 - self.tokens) / self.rate
+                self.tokens -= 1
+            self.in_flight += 1
+            return 0.0
+
+    def acquire(self):
+        """Block until a request slot is available."""
+        while True:
+            with self._cond:
+                delay = self.try_acquire()
+                if not delay:
+                    return
+                # Woken early when a slot is released
+                self._cond.wait(delay)
+
+    async def acquire_async(self):
+        """Wait for a request slot without blocking the event loop."""
+        import asyncio  # only the asyncio engine needs it, keep it off the startup path
+        while True:
+            delay = self.try_acquire()
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+
+    def release(self, status_code: Optional[int], latency: float, endpoint: str = ''):
+        """Return a slot and adapt the limit; `status_code` is None for connection errors."""
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            baseline = self.latency.get(endpoint)
+            congested = status_code is None or status_code in (429, 503)
+            if not congested and baseline and latency > LATENCY_SPIKE_FACTOR * baseline:
+                congested = True
+            if congested:
+                if now - self._last_decrease > (baseline or 1.0):
+                    self.limit = max(self.min_concurrency, self.limit * DECREASE_FACTOR)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1 / max(self.limit, 1))
+            if status_code is not None and status_code < 500:
+                self.latency[endpoint] = latency if baseline is None else (
+                    LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * baseline
+                )
+            self._cond.notify_all()
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_rate_controller() -> RateController:
+    """Return the process-wide rate controller."""
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = RateController()
+    return _controller
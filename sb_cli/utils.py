@@ -1,6 +1,368 @@
+import gzip
+import importlib.util
+import json
+import random
+import threading
+import time
+import zlib
+from json.encoder import encode_basestring_ascii
+from typing import Iterator, Optional
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from sb_cli.config import API_BASE_URL, MAX_RETRIES, STREAM_BODY_MIN_BYTES, SUBMIT_WORKERS
+from sb_cli.predictions import PatchRegion
+from sb_cli.profiling import TimedHTTPAdapter, profiler, take_connection_timings
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+CONNECT_TIMEOUT = 10
+# Request bodies smaller than this are not worth compressing
+COMPRESS_MIN_BYTES = 1024
+# Streamed request bodies are serialized, compressed and sent in blocks of about this size
+STREAM_CHUNK_SIZE = 1 << 16
+STREAM_WINDOW_LOG = 17
+
+_session = None
+_session_lock = threading.Lock()
+_capabilities = {}
+
+
+def format_bytes(num_bytes: int) -> str:
+    for unit in ("B", "KB", "MB"):
+        if num_bytes < 1000:
+            return f"{num_bytes:.0f} {unit}" if unit == "B" else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1000
+    return f"{num_bytes:.1f} GB"
+
+
+class TransferStats:
+    """Thread-safe tally of request body bytes before and after compression."""
+
+    def __init__(self):
+        self.raw_bytes = 0
+        self.sent_bytes = 0
+        self._lock = threading.Lock()
+
+    def record(self, raw_bytes: int, sent_bytes: int):
+        with self._lock:
+            self.raw_bytes += raw_bytes
+            self.sent_bytes += sent_bytes
+
+    def summary(self) -> str:
+        sent = format_bytes(self.sent_bytes)
+        if self.sent_bytes >= self.raw_bytes:
+            return f"Uploaded {sent}"
+        saved = 1 - self.sent_bytes / self.raw_bytes
+        return f"Uploaded {sent} ({format_bytes(self.raw_bytes)} uncompressed, {saved:.0%} saved)"
+
+
+upload_stats = TransferStats()
+
+
+def create_session(pool_size: int = SUBMIT_WORKERS) -> requests.Session:
+    """Create a keep-alive session whose pool can serve `pool_size` concurrent requests."""
+    session = requests.Session()
+    # Connections time their own setup only when profiling, to keep the default path lean
+    adapter_class = TimedHTTPAdapter if profiler.enabled else HTTPAdapter
+    adapter = adapter_class(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide session shared by all API calls."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def get_retry_after(response) -> Optional[float]:
+    """Seconds from a Retry-After header, if the response has one in delta-seconds form."""
+    value = response.headers.get("Retry-After") if response is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None  # HTTP-date form
+
+
+def get_retry_delay(response, attempt: int) -> float:
+    """Exponential backoff with full jitter, honoring Retry-After when the server sends it."""
+    retry_after = get_retry_after(response)
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def api_request(
+    method: str,
+    endpoint: str,
+    *,
+    session: requests.Session = None,
+    base_url: str = API_BASE_URL,
+    max_retries: int = MAX_RETRIES,
+    compress: bool = False,
+    **kwargs
+) -> requests.Response:
+    """
+    Send a request to the API, retrying connection errors, 429s and 5xx responses.
+
+    Every attempt goes through the shared rate controller, which adapts concurrency
+    to the responses it sees. With `compress`, the `json` body is compressed using the
+    best Content-Encoding the API advertises and counted in `upload_stats`, and large
+    bodies are streamed in chunks if the API accepts that.
+    """
+    session = session or get_session()
+    url = f"{base_url}/{endpoint}"
+    kwargs.setdefault("timeout", (CONNECT_TIMEOUT, None))
+    if compress and "json" in kwargs:
+        body, body_headers = json_request_body(
+            kwargs.pop("json"),
+            get_request_encoding(base_url, session),
+            chunked="chunked-requests" in get_capabilities(base_url, session),
+        )
+        kwargs["data"] = body
+        kwargs["headers"] = {**(kwargs.get("headers") or {}), **body_headers}
+    from sb_cli.throttle import get_rate_controller
+
+    controller = get_rate_controller()
+    for attempt in range(max_retries + 1):
+        controller.acquire()
+        start_time = time.monotonic()
+        response = None
+        try:
+            response = session.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if profiler.enabled:
+                record_request_timings(method, endpoint, None, attempt, start_time)
+            if attempt == max_retries:
+                raise
+        finally:
+            # Any other exception must give the slot back too, or it stays taken for good
+            status_code = response.status_code if response is not None else None
+            controller.release(status_code, time.monotonic() - start_time, endpoint)
+        if response is not None:
+            if profiler.enabled:
+                record_request_timings(method, endpoint, response, attempt, start_time, kwargs.get("stream", False))
+            if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries:
+                return response
+        time.sleep(get_retry_delay(response, attempt))
+
+
+def record_request_timings(method: str, endpoint: str, response, attempt: int, start_time: float, stream: bool = False):
+    """Hand one request attempt to the profiler, splitting its time into connection steps."""
+    duration = time.monotonic() - start_time
+    connect, tls = take_connection_timings()
+    timings = {"connect": connect, "tls": tls}
+    if response is not None:
+        # `elapsed` runs until the headers arrive, so it covers connection setup and the wait
+        headers_at = response.elapsed.total_seconds()
+        timings["ttfb"] = max(0.0, headers_at - connect - tls)
+        timings["transfer"] = max(0.0, duration - headers_at)
+    body = response.request.body if response is not None else None
+    profiler.record_request(
+        method,
+        endpoint,
+        response.status_code if response is not None else None,
+        attempt,
+        start=time.perf_counter() - duration,
+        duration=duration,
+        # A streamed body is counted in `upload_stats` instead
+        sent_bytes=len(body) if isinstance(body, (bytes, str)) else 0,
+        # A streamed body is still being read, so only its headers have arrived
+        received_bytes=len(response.content) if response is not None and not stream else 0,
+        **timings,
+    )
+
+
+def get_capabilities(base_url: str = API_BASE_URL, session: requests.Session = None) -> frozenset:
+    """Return the optional features the API advertises, or an empty set if it advertises none."""
+    if base_url not in _capabilities:
+        try:
+            response = api_request("get", "capabilities", session=session, base_url=base_url, max_retries=1)
+            features = response.json().get("features", []) if response.status_code == 200 else []
+        except (requests.RequestException, ValueError):
+            features = []
+        _capabilities[base_url] = frozenset(features)
+    return _capabilities[base_url]
+
+
+def get_request_encoding(base_url: str = API_BASE_URL, session: requests.Session = None) -> Optional[str]:
+    """The best Content-Encoding the API accepts for request bodies, if any."""
+    features = get_capabilities(base_url, session)
+    if "zstd-requests" in features and importlib.util.find_spec("zstandard"):
+        return "zstd"
+    if "gzip-requests" in features:
+        return "gzip"
+    return None
+
+
+def read_patch_region(value):
+    """`json.dumps` hook that reads patches left in their predictions file."""
+    if isinstance(value, PatchRegion):
+        return value.read()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_json_body(payload, encoding: Optional[str]) -> tuple[bytes, dict]:
+    """Serialize a JSON body, compressing it with `encoding` when it is large enough."""
+    body = json.dumps(payload, default=read_patch_region).encode("utf-8")
+    raw_bytes = len(body)
+    headers = {"Content-Type": "application/json"}
+    if encoding and raw_bytes >= COMPRESS_MIN_BYTES:
+        if encoding == "zstd":
+            import zstandard
+            body = zstandard.ZstdCompressor(level=3).compress(body)
+        else:
+            body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = encoding
+    upload_stats.record(raw_bytes, len(body))
+    return body, headers
+
+
+def json_size_hint(value) -> int:
+    """Rough serialized size of a JSON value, without reading patches left on disk."""
+    if isinstance(value, dict):
+        return sum(len(key) + json_size_hint(item) + 6 for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(json_size_hint(item) + 2 for item in value)
+    if isinstance(value, str):
+        return len(value) + 2
+    if isinstance(value, PatchRegion):
+        return value.length
+    return 8
+
+
+def iter_json_chunks(value, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Serialize a JSON value piece by piece, byte-for-byte as `json.dumps` would.
+
+    Long strings are escaped a slice at a time and PatchRegions are copied from their
+    file, so no piece is much larger than `chunk_size`.
+    """
+    if isinstance(value, dict):
+        yield b"{"
+        for i, (key, item) in enumerate(value.items()):
+            yield (", " if i else "").encode() + encode_basestring_ascii(str(key)).encode() + b": "
+            yield from iter_json_chunks(item, chunk_size)
+        yield b"}"
+    elif isinstance(value, (list, tuple)):
+        yield b"["
+        for i, item in enumerate(value):
+            if i:
+                yield b", "
+            yield from iter_json_chunks(item, chunk_size)
+        yield b"]"
+    elif isinstance(value, str) and len(value) > chunk_size:
+        yield b'"'
+        for start in range(0, len(value), chunk_size):
+            yield encode_basestring_ascii(value[start:start + chunk_size])[1:-1].encode()
+        yield b'"'
+    elif isinstance(value, PatchRegion):
+        yield from value.iter_bytes(chunk_size)
+    else:
+        yield json.dumps(value).encode("utf-8")
+
+
+class StreamedJSONBody:
+    """
+    A JSON request body that is serialized, compressed and sent in fixed-size blocks.
+
+    Each iteration produces the whole body again, so a retried request re-reads it from
+    the payload (and any patch files) instead of the body being held in memory. Passed
+    as `data`, requests sends it with chunked transfer encoding.
+    """
+
+    def __init__(self, payload, encoding: Optional[str], chunk_size: int = STREAM_CHUNK_SIZE):
+        self.payload = payload
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+        self.recorded = False
+
+    def compressor(self):
+        if self.encoding == "zstd":
+            import zstandard
+            # A streamed frame's size is unknown, so zstd would size its window for the
+            # worst case; a small one keeps memory per upload worker fixed
+            params = zstandard.ZstdCompressionParameters.from_level(3, window_log=STREAM_WINDOW_LOG)
+            return zstandard.ZstdCompressor(compression_params=params).compressobj()
+        if self.encoding == "gzip":
+            return zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return None
+
+    def iter_blocks(self) -> Iterator[bytes]:
+        block = bytearray()
+        for piece in iter_json_chunks(self.payload, self.chunk_size):
+            block += piece
+            if len(block) >= self.chunk_size:
+                yield bytes(block)
+                block.clear()
+        if block:
+            yield bytes(block)
+
+    def __iter__(self) -> Iterator[bytes]:
+        compressor = self.compressor()
+        raw_bytes = sent_bytes = 0
+        for block in self.iter_blocks():
+            raw_bytes += len(block)
+            if compressor:
+                block = compressor.compress(block)
+            # An empty chunk would end a chunked body early
+            if block:
+                sent_bytes += len(block)
+                yield block
+        block = compressor.flush() if compressor else b""
+        if block:
+            sent_bytes += len(block)
+            yield block
+        if not self.recorded:
+            self.recorded = True
+            upload_stats.record(raw_bytes, sent_bytes)
+
+    async def aiter(self):
+        """The body as an async iterator, for httpx's AsyncClient; blocks are built in a worker thread."""
+        import asyncio
+
+        blocks = iter(self)
+        while (block := await asyncio.to_thread(next, blocks, None)) is not None:
+            yield block
+
+
+def json_request_body(payload, encoding: Optional[str], chunked: bool = False) -> tuple[object, dict]:
+    """
+    Build a JSON request body and its headers.
+
+    With `chunked` (the API accepts chunked uploads), bodies of at least
+    STREAM_BODY_MIN_BYTES are returned as a StreamedJSONBody instead of bytes.
+    """
+    if chunked and json_size_hint(payload) >= STREAM_BODY_MIN_BYTES:
+        headers = {"Content-Type": "application/json"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return StreamedJSONBody(payload, encoding), headers
+    return encode_json_body(payload, encoding)
+
+
+def is_retriable(error: Exception) -> bool:
+    """Whether a failed request might succeed if sent again later."""
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and error.response.status_code in RETRY_STATUS_CODES
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
 
 def verify_response(response):
     if response.status_code != 200:
-        message = response.json().get("message", "No message provided")
-        raise requests.RequestException(f"API request failed with status code {response.status_code}: {message}")
\ No newline at end of file
+        try:
+            message = response.json().get("message", "No message provided")
+        except ValueError:
+            message = response.text or "No message provided"
+        raise requests.HTTPError(
+            f"API request failed with status code {response.status_code}: {message}",
+            response=response,
+        )
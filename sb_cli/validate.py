@@ -0,0 +1,200 @@
+import json
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional
+from sb_cli.config import MAX_PATCH_BYTES
+from sb_cli.prediction_index import load_index, select_entries
+from sb_cli.predictions import iter_predictions
+
+HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+# git extended header lines that describe a change without any hunks
+HUNKLESS_CHANGES = (
+    'new file mode', 'deleted file mode', 'old mode', 'new mode', 'rename from', 'rename to',
+    'copy from', 'copy to', 'Binary files', 'GIT binary patch',
+)
+# Files at least this large are validated in a process pool; smaller ones aren't worth the startup
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+CHUNK_BYTES = 1024 * 1024
+
+
+def check_unified_diff(patch: str) -> list[str]:
+    """
+    Problems that would keep a unified diff from applying.
+
+    Flags patches without any file header, files without hunks (unless git marks them
+    as renames, mode or binary changes), malformed hunk headers, hunks that contain
+    no changes, and hunks whose bodies don't match the line counts in their header.
+    """
+    problems = []
+    lines = patch.split('\n')
+    if lines and lines[-1] == '':
+        lines.pop()
+    files = 0
+    path, hunks, hunkless = None, 0, False
+
+    def finish_file():
+        if path is not None and not hunks and not hunkless:
+            problems.append(f"{path}: no hunks")
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith('diff --git '):
+            finish_file()
+            path, hunks, hunkless = line.split(' b/', 1)[-1], 0, False
+            files += 1
+        elif line.startswith('--- ') and i + 1 < len(lines) and lines[i + 1].startswith('+++ '):
+            new_path = lines[i + 1][4:].split('\t')[0]
+            if hunks or path is None:
+                # A plain unified diff without `diff --git` lines starts its next file here
+                finish_file()
+                files += 1
+                hunkless = False
+            if new_path != '/dev/null' or path is None:
+                path = new_path.removeprefix('b/')
+            hunks = 0
+            i += 2
+            continue
+        elif line.startswith(HUNKLESS_CHANGES) and path is not None:
+            hunkless = True
+        elif line.startswith('@@'):
+            match = HUNK_HEADER.match(line)
+            if path is None:
+                problems.append(f"hunk before any file header: {line[:80]}")
+            elif not match:
+                problems.append(f"{path}: malformed hunk header: {line[:80]}")
+            if path is None or not match:
+                i += 1
+                continue
+            hunks += 1
+            old_count = int(match.group(2)) if match.group(2) is not None else 1
+            new_count = int(match.group(4)) if match.group(4) is not None else 1
+            old_seen = new_seen = changes = 0
+            i += 1
+            while (old_seen < old_count or new_seen < new_count) and i < len(lines):
+                body = lines[i]
+                marker = body[:1]
+                if marker == '\\':
+                    pass  # "\ No newline at end of file"
+                elif marker in (' ', ''):
+                    old_seen += 1
+                    new_seen += 1
+                elif marker == '-':
+                    old_seen += 1
+                    changes += 1
+                elif marker == '+':
+                    new_seen += 1
+                    changes += 1
+                else:
+                    break
+                i += 1
+            while i < len(lines) and lines[i].startswith('\\'):
+                i += 1
+            if old_seen != old_count or new_seen != new_count:
+                problems.append(
+                    f"{path}: hunk {hunks} declares -{old_count}/+{new_count} lines "
+                    f"but has -{old_seen}/+{new_seen}"
+                )
+            elif not changes:
+                problems.append(f"{path}: hunk {hunks} has no changes")
+            continue
+        i += 1
+    finish_file()
+    if not files:
+        problems.append("no file headers - not a unified diff")
+    return problems
+
+
+def check_patch(model_patch, max_patch_bytes: int = MAX_PATCH_BYTES) -> list[str]:
+    """
+    Problems with a prediction's patch; an empty list means it looks valid.
+
+    An empty or missing patch is the "no patch" answer, so it is valid.
+    """
+    if model_patch is None:
+        return []
+    if not isinstance(model_patch, str):
+        return [f"model_patch must be a string, got {type(model_patch).__name__}"]
+    size = len(model_patch.encode('utf-8'))
+    if size > max_patch_bytes:
+        return [f"patch is {size} bytes, over the limit of {max_patch_bytes}"]
+    if not model_patch.strip():
+        return []
+    return check_unified_diff(model_patch)
+
+
+def check_patches(items: list[tuple[str, str]], max_patch_bytes: int) -> list[tuple[str, list[str]]]:
+    """Check a chunk of (instance_id, model_patch) pairs; runs in pool workers."""
+    return [(instance_id, check_patch(model_patch, max_patch_bytes)) for instance_id, model_patch in items]
+
+
+def chunk_patches(predictions: Iterable[dict], max_bytes: int = CHUNK_BYTES):
+    chunk, chunk_bytes = [], 0
+    for pred in predictions:
+        chunk.append((pred['instance_id'], pred['model_patch']))
+        chunk_bytes += len(pred['model_patch']) if isinstance(pred['model_patch'], str) else 0
+        if chunk_bytes >= max_bytes:
+            yield chunk
+            chunk, chunk_bytes = [], 0
+    if chunk:
+        yield chunk
+
+
+def validate_predictions(
+    predictions_path: str,
+    instance_ids: Optional[list[str]] = None,
+    max_patch_bytes: int = MAX_PATCH_BYTES,
+    workers: Optional[int] = None,
+) -> tuple[list[str], dict[str, list[str]]]:
+    """
+    Check every patch in a predictions file without any network calls.
+
+    Returns the checked instance IDs and the problems of each invalid one. Large files
+    are checked in a process pool, with a bounded number of chunks in flight so only
+    those patches are held in memory.
+    """
+    checked, invalid = [], {}
+
+    def record(results):
+        for instance_id, problems in results:
+            checked.append(instance_id)
+            if problems:
+                invalid[instance_id] = problems
+
+    chunks = chunk_patches(iter_predictions(str(predictions_path), instance_ids))
+    workers = workers or os.cpu_count() or 1
+    # An indexed subset only reads its own lines, however large the file is
+    index = load_index(predictions_path) if instance_ids else None
+    read_bytes = (
+        sum(entry[1] for _, entry in select_entries(index, instance_ids)) if index
+        else os.path.getsize(predictions_path)
+    )
+    if workers == 1 or read_bytes < PARALLEL_MIN_BYTES:
+        for chunk in chunks:
+            record(check_patches(chunk, max_patch_bytes))
+        return checked, invalid
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        for chunk in chunks:
+            if len(in_flight) >= 2 * workers:
+                record(in_flight.popleft().result())
+            in_flight.append(executor.submit(check_patches, chunk, max_patch_bytes))
+        while in_flight:
+            record(in_flight.popleft().result())
+    return checked, invalid
+
+
+def write_validation_report(path: Path, checked: list[str], invalid: dict[str, list[str]], max_patch_bytes: int) -> Path:
+    """Write the invalid predictions and their problems as JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({
+            'checked': len(checked),
+            'max_patch_bytes': max_patch_bytes,
+            'invalid': invalid,
+        }, f, indent=4)
+    return path
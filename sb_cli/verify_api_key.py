@@ -1,8 +1,7 @@
 import requests
 import typer
 from typing import Optional
-from sb_cli.config import API_BASE_URL
-from sb_cli.utils import verify_response
+from sb_cli.utils import api_request, verify_response
 
 app = typer.Typer()
 
@@ -18,7 +17,7 @@ def verify(
         payload = {
             'verification_code': verification_code
         }
-        response = requests.post(f"{API_BASE_URL}/verify-api-key", json=payload, headers=headers)
+        response = api_request("post", "verify-api-key", json=payload, headers=headers)
         verify_response(response)
         message = response.json()['message']
         typer.echo(message)
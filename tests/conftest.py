@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from mock_server import MockConfig, start_server  # noqa: E402
+
+from sb_cli import utils  # noqa: E402
+
+
+@pytest.fixture
+def mock_api():
+    """Start in-process mock API servers with the given MockConfig options; all are shut down afterwards."""
+    servers = []
+
+    def start(**options):
+        options.setdefault("latency", 0.0)
+        server, state = start_server(MockConfig(**options))
+        servers.append(server)
+        return server, state
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    """Retry immediately so tests of failing endpoints stay fast."""
+    monkeypatch.setattr(utils, "get_retry_delay", lambda response, attempt: 0.0)
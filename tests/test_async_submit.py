@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+import pytest
+
+from sb_cli.async_submit import submit_and_verify
+from sb_cli.client import SWEBenchClient
+from sb_cli.failures import UploadFailures
+from sb_cli.output import EventProgress
+from sb_cli.run_state import InstanceIndex, RunProgress
+
+pytest.importorskip("httpx")
+
+RUN = {"subset": "swe-bench_lite", "split": "dev", "run_id": "async-test"}
+PATCH = "--- a/x.py\n+++ b/x.py\n@@ -1 +1 @@\n-a\n+b\n"
+INSTANCE_IDS = [f"repo__{i}" for i in range(6)]
+
+
+def run_engine(server, fail_fast=True):
+    client = SWEBenchClient(api_key="test", base_url=f"http://127.0.0.1:{server.server_port}", use_daemon=False)
+    predictions = [{"instance_id": i, "model_name_or_path": "m", "model_patch": PATCH} for i in INSTANCE_IDS]
+    run_state = RunProgress(InstanceIndex(INSTANCE_IDS))
+    poller = client.poller(**RUN, shared=False, stream=True)
+    failures = UploadFailures()
+    try:
+        result = asyncio.run(submit_and_verify(
+            predictions, client, RUN, run_state, poller, EventProgress(), fail_fast=fail_fast, failures=failures
+        ))
+    finally:
+        poller.close()
+    return result, run_state, failures
+
+
+def test_verification_follows_job_events(mock_api):
+    server, state = mock_api(running_delay=0.1, completion_delay=0.2, features="job-events")
+    start = time.monotonic()
+    (new_ids, completed_ids, timed_out), run_state, failures = run_engine(server)
+
+    assert sorted(new_ids) == INSTANCE_IDS and not completed_ids and not timed_out
+    assert run_state.pending == 0
+    assert not failures.failed_ids
+    # Without the stream, the first poll would come a full poll interval after the uploads
+    assert time.monotonic() - start < 5
+    assert "poll-jobs" not in [endpoint for endpoint, _, _ in state.stats()["timings"]]
+
+
+def test_failed_uploads_are_collected_without_fail_fast(mock_api):
+    server, _ = mock_api(fail_endpoints={"submit": 400})
+    (new_ids, _, _), _, failures = run_engine(server, fail_fast=False)
+    assert not new_ids
+    assert sorted(failures.failed_ids) == INSTANCE_IDS
+
+
+def test_fail_fast_stops_at_the_first_failed_upload(mock_api):
+    server, _ = mock_api(fail_endpoints={"submit": 400})
+    with pytest.raises(RuntimeError, match="Error submitting prediction"):
+        run_engine(server)
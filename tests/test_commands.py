@@ -0,0 +1,10 @@
+import pytest
+
+from sb_cli import COMMANDS, command_help, load_command
+
+
+@pytest.mark.parametrize("name", list(COMMANDS))
+def test_listed_help_matches_the_loaded_command(name):
+    help_text = command_help(name)
+    assert help_text
+    assert load_command(name).help.startswith(help_text)
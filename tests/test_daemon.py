@@ -0,0 +1,61 @@
+import functools
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+from sb_cli.client import SWEBenchClient
+from sb_cli.daemon import DaemonHandler, DaemonPoller, DaemonServer, Tracker, connect_daemon
+from sb_cli.report_cache import ReportCache
+from sb_cli.run_state import InstanceIndex, RunProgress
+
+RUN_KEY = ("swe-bench_lite", "dev", "daemon-test")
+RUN = {"subset": "swe-bench_lite", "split": "dev", "run_id": "daemon-test"}
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    tracker = Tracker()
+    tracker.client_class = functools.partial(SWEBenchClient, report_cache=ReportCache(tmp_path / "cache"))
+    thread = threading.Thread(target=tracker.run, kwargs={"idle_timeout": 0}, daemon=True)
+    thread.start()
+    yield tracker
+    tracker.handle({"op": "stop"})
+    thread.join(5)
+
+
+def test_untracked_report_is_revalidated_every_time(mock_api, tracker):
+    server, state = mock_api()
+    state.submit(RUN_KEY, {"instance_id": "a", "model_patch": "a"})
+    request = {"op": "get_report", "api_key": "test", "base_url": f"http://127.0.0.1:{server.server_port}", **RUN}
+
+    assert not tracker.handle(request)["unchanged"]
+    state.submit(RUN_KEY, {"instance_id": "b", "model_patch": "b"})
+    reply = tracker.handle(request)
+    assert not reply["unchanged"]
+    assert reply["response"]["report"]["submitted_instances"] == 2
+    assert tracker.handle(request)["unchanged"]  # a 304 from the API
+
+
+def test_daemon_poller_replies_only_with_news(mock_api, tracker):
+    server, state = mock_api(running_delay=0.1, completion_delay=0.3)
+    instance_ids = [f"repo__{i}" for i in range(3)]
+    for instance_id in instance_ids:
+        state.submit(RUN_KEY, {"instance_id": instance_id, "model_patch": instance_id})
+    socket_path = Path(tempfile.mkdtemp()) / "daemon.sock"
+    daemon = DaemonServer(str(socket_path), DaemonHandler)
+    daemon.tracker = tracker
+    threading.Thread(target=daemon.serve_forever, daemon=True).start()
+    client = SWEBenchClient(api_key="test", base_url=f"http://127.0.0.1:{server.server_port}", use_daemon=False)
+    poller = DaemonPoller(connect_daemon(str(socket_path)), client, **RUN)
+    run_state = RunProgress(InstanceIndex(instance_ids))
+    try:
+        assert poller.streaming
+        while run_state.completed < run_state.total:
+            changes, _ = poller.poll(run_state)
+            assert changes["running"] or changes["completed"]
+    finally:
+        poller.close()
+        daemon.shutdown()
+        daemon.server_close()
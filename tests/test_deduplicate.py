@@ -0,0 +1,14 @@
+import pytest
+
+from sb_cli.client import SWEBenchClient
+from sb_cli.submit import deduplicate_submission
+
+
+@pytest.mark.parametrize("status", [404, 503])
+def test_failed_hash_check_uploads_everything(mock_api, status):
+    server, _ = mock_api(features="patch-hashes", fail_endpoints={"check-hashes": status})
+    client = SWEBenchClient(api_key="test", base_url=f"http://127.0.0.1:{server.server_port}", use_daemon=False)
+    patch_hashes = {"a": "1" * 64, "b": "2" * 64}
+    skipped_ids, references = deduplicate_submission(client, "swe-bench_lite", "dev", "run", patch_hashes, ["c"], None)
+    assert skipped_ids == ["c"]
+    assert references == {}
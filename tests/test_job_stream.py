@@ -0,0 +1,114 @@
+import time
+
+from sb_cli import job_stream
+from sb_cli.client import SWEBenchClient
+from sb_cli.job_stream import JobEventStream, iter_sse
+from sb_cli.polling import JobPoller
+from sb_cli.run_state import InstanceIndex, RunProgress
+
+RUN_KEY = ("swe-bench_lite", "dev", "stream-test")
+RUN = {"subset": "swe-bench_lite", "split": "dev", "run_id": "stream-test"}
+
+
+def test_iter_sse_parses_events_comments_and_multiline_data():
+    lines = [
+        ": keepalive",
+        "",
+        "id: 7",
+        "event: jobs",
+        'data: {"running": [],',
+        'data:  "completed": ["a"]}',
+        "",
+        "data:no space",
+        "",
+        "",
+    ]
+    assert list(iter_sse(lines)) == [
+        ("", "", None),
+        ("jobs", '{"running": [],\n "completed": ["a"]}', "7"),
+        ("message", "no space", None),
+    ]
+
+
+def make_stream(mock_api, instance_ids, **options):
+    server, state = mock_api(running_delay=0.1, completion_delay=1.0, event_heartbeat=0.1, **options)
+    for instance_id in instance_ids:
+        state.submit(RUN_KEY, {"instance_id": instance_id, "model_patch": instance_id})
+    client = SWEBenchClient(api_key="test", base_url=f"http://127.0.0.1:{server.server_port}", use_daemon=False)
+    return JobEventStream(client, **RUN), client, state
+
+
+def record_headers(client) -> list:
+    sent = []
+    request = client.request
+
+    def recording_request(method, endpoint, **kwargs):
+        if endpoint == "job-events":
+            sent.append(dict(kwargs.get("headers") or {}))
+        return request(method, endpoint, **kwargs)
+
+    client.request = recording_request
+    return sent
+
+
+def poll_until_completed(stream, run_state, timeout=10):
+    deadline = time.monotonic() + timeout
+    while run_state.completed < run_state.total:
+        assert time.monotonic() < deadline, "run did not complete"
+        stream.poll(run_state)
+
+
+def test_stream_resumes_from_last_event_id(mock_api):
+    instance_ids = [f"repo__{i}" for i in range(20)]
+    stream, client, state = make_stream(mock_api, instance_ids, event_max_duration=0.3)
+    sent = record_headers(client)
+    run_state = RunProgress(InstanceIndex(instance_ids))
+    poll_until_completed(stream, run_state)
+    stream.close()
+
+    assert stream.streaming
+    assert len(sent) > 1, "the stream was never closed by the server"
+    assert "Last-Event-ID" not in sent[0]
+    assert all(headers.get("Last-Event-ID") for headers in sent[1:])
+    # Streams the server ended after delivering events are not failures
+    assert stream.failures == 0
+    assert not any(endpoint == "poll-jobs" for endpoint, _, _ in state.stats()["timings"])
+
+
+def test_stream_falls_back_to_polling_on_client_error(mock_api):
+    instance_ids = ["repo__1", "repo__2"]
+    stream, _, state = make_stream(mock_api, instance_ids, fail_endpoints={"job-events": 404})
+    run_state = RunProgress(InstanceIndex(instance_ids))
+    stream.poll(run_state)
+
+    assert not stream.streaming
+    assert isinstance(stream.fallback, JobPoller)
+    endpoints = [endpoint for endpoint, _, _ in state.stats()["timings"]]
+    assert endpoints.count("job-events") == 1
+    assert "poll-jobs" in endpoints
+
+
+def test_stream_falls_back_to_polling_after_max_retries(mock_api, monkeypatch):
+    monkeypatch.setattr(job_stream, "MAX_RETRIES", 2)
+    monkeypatch.setattr(job_stream, "get_retry_delay", lambda response, attempt: 0.0)
+    instance_ids = ["repo__1"]
+    stream, _, state = make_stream(mock_api, instance_ids, fail_endpoints={"job-events": 503})
+    run_state = RunProgress(InstanceIndex(instance_ids))
+    stream.poll(run_state)
+
+    assert not stream.streaming
+    # Counted at the server, so retries inside each request would show up too
+    endpoints = [endpoint for endpoint, _, _ in state.stats()["timings"]]
+    assert endpoints.count("job-events") == 3  # the first attempt and MAX_RETRIES reconnects
+    assert "poll-jobs" in endpoints
+
+
+def test_client_wait_follows_events_across_reconnects(mock_api):
+    server, state = mock_api(running_delay=0.1, completion_delay=0.5, features="job-events", event_max_duration=0.2)
+    instance_ids = [f"repo__{i}" for i in range(5)]
+    for instance_id in instance_ids:
+        state.submit(RUN_KEY, {"instance_id": instance_id, "model_patch": instance_id})
+    client = SWEBenchClient(api_key="test", base_url=f"http://127.0.0.1:{server.server_port}", use_daemon=False)
+    run_state = client.wait(*RUN_KEY, instance_ids, timeout=10)
+    assert run_state.completed == len(instance_ids)
+    assert not any(endpoint == "poll-jobs" for endpoint, _, _ in state.stats()["timings"])
@@ -0,0 +1,25 @@
+import json
+
+import requests
+
+from sb_cli.client import SWEBenchClient
+from sb_cli.get_report import save_report
+from sb_cli.live_report import LiveReport
+
+RUN_KEY = ("swe-bench_lite", "dev", "live-test")
+
+
+def test_live_report_that_cannot_start_falls_through_to_the_report(mock_api, monkeypatch, tmp_path):
+    server, state = mock_api(running_delay=0.1, completion_delay=0.2)
+    for instance_id in ("a", "b"):
+        state.submit(RUN_KEY, {"instance_id": instance_id, "model_patch": instance_id})
+    client = SWEBenchClient(api_key="test", base_url=f"http://127.0.0.1:{server.server_port}", use_daemon=False)
+
+    def load_report(self):
+        raise requests.ConnectionError("unreachable")
+
+    monkeypatch.setattr(LiveReport, "load_report", load_report)
+    save_report(client, *RUN_KEY, output_dir=str(tmp_path), live=True, snapshots=True)
+    report = json.loads((tmp_path / "swe-bench_lite__dev__live-test.json").read_text())
+    assert report["submitted_instances"] == 2
+    assert not (tmp_path / "swe-bench_lite__dev__live-test.partial.json").exists()
@@ -0,0 +1,14 @@
+from sb_cli import profiling
+from sb_cli.profiling import Profiler
+
+
+def test_enable_registers_one_exit_hook_for_the_latest_settings(monkeypatch, tmp_path):
+    hooks = []
+    monkeypatch.setattr(profiling.atexit, "register", hooks.append)
+    profiler = Profiler()
+    profiler.enable(None, str(tmp_path / "first.json"))
+    profiler.enable(None, str(tmp_path / "second.json"))
+    assert len(hooks) == 1
+    hooks[0]()
+    assert not (tmp_path / "first.json").exists()
+    assert (tmp_path / "second.json").exists()
@@ -0,0 +1,53 @@
+import multiprocessing
+from types import SimpleNamespace
+
+import pytest
+
+from sb_cli import report_cache
+from sb_cli.report_cache import ReportCache
+
+
+def test_revalidated_entry_is_not_expired(tmp_path, monkeypatch):
+    clock = SimpleNamespace(time=lambda: 1000.0)
+    monkeypatch.setattr(report_cache, "time", clock)
+    cache = ReportCache(tmp_path, max_age=60)
+    cache.store("run-a", b'{"report": "a"}')
+    cache.store("run-b", b'{"report": "b"}')
+    clock.time = lambda: 1045.0
+    cache.touch("run-a")  # a 304
+    clock.time = lambda: 1075.0
+    cache.store("run-c", b'{"report": "c"}')
+
+    assert cache.lookup("run-a")
+    assert cache.lookup("run-b") is None
+    assert len(list((tmp_path / "blobs").glob("*.json"))) == 2
+
+
+def test_replaced_and_evicted_blobs_are_deleted(tmp_path):
+    cache = ReportCache(tmp_path, max_bytes=40)
+    cache.store("run-a", b'{"report": "a1"}')
+    cache.store("run-a", b'{"report": "a2"}')
+    cache.store("run-b", b'{"report": "b1"}')
+    cache.store("run-c", b'{"report": "c1"}')
+
+    assert cache.lookup("run-a") is None
+    assert cache.load(cache.lookup("run-c")) == {"report": "c1"}
+    assert len(list((tmp_path / "blobs").glob("*.json"))) == 2
+
+
+def store_reports(path, worker):
+    cache = ReportCache(path)
+    for i in range(20):
+        cache.store(f"run-{worker}-{i}", f'{{"report": "{worker}-{i}"}}'.encode())
+
+
+@pytest.mark.skipif(report_cache.fcntl is None, reason="needs fcntl file locks")
+def test_processes_sharing_the_cache_keep_each_others_entries(tmp_path):
+    processes = [multiprocessing.Process(target=store_reports, args=(tmp_path, worker)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(30)
+
+    cache = ReportCache(tmp_path)
+    assert all(cache.lookup(f"run-{worker}-{i}") for worker in range(4) for i in range(20))
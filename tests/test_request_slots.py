@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+import requests
+
+from sb_cli import async_submit, throttle, utils
+from sb_cli.throttle import RateController
+
+
+class RaisingSession:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+    def request(self, *args, **kwargs):
+        raise self.error
+
+
+class RaisingAsyncClient:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+    async def request(self, *args, **kwargs):
+        raise self.error
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    controller = RateController(max_concurrency=2, requests_per_second=None)
+    monkeypatch.setattr(throttle, "get_rate_controller", lambda: controller)
+    monkeypatch.setattr(async_submit, "get_rate_controller", lambda: controller)
+    return controller
+
+
+@pytest.mark.parametrize("error", [requests.exceptions.ChunkedEncodingError(), ValueError("index out of date")])
+def test_api_request_releases_slot_on_unexpected_error(controller, error):
+    for _ in range(3):
+        with pytest.raises(type(error)):
+            utils.api_request("get", "poll-jobs", session=RaisingSession(error), base_url="http://test")
+    assert controller.in_flight == 0
+
+
+def test_api_request_releases_slot_after_retried_connection_errors(controller, monkeypatch):
+    monkeypatch.setattr(utils.time, "sleep", lambda seconds: None)
+    with pytest.raises(requests.ConnectionError):
+        utils.api_request(
+            "get", "poll-jobs", session=RaisingSession(requests.ConnectionError()), base_url="http://test", max_retries=2
+        )
+    assert controller.in_flight == 0
+
+
+@pytest.mark.parametrize("error", [asyncio.CancelledError(), ValueError("index out of date")])
+def test_async_api_request_releases_slot_on_unexpected_error(controller, error):
+    async def run():
+        for _ in range(3):
+            with pytest.raises(type(error)):
+                await async_submit.async_api_request(RaisingAsyncClient(error), "POST", "submit")
+
+    asyncio.run(run())
+    assert controller.in_flight == 0
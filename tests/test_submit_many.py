@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from sb_cli.client import SWEBenchClient
+from sb_cli.output import EventProgress
+from sb_cli.submit_many import ManagedRun, upload_runs
+
+PATCH = "--- a/x.py\n+++ b/x.py\n@@ -1 +1 @@\n-a\n+b\n"
+RUN_IDS = ["run-a", "run-b"]
+
+
+def make_runs(tmp_path, progress):
+    runs = []
+    for run_id in RUN_IDS:
+        path = tmp_path / run_id / "preds.jsonl"
+        path.parent.mkdir()
+        path.write_text("".join(
+            json.dumps({"instance_id": f"{run_id}__{i}", "model_name_or_path": "m", "model_patch": PATCH}) + "\n"
+            for i in range(4)
+        ))
+        run = ManagedRun(path, run_id, None, None)
+        run.upload_task = progress.add_task(run_id, total=run.pending_uploads)
+        runs.append(run)
+    return runs
+
+
+def upload(server, runs, progress, fail_fast):
+    client = SWEBenchClient(api_key="test", base_url=f"http://127.0.0.1:{server.server_port}", use_daemon=False)
+    payload_bases = {run.run_id: {"subset": "swe-bench_lite", "split": "dev", "run_id": run.run_id} for run in runs}
+    upload_runs(runs, client, payload_bases, False, progress, fail_fast)
+
+
+def test_runs_upload_through_a_shared_pool(mock_api, tmp_path):
+    server, _ = mock_api()
+    progress = EventProgress()
+    runs = make_runs(tmp_path, progress)
+    upload(server, runs, progress, fail_fast=True)
+    for run in runs:
+        assert sorted(run.new_ids) == [f"{run.run_id}__{i}" for i in range(4)]
+        assert progress.tasks[run.upload_task].completed == 4
+
+
+def test_failed_uploads_are_collected_per_run_without_fail_fast(mock_api, tmp_path):
+    server, _ = mock_api(fail_endpoints={"submit": 400})
+    progress = EventProgress()
+    runs = make_runs(tmp_path, progress)
+    upload(server, runs, progress, fail_fast=False)
+    for run in runs:
+        assert not run.new_ids
+        assert sorted(run.failures.failed_ids) == [f"{run.run_id}__{i}" for i in range(4)]
+
+
+def test_fail_fast_stops_at_the_first_failed_upload(mock_api, tmp_path):
+    server, _ = mock_api(fail_endpoints={"submit": 400})
+    progress = EventProgress()
+    runs = make_runs(tmp_path, progress)
+    with pytest.raises(RuntimeError, match="run run-a"):
+        upload(server, runs, progress, fail_fast=True)
+    assert progress.tasks[runs[1].upload_task].completed == 0
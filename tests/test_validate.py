@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+from sb_cli.submit import validate_submission
+from sb_cli.validate import check_patch
+
+VALID_PATCH = "--- a/x.py\n+++ b/x.py\n@@ -1 +1 @@\n-a\n+b\n"
+
+
+@pytest.mark.parametrize("patch", ["", "  \n", None])
+def test_missing_patches_are_valid(patch):
+    assert check_patch(patch) == []
+
+
+def write_predictions(path, patches):
+    with open(path, "w") as f:
+        for instance_id, patch in patches.items():
+            f.write(json.dumps({"instance_id": instance_id, "model_name_or_path": "m", "model_patch": patch}) + "\n")
+
+
+def test_invalid_predictions_are_reported_and_submitted_by_default(tmp_path):
+    predictions = tmp_path / "preds.jsonl"
+    write_predictions(predictions, {"a": VALID_PATCH, "b": "", "c": "not a diff"})
+    report = tmp_path / "validation.json"
+    submit_ids, invalid = validate_submission(str(predictions), None, 1024, False, report)
+    assert submit_ids is None
+    assert list(invalid) == ["c"]
+    assert list(json.loads(report.read_text())["invalid"]) == ["c"]
+
+    submit_ids, _ = validate_submission(str(predictions), None, 1024, True, report)
+    assert submit_ids == ["a", "b"]
+    with pytest.raises(ValueError):
+        validate_submission(str(predictions), None, 1024, False, report, strict=True)